@@ -0,0 +1,292 @@
+"""
+Control de admisión del coordinador: rechaza pronto en lugar de encolar sin límite.
+
+- Límite de coste en curso: cada CalculoTotal o CalculoBatch cuesta unidades según el
+  trabajo que pide (un `add` cuesta 1 y una reducción 1 + elementos / `coste_elementos`). Si
+  admitirla superaría el límite, la petición se rechaza con RESOURCE_EXHAUSTED sin
+  llegar a los workers. Con el coordinador ocioso se admite siempre una, por cara que sea.
+- Peticiones en curso: el servidor síncrono atiende cada RPC en uno de sus hilos, y si
+  todos están ocupados las nuevas esperan en la cola de gRPC antes de que nadie decida
+  nada. Con `max_peticiones` por debajo de los hilos, siempre queda uno libre para
+  rechazar rápido. Un CalculoStream o un CalculoArray ocupa su hilo mientras dura, así
+  que también cuenta como una petición en curso (de coste COSTE_FLUJO) desde que se
+  abre hasta que termina.
+- Límite adaptativo (gradiente): por cada clase de petición (operación y orden de
+  magnitud del coste) se sigue la latencia suavizada y su mínima reciente. En cada
+  petición terminada, límite ← límite × mín(1, TOLERANCIA × mínima / latencia) + √límite,
+  suavizado: con latencias normales crece hasta el máximo y, cuando se forma cola y la
+  latencia se dispara, baja en proporción.
+- Tasa por cliente: un cubo de tokens (en unidades de coste por segundo) por cliente,
+  identificado por el metadato `x-cliente` o, si no lo envía, por su dirección.
+- Sin tiempo: si a la petición le queda menos deadline que la latencia suavizada de su
+  clase, vencería igual; se rechaza antes de gastar nada en ella. Es lo que más cuenta
+  en el coordinador aio, donde lo que espera al bucle de eventos no llega a ver los límites.
+
+Los rechazos por el límite o por la tasa salen en una RPC rápida y barata; además,
+`--max-rpcs` (maximum_concurrent_rpcs de gRPC) acota lo que espera a un hilo libre.
+"""
+import collections
+import math
+import threading
+import time
+
+import grpc
+
+from metricas import ADMISION_RECHAZADAS
+from operaciones import OPS_BASICAS
+from reducciones import REDUCCIONES, trabajo_peticion
+
+METODOS = ("CalculoTotal", "CalculoBatch")  # el alta, los latidos y la baja de workers no se limitan
+METODOS_FLUJO = ("CalculoStream", "CalculoArray")
+COSTE_FLUJO = 1               # un stream abierto; lo que viaja por él no pasa por la admisión
+METADATO_CLIENTE = "x-cliente"
+COSTE_ELEMENTOS = 1_000_000   # elementos de una reducción por unidad de coste
+COSTE_BASICA_EN_LOTE = 0.01   # en un lote, las básicas se evalúan juntas con numpy
+MAX_CLIENTES = 10_000         # cubos de tokens que se recuerdan (los más recientes)
+
+LIMITE_MINIMO = 1.0
+TOLERANCIA = 3.0              # latencia / mínima reciente a partir de la cual el límite baja
+SUAVIZADO_LATENCIA = 0.1      # peso de cada muestra en la latencia suavizada (EWMA)
+SUAVIZADO_LIMITE = 0.2        # peso de cada nuevo cálculo del límite
+DERIVA_BASE = 0.001           # la mínima sube un 0,1 % por muestra para olvidar mínimos antiguos
+VIGENCIA_LATENCIA = 1.0       # s; sin peticiones terminadas en ese tiempo, la latencia de la clase no se usa
+
+
+def cliente_de(context):
+    """Clave del cliente para la tasa: el metadato x-cliente o la dirección sin el puerto."""
+    for clave, valor in context.invocation_metadata() or ():
+        if clave == METADATO_CLIENTE:
+            return valor
+    return context.peer().rsplit(":", 1)[0]
+
+
+class ControlAdmision:
+    def __init__(self, limite=0, adaptativo=False, tasa_cliente=0, rafaga_cliente=None,
+                 coste_elementos=COSTE_ELEMENTOS, max_peticiones=None):
+        self.maximo = limite           # unidades de coste en curso (0 = sin límite)
+        self.limite = float(limite)    # límite vigente; con `adaptativo` se mueve entre LIMITE_MINIMO y maximo
+        self.adaptativo = adaptativo and limite > 0
+        self.max_peticiones = max_peticiones  # peticiones admitidas a la vez (None = sin límite)
+        self.peticiones = 0
+        self.tasa = tasa_cliente       # unidades de coste por segundo y cliente (0 = sin límite)
+        self.rafaga = rafaga_cliente or max(1.0, float(tasa_cliente))
+        self.coste_elementos = coste_elementos
+        self.en_curso = 0.0
+        self.admitidas = 0
+        self.rechazadas = collections.Counter()
+        self._lock = threading.Lock()
+        self._cubos = collections.OrderedDict()  # cliente -> (tokens, instante), del menos al más reciente
+        self._latencias = {}                     # clase de petición -> (latencia suavizada, mínima reciente, instante)
+
+    def coste(self, request):
+        """Unidades de coste de un CalculoRequest o de un CalculoBatchRequest."""
+        items = getattr(request, "items", None)
+        if items is not None:
+            return 1 + sum(COSTE_BASICA_EN_LOTE if it.op in OPS_BASICAS else self.coste(it) for it in items)
+        if request.op in REDUCCIONES:
+            return 1 + trabajo_peticion(request) / self.coste_elementos
+        return 1
+
+    def admitir(self, cliente, coste, clase=None, restante=None):
+        """
+        None si la petición entra (y ocupa `coste`); si no, el motivo del rechazo ("plazo",
+        "limite" o "tasa"). `restante` son los segundos que le quedan del deadline del cliente.
+        """
+        with self._lock:
+            if restante is not None and restante < self._latencia_vigente(clase):
+                motivo = "plazo"
+            elif self.maximo and self.en_curso > 0 and self.en_curso + coste > self.limite:
+                motivo = "limite"
+            elif self.max_peticiones is not None and self.peticiones >= self.max_peticiones:
+                motivo = "limite"
+            elif self.tasa and not self._gastar(cliente, coste):
+                motivo = "tasa"
+            else:
+                self.en_curso += coste
+                self.peticiones += 1
+                self.admitidas += 1
+                return None
+            self.rechazadas[motivo] += 1
+        ADMISION_RECHAZADAS.inc(motivo=motivo)
+        return motivo
+
+    def _gastar(self, cliente, coste):
+        """Cubo de tokens del cliente; una petición más cara que la ráfaga lo vacía pero puede pasar."""
+        ahora = time.monotonic()
+        cubo = self._cubos.pop(cliente, None)
+        tokens = self.rafaga if cubo is None else min(self.rafaga, cubo[0] + (ahora - cubo[1]) * self.tasa)
+        coste = min(coste, self.rafaga)
+        admitida = tokens >= coste
+        if admitida:
+            tokens -= coste
+        self._cubos[cliente] = (tokens, ahora)
+        if len(self._cubos) > MAX_CLIENTES:
+            self._cubos.popitem(last=False)
+        return admitida
+
+    def liberar(self, coste, clase=None, latencia=None):
+        """Fin de una petición admitida; con `clase` y `latencia` (solo si terminó bien) ajusta el límite."""
+        with self._lock:
+            self.en_curso -= coste
+            self.peticiones -= 1
+            if clase is not None:
+                self._ajustar(clase, latencia, coste)
+
+    def _latencia_vigente(self, clase):
+        """Latencia suavizada de la clase; 0 si no hay o si hace mucho que no termina ninguna (para volver a medirla)."""
+        suavizada, _, instante = self._latencias.get(clase, (0, 0, 0))
+        return suavizada if time.monotonic() - instante < VIGENCIA_LATENCIA else 0
+
+    def _ajustar(self, clase, latencia, coste):
+        suavizada, base, _ = self._latencias.get(clase, (latencia, latencia, 0))
+        suavizada += SUAVIZADO_LATENCIA * (latencia - suavizada)
+        # mínima de la latencia suavizada, no de cada muestra: un pico aislado no cuenta como cola
+        base = min(base * (1 + DERIVA_BASE), suavizada)
+        self._latencias[clase] = (suavizada, base, time.monotonic())
+        if not self.adaptativo:
+            return
+        gradiente = min(1.0, TOLERANCIA * base / suavizada)
+        nuevo = self.limite * gradiente + math.sqrt(self.limite)
+        if self.en_curso + coste < self.limite / 2:
+            nuevo = min(nuevo, self.limite)  # solo crece si el límite se está usando
+        self.limite += SUAVIZADO_LIMITE * (nuevo - self.limite)
+        self.limite = max(LIMITE_MINIMO, min(self.maximo, self.limite))
+
+    def clase(self, metodo, request, coste):
+        """Clase de latencia de una petición: operación (o método) y orden de magnitud del coste."""
+        return getattr(request, "op", metodo), int(coste).bit_length()
+
+    def contadores(self):
+        return {"limite": round(self.limite, 2), "en_curso": round(self.en_curso, 2), "admitidas": self.admitidas,
+                "rechazadas_limite": self.rechazadas["limite"], "rechazadas_tasa": self.rechazadas["tasa"],
+                "rechazadas_plazo": self.rechazadas["plazo"]}
+
+
+def _mensaje(motivo):
+    if motivo == "tasa":
+        return "Tasa de peticiones del cliente superada"
+    if motivo == "plazo":
+        return "No queda plazo para atender la petición a tiempo"
+    return "Coordinador saturado: reintentar más tarde"
+
+
+def _envolver_si_procede(interceptor, handler, ruta):
+    metodo = ruta.rsplit("/", 1)[-1]
+    if metodo in METODOS and handler.unary_unary:
+        return interceptor._envolver(handler, metodo)
+    if metodo in METODOS_FLUJO and handler.stream_stream:
+        return interceptor._envolver_flujo(handler)
+    return handler
+
+
+class InterceptorAdmision(grpc.ServerInterceptor):
+    """Aplica un ControlAdmision a CalculoTotal, CalculoBatch y los streams en el servidor síncrono."""
+
+    def __init__(self, admision):
+        self.admision = admision
+        self._handlers = {}
+
+    def intercept_service(self, continuation, handler_call_details):
+        envuelto = self._handlers.get(handler_call_details.method)
+        if envuelto is None:
+            handler = continuation(handler_call_details)
+            if handler is None:
+                return None
+            envuelto = self._handlers[handler_call_details.method] = _envolver_si_procede(
+                self, handler, handler_call_details.method)
+        return envuelto
+
+    def _envolver(self, handler, metodo):
+        comportamiento = handler.unary_unary
+        admision = self.admision
+
+        def unario(request, context):
+            coste = admision.coste(request)
+            clase = admision.clase(metodo, request, coste)
+            motivo = admision.admitir(cliente_de(context), coste, clase, context.time_remaining())
+            if motivo is not None:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, _mensaje(motivo))
+            t0 = time.perf_counter()
+            terminada = False
+            try:
+                response = comportamiento(request, context)
+                terminada = True
+                return response
+            finally:
+                admision.liberar(coste, clase if terminada else None, time.perf_counter() - t0)
+
+        return grpc.unary_unary_rpc_method_handler(unario, request_deserializer=handler.request_deserializer,
+                                                   response_serializer=handler.response_serializer)
+
+    def _envolver_flujo(self, handler):
+        comportamiento = handler.stream_stream
+        admision = self.admision
+
+        def flujo(request_iterator, context):
+            motivo = admision.admitir(cliente_de(context), COSTE_FLUJO)
+            if motivo is not None:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, _mensaje(motivo))
+            try:
+                yield from comportamiento(request_iterator, context)
+            finally:
+                admision.liberar(COSTE_FLUJO)
+
+        return grpc.stream_stream_rpc_method_handler(flujo, request_deserializer=handler.request_deserializer,
+                                                     response_serializer=handler.response_serializer)
+
+
+class InterceptorAdmisionAio(grpc.aio.ServerInterceptor):
+    """Versión aio de InterceptorAdmision."""
+
+    def __init__(self, admision):
+        self.admision = admision
+        self._handlers = {}
+
+    async def intercept_service(self, continuation, handler_call_details):
+        envuelto = self._handlers.get(handler_call_details.method)
+        if envuelto is None:
+            handler = await continuation(handler_call_details)
+            if handler is None:
+                return None
+            envuelto = self._handlers[handler_call_details.method] = _envolver_si_procede(
+                self, handler, handler_call_details.method)
+        return envuelto
+
+    def _envolver(self, handler, metodo):
+        comportamiento = handler.unary_unary
+        admision = self.admision
+
+        async def unario(request, context):
+            coste = admision.coste(request)
+            clase = admision.clase(metodo, request, coste)
+            motivo = admision.admitir(cliente_de(context), coste, clase, context.time_remaining())
+            if motivo is not None:
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, _mensaje(motivo))
+            t0 = time.perf_counter()
+            terminada = False
+            try:
+                response = await comportamiento(request, context)
+                terminada = True
+                return response
+            finally:
+                admision.liberar(coste, clase if terminada else None, time.perf_counter() - t0)
+
+        return grpc.unary_unary_rpc_method_handler(unario, request_deserializer=handler.request_deserializer,
+                                                   response_serializer=handler.response_serializer)
+
+    def _envolver_flujo(self, handler):
+        comportamiento = handler.stream_stream
+        admision = self.admision
+
+        async def flujo(request_iterator, context):
+            motivo = admision.admitir(cliente_de(context), COSTE_FLUJO)
+            if motivo is not None:
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, _mensaje(motivo))
+            try:
+                async for response in comportamiento(request_iterator, context):
+                    yield response
+            finally:
+                admision.liberar(COSTE_FLUJO)
+
+        return grpc.stream_stream_rpc_method_handler(flujo, request_deserializer=handler.request_deserializer,
+                                                     response_serializer=handler.response_serializer)
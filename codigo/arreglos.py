@@ -0,0 +1,156 @@
+"""
+Operaciones básicas elemento a elemento sobre vectores empaquetados (CalculoArray).
+
+Un ArrayRequest lleva los operandos como `bytes` little-endian con el dtype declarado
+("float64" o "int64"), no como un CalculoRequest por elemento: el worker los lee con
+np.frombuffer, sin copiarlos ni crear un float de Python por elemento. Un vector que no
+cabe en un mensaje de gRPC (4 MiB por defecto) viaja en trozos de TAM_TROZO bytes por
+operando, cada uno con su `desplazamiento` en bytes; el resultado vuelve igual, en
+ArrayChunk con el desplazamiento del trozo.
+
+- add, sub y mul conservan el dtype (en int64 desbordan con aritmética módulo 2^64, como numpy);
+  div siempre da float64.
+- Un divisor 0 hace fallar el trozo con ok=False y la posición del elemento, como en la
+  vía escalar; no se devuelven inf ni nan.
+
+Con el runtime upb de protobuf, leer o asignar un campo `bytes` lo copia: cada campo se
+lee una sola vez por mensaje y a partir de ahí todo son vistas (np.frombuffer, memoryview).
+"""
+import array
+import sys
+
+import calculo_pb2
+from operaciones import OPS_BASICAS, np
+
+DTYPES = {"float64": "<f8", "int64": "<i8"}
+TAMANO_ELEMENTO = 8           # bytes por elemento en los dos dtypes (también en el resultado)
+TAM_TROZO = 1 << 20           # bytes por operando en cada mensaje: a + b caben de sobra en 4 MiB
+TAM_FRAGMENTO = 256 << 10     # bytes por operando que el coordinador envía como mucho a un worker
+_CODIGOS_ARRAY = {"float64": "d", "int64": "q"}  # sin numpy, con el módulo array
+
+
+def validar(op, dtype, bytes_a, bytes_b):
+    """Lanza ValueError si la operación, el dtype o los tamaños de los operandos no valen."""
+    if op not in OPS_BASICAS:
+        raise ValueError(f"Operación no soportada: {op}")
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype no soportado: {dtype!r} (válidos: {', '.join(DTYPES)})")
+    if bytes_a != bytes_b:
+        raise ValueError("Los operandos a y b tienen distinto tamaño")
+    if bytes_a % TAMANO_ELEMENTO:
+        raise ValueError(f"El tamaño de los operandos no es múltiplo de {TAMANO_ELEMENTO} bytes")
+
+
+def dtype_resultado(op, dtype):
+    return "float64" if op == "div" else dtype
+
+
+def _calcular_numpy(op, dtype, datos_a, datos_b):
+    a = np.frombuffer(datos_a, dtype=DTYPES[dtype])
+    b = np.frombuffer(datos_b, dtype=DTYPES[dtype])
+    if op == "div":
+        ceros = np.flatnonzero(b == 0)
+        if len(ceros):
+            return int(ceros[0]), None
+        return None, np.true_divide(a, b, dtype=np.float64).astype("<f8", copy=False).tobytes()
+    with np.errstate(over="ignore"):
+        ufunc = {"add": np.add, "sub": np.subtract, "mul": np.multiply}[op]
+        return None, ufunc(a, b).tobytes()
+
+
+def _calcular_array(op, dtype, datos_a, datos_b):
+    """Elemento a elemento con el módulo array (sin numpy)."""
+    a = array.array(_CODIGOS_ARRAY[dtype], datos_a)
+    b = array.array(_CODIGOS_ARRAY[dtype], datos_b)
+    if sys.byteorder == "big":
+        a.byteswap()
+        b.byteswap()
+    if op == "div":
+        if 0 in b:
+            return b.index(0), None
+        resultado = array.array("d", (float(x) / float(y) for x, y in zip(a, b)))  # como numpy con int64
+    elif dtype == "int64":  # módulo 2^64, como numpy
+        fn = {"add": int.__add__, "sub": int.__sub__, "mul": int.__mul__}[op]
+        resultado = array.array("q", ((fn(x, y) + 2 ** 63) % 2 ** 64 - 2 ** 63 for x, y in zip(a, b)))
+    else:
+        fn = {"add": float.__add__, "sub": float.__sub__, "mul": float.__mul__}[op]
+        resultado = array.array("d", (fn(x, y) for x, y in zip(a, b)))
+    if sys.byteorder == "big":
+        resultado.byteswap()
+    return None, resultado.tobytes()
+
+
+def calcular_arreglo(op, dtype, datos_a, datos_b, desplazamiento=0):
+    """
+    Evalúa op elemento a elemento sobre los operandos empaquetados y devuelve un ArrayChunk
+    con el mismo desplazamiento (ok=False si la petición no vale o hay un divisor 0).
+    """
+    try:
+        validar(op, dtype, len(datos_a), len(datos_b))
+    except ValueError as e:
+        return calculo_pb2.ArrayChunk(ok=False, error=str(e), desplazamiento=desplazamiento)
+    calcular = _calcular_array if np is None else _calcular_numpy
+    cero, datos = calcular(op, dtype, datos_a, datos_b)
+    if cero is not None:
+        posicion = desplazamiento // TAMANO_ELEMENTO + cero
+        return calculo_pb2.ArrayChunk(ok=False, error=f"División por cero en el elemento {posicion}",
+                                      desplazamiento=desplazamiento)
+    return calculo_pb2.ArrayChunk(ok=True, dtype=dtype_resultado(op, dtype), datos=datos,
+                                  desplazamiento=desplazamiento)
+
+
+def fragmentos(tamano, num_workers, tam_fragmento=TAM_FRAGMENTO):
+    """
+    Cortes [(inicio, fin), ...] en bytes de un trozo de `tamano` bytes por operando, alineados
+    a elementos: como mucho tam_fragmento bytes cada uno y, si hay elementos, al menos uno por worker.
+    """
+    elementos = tamano // TAMANO_ELEMENTO
+    partes = max(-(-tamano // tam_fragmento), min(num_workers, elementos), 1)
+    base, extra = divmod(elementos, partes)
+    cortes = []
+    inicio = 0
+    for i in range(partes):
+        fin = inicio + (base + (i < extra)) * TAMANO_ELEMENTO
+        cortes.append((inicio, fin))
+        inicio = fin
+    return cortes
+
+
+def fragmentar(trozo, datos_a, datos_b, num_workers, tam_fragmento=TAM_FRAGMENTO):
+    """
+    Subpeticiones [(inicio, fin, ArrayRequest), ...] de un trozo del cliente, cortado por
+    desplazamiento (`datos_a` y `datos_b` son sus operandos, ya leídos). Si cabe en un
+    solo fragmento se reenvía el propio trozo, sin copiar sus bytes.
+    """
+    cortes = fragmentos(len(datos_a), num_workers, tam_fragmento)
+    if len(cortes) == 1:
+        return [(0, len(datos_a), trozo)]
+    return [(inicio, fin, calculo_pb2.ArrayRequest(op=trozo.op, dtype=trozo.dtype, a=datos_a[inicio:fin],
+                                                   b=datos_b[inicio:fin], id=trozo.id,
+                                                   desplazamiento=trozo.desplazamiento + inicio))
+            for inicio, fin in cortes]
+
+
+def peticiones_arreglo(op, a, b, tam_trozo=TAM_TROZO, id=""):
+    """ArrayRequest de a op b (arrays de numpy del mismo dtype y forma) en trozos de tam_trozo bytes."""
+    dtype = str(a.dtype)
+    datos_a = memoryview(np.ascontiguousarray(a, dtype=DTYPES.get(dtype))).cast("B")
+    datos_b = memoryview(np.ascontiguousarray(b, dtype=DTYPES.get(dtype))).cast("B")
+    paso = max(TAMANO_ELEMENTO, tam_trozo - tam_trozo % TAMANO_ELEMENTO)
+    for inicio in range(0, max(len(datos_a), 1), paso):
+        yield calculo_pb2.ArrayRequest(op=op, dtype=dtype, a=bytes(datos_a[inicio:inicio + paso]),
+                                       b=bytes(datos_b[inicio:inicio + paso]), desplazamiento=inicio, id=id)
+
+
+def unir_trozos(chunks, elementos):
+    """Vector de `elementos` a partir de los ArrayChunk de una respuesta; ValueError si alguno trae error."""
+    resultado = None
+    for chunk in chunks:
+        if not chunk.ok:
+            raise ValueError(chunk.error)
+        if resultado is None:
+            resultado = np.empty(elementos, dtype=DTYPES[chunk.dtype])
+        datos = chunk.datos
+        inicio = chunk.desplazamiento // TAMANO_ELEMENTO
+        resultado[inicio:inicio + len(datos) // TAMANO_ELEMENTO] = np.frombuffer(datos, dtype=resultado.dtype)
+    return resultado if resultado is not None else np.empty(0)
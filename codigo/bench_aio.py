@@ -0,0 +1,63 @@
+"""
+Benchmark: coordinador con hilos vs. coordinador grpc.aio bajo muchos clientes concurrentes.
+
+Lanza workers con latencia artificial (--retardo-ms) y un coordinador de cada tipo;
+1000 clientes asíncronos hacen peticiones `add` en bucle cerrado. Informa throughput
+y latencias p50/p99.
+
+Uso: python bench_aio.py [clientes] [segundos] [retardo_ms]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import workers_locales, coordinador_local
+
+
+async def carga(addr, clientes, segundos):
+    latencias = []
+    errores = 0
+    async with grpc.aio.insecure_channel(addr) as channel:
+        stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+        await stub.CalculoTotal(calculo_pb2.CalculoRequest(op="add", a=1, b=1))  # calentamiento
+        fin = time.perf_counter() + segundos
+
+        async def cliente(i):
+            nonlocal errores
+            request = calculo_pb2.CalculoRequest(op="add", a=i, b=1)
+            while time.perf_counter() < fin:
+                t0 = time.perf_counter()
+                try:
+                    await stub.CalculoTotal(request, timeout=30)
+                    latencias.append(time.perf_counter() - t0)
+                except grpc.aio.AioRpcError:
+                    errores += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(cliente(i) for i in range(clientes)))
+        duracion = time.perf_counter() - t0
+    cuantiles = statistics.quantiles(latencias, n=100)
+    return len(latencias) / duracion, cuantiles[49] * 1000, cuantiles[98] * 1000, errores
+
+
+def main():
+    clientes = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    retardo = sys.argv[3] if len(sys.argv) > 3 else "20"
+
+    print(f"{clientes} clientes concurrentes, {segundos:g} s, workers con {retardo} ms de latencia")
+    print(f"{'servidor':>10} {'ops/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'errores':>8}")
+    with workers_locales(2, "--servidor", "aio", "--retardo-ms", retardo) as workers:
+        for modo in ("hilos", "aio"):
+            with coordinador_local(workers, "--servidor", modo) as addr:
+                ops, p50, p99, errores = asyncio.run(carga(addr, clientes, segundos))
+            print(f"{modo:>10} {ops:>10.0f} {p50:>10.1f} {p99:>10.1f} {errores:>8}")
+
+
+if __name__ == "__main__":
+    main()
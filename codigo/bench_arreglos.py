@@ -0,0 +1,144 @@
+"""
+Benchmark: vectores empaquetados (CalculoArray) frente a la vía escalar (CalculoTotal y CalculoBatch).
+
+Suma dos vectores float64 de N elementos a través del coordinador con W workers:
+- escalar: un CalculoTotal por elemento (sobre una muestra, es muy lento);
+- lote: CalculoBatch de 1000 CalculoRequest (sobre una muestra mayor);
+- arreglo: CalculoArray con el vector entero, en trozos de 1 MiB por operando; con
+  N = 4M el resultado (32 MB) no cabría en un mensaje de gRPC.
+Cada vía usa un coordinador recién arrancado y comprueba el resultado. Muestra
+elementos/s, bytes en el cable por elemento (cliente ↔ coordinador), el pico de memoria
+de Python del cliente por elemento (tracemalloc, en una segunda pasada) y cuánto crece
+el pico de memoria residente del coordinador (VmHWM).
+
+Uso: python bench_arreglos.py [elementos] [workers]
+"""
+import contextlib
+import sys
+import time
+import tracemalloc
+
+import grpc
+import numpy as np
+
+import calculo_pb2
+import calculo_pb2_grpc
+from arreglos import peticiones_arreglo, unir_trozos
+from bench_util import esperar_puerto, lanzar_proceso, puertos_libres, workers_locales
+
+MUESTRA_ESCALAR = 2_000
+MUESTRA_LOTE = 200_000
+TAM_LOTE = 1_000
+
+
+def memoria_pico_mb(pid):
+    """Pico de memoria residente (VmHWM) del proceso, en MB; None si no hay /proc."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+@contextlib.contextmanager
+def coordinador_medido(workers):
+    """Como bench_util.coordinador_local, pero produce también el proceso para medir su memoria."""
+    (puerto,) = puertos_libres(1)
+    proc = lanzar_proceso("calc_server_grpc.py", puerto, *workers, "--fanout", "concurrente", "--sondeo", 0,
+                          "--log-muestreo", 0)
+    addr = f"127.0.0.1:{puerto}"
+    try:
+        esperar_puerto(addr)
+        yield addr, proc
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def escalar(stub, a, b):
+    """Un CalculoTotal por elemento. Retorna (resultado, bytes en el cable)."""
+    resultado = []
+    cable = 0
+    for x, y in zip(a.tolist(), b.tolist()):
+        request = calculo_pb2.CalculoRequest(op="add", a=x, b=y)
+        response = stub.CalculoTotal(request)
+        resultado.append(response.result)
+        cable += request.ByteSize() + response.ByteSize()
+    return np.array(resultado), cable
+
+
+def lote(stub, a, b):
+    """CalculoBatch de TAM_LOTE elementos."""
+    resultado = []
+    cable = 0
+    for inicio in range(0, len(a), TAM_LOTE):
+        request = calculo_pb2.CalculoBatchRequest(items=[
+            calculo_pb2.CalculoRequest(op="add", a=x, b=y)
+            for x, y in zip(a[inicio:inicio + TAM_LOTE].tolist(), b[inicio:inicio + TAM_LOTE].tolist())])
+        response = stub.CalculoBatch(request)
+        resultado.extend(item.result for item in response.items)
+        cable += request.ByteSize() + response.ByteSize()
+    return np.array(resultado), cable
+
+
+def arreglo(stub, a, b):
+    """CalculoArray con el vector entero."""
+    cable = [0]
+
+    def enviadas():
+        for request in peticiones_arreglo("add", a, b):
+            cable[0] += request.ByteSize()
+            yield request
+
+    def recibidas():
+        for chunk in stub.CalculoArray(enviadas()):
+            cable[0] += chunk.ByteSize()
+            yield chunk
+
+    return unir_trozos(recibidas(), len(a)), cable[0]
+
+
+def medir(via, workers, a, b):
+    """(elementos/s, bytes por elemento, bytes de Python del cliente por elemento, MB que crece el coordinador)."""
+    with coordinador_medido(workers) as (addr, proc), grpc.insecure_channel(addr) as channel:
+        stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+        via(stub, a[:100], b[:100])  # calentar canales y workers
+        base = memoria_pico_mb(proc.pid)
+        t0 = time.perf_counter()
+        resultado, cable = via(stub, a, b)
+        segundos = time.perf_counter() - t0
+        crecimiento = memoria_pico_mb(proc.pid) - base if base is not None else float("nan")
+        if not np.array_equal(resultado, a + b):
+            raise SystemExit(f"❌ {via.__name__}: el resultado no coincide con a + b")
+        tracemalloc.start()
+        via(stub, a, b)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return len(a) / segundos, cable / len(a), pico / len(a), crecimiento
+
+
+def main():
+    elementos = int(sys.argv[1]) if len(sys.argv) > 1 else 4_000_000
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    rng = np.random.default_rng(1)
+    a = rng.standard_normal(elementos)
+    b = rng.standard_normal(elementos)
+
+    print(f"add de dos vectores float64 con {num_workers} workers; vector de {elementos:,} elementos "
+          f"({a.nbytes / 1e6:.0f} MB por operando)")
+    print(f"{'vía':>9} {'elementos':>10} {'elem/s':>12} {'cable B/elem':>13} {'cliente B/elem':>15} "
+          f"{'coordinador +MB':>16}")
+    with workers_locales(num_workers, "--log-muestreo", 0) as workers:
+        base = None
+        for via, n in ((escalar, MUESTRA_ESCALAR), (lote, MUESTRA_LOTE), (arreglo, elementos)):
+            n = min(n, elementos)
+            por_segundo, cable, cliente, coordinador = medir(via, workers, a[:n], b[:n])
+            base = base or por_segundo
+            print(f"{via.__name__:>9} {n:>10,} {por_segundo:>12,.0f} {cable:>13.1f} {cliente:>15.1f} "
+                  f"{coordinador:>16.1f}   ×{por_segundo / base:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
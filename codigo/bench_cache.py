@@ -0,0 +1,73 @@
+"""
+Benchmark: caché de resultados del coordinador con una mezcla de peticiones Zipf.
+
+Varios clientes concurrentes piden sum_squares(n) con n sacado de un catálogo de
+valores distintos según una distribución Zipf (unos pocos n muy repetidos y una
+cola larga). Se compara el coordinador sin caché con una caché pequeña y otra
+que cabe todo el catálogo, e informa throughput, latencia p50/p99 y contadores
+de aciertos, fallos y peticiones agrupadas.
+
+Uso: python bench_cache.py [peticiones] [catalogo] [s_zipf]
+"""
+import random
+import statistics
+import sys
+import time
+from concurrent import futures
+
+import calculo_pb2
+from calc_server_grpc import CalculoService
+from bench_util import workers_locales, silencio
+
+CLIENTES = 8
+
+
+def mezcla_zipf(peticiones, catalogo, s, semilla=1):
+    """Lista de n para sum_squares: el k-ésimo valor del catálogo sale con probabilidad ∝ 1/k^s."""
+    rng = random.Random(semilla)
+    valores = [200_000 + 1_000 * k for k in range(catalogo)]
+    pesos = [1 / (k + 1) ** s for k in range(catalogo)]
+    return rng.choices(valores, weights=pesos, k=peticiones)
+
+
+def carga(servicio, ns):
+    latencias = []
+
+    def pedir(n):
+        t0 = time.perf_counter()
+        servicio.CalculoTotal(calculo_pb2.CalculoRequest(op="sum_squares", n=n), None)
+        latencias.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with futures.ThreadPoolExecutor(CLIENTES) as ejecutor:
+        list(ejecutor.map(pedir, ns))
+    duracion = time.perf_counter() - t0
+    cuantiles = statistics.quantiles(latencias, n=100)
+    return len(ns) / duracion, cuantiles[49] * 1000, cuantiles[98] * 1000
+
+
+def main():
+    peticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    catalogo = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    s = float(sys.argv[3]) if len(sys.argv) > 3 else 1.1
+    ns = mezcla_zipf(peticiones, catalogo, s)
+
+    print(f"{peticiones} peticiones sum_squares, {catalogo} valores de n distintos, Zipf s={s:g}, "
+          f"{CLIENTES} clientes")
+    print(f"{'caché':>10} {'ops/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} "
+          f"{'aciertos':>9} {'fallos':>7} {'agrupadas':>10} {'expulsadas':>11}")
+    # motor "bucle" para que cada cálculo distribuido tenga un coste realista
+    with workers_locales(2, "--motor", "bucle") as workers:
+        for capacidad in (0, catalogo // 10, catalogo):
+            servicio = CalculoService(workers, fanout="concurrente", cache=capacidad)
+            with silencio():
+                ops, p50, p99 = carga(servicio, ns)
+            c = servicio.cache.contadores() if servicio.cache else {}
+            print(f"{capacidad or 'sin':>10} {ops:>10.1f} {p50:>10.1f} {p99:>10.1f} "
+                  f"{c.get('aciertos', '-'):>9} {c.get('fallos', '-'):>7} "
+                  f"{c.get('agrupadas', '-'):>10} {c.get('expulsadas', '-'):>11}")
+            servicio.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Generador de carga no interactivo: mide el sistema con una mezcla de operaciones y deja el resultado en JSON.
+
+Levanta --workers workers y un coordinador en subprocesos (o usa uno ya en marcha con
+--coordinador) y lanza la mezcla de --mezcla contra la RPC de --rpc (CalculoTotal,
+CalculoBatch o CalculoStream):
+- bucle cerrado (--concurrencia C): C clientes que esperan cada respuesta antes de
+  enviar la siguiente (en el stream, C peticiones sin respuesta como mucho);
+- bucle abierto (--tasa R): R peticiones/s a ritmo fijo, pase lo que pase con las
+  anteriores. La latencia se cuenta desde el instante en que tocaba enviar, así un
+  emisor que se retrasa no esconde la cola.
+`--matar T` mata (SIGKILL) un worker a los T s de medición; se puede repetir.
+
+La salida es un JSON con throughput, latencias p50/p95/p99/p999, errores por código,
+el desglose por operación y ventanas de 1 s. Con `--comparar base.json` el script
+termina con código 1 si el throughput baja o el p99 sube más de --tolerancia
+respecto a esa base: sirve como comprobación de regresiones.
+
+Ejemplos:
+  python bench_carga.py --workers 3 --concurrencia 16 --segundos 10 --salida base.json
+  python bench_carga.py --tasa 400 --mezcla add=8,div=1,sum_squares=1 --matar 5
+  python bench_carga.py --rpc stream --concurrencia 128 --comparar base.json
+  python bench_carga.py --coordinador localhost:5000 --rpc lote --tam-lote 100
+"""
+import argparse
+import collections
+import contextlib
+import itertools
+import json
+import random
+import shlex
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import coordinador_local, percentiles, workers_con_procesos
+from reducciones import REDUCCIONES
+
+OPS = ("add", "sub", "mul", "div", *REDUCCIONES)
+# parámetros fijos de las reducciones que los necesitan; todas van sobre 1..n
+PARAMETROS_REDUCCION = {"sum_powers": {"k": 3}, "poly_sum": {"coeficientes": (1, 2, 3)},
+                        "prod_mod": {"modulo": 1_000_000_007}}
+RPCS = ("total", "lote", "stream")
+ERROR_OPERACION = "ERROR_OPERACION"  # la RPC fue bien pero la respuesta trae ok=false
+# opciones que deben coincidir con las de la base para que la comparación tenga sentido
+CLAVES_COMPARABLES = ("workers", "opciones_worker", "opciones_coordinador", "rpc", "mezcla", "n", "tam_lote",
+                      "concurrencia", "tasa", "segundos")
+
+
+def leer_mezcla(texto):
+    """'add=4,sum_squares=1' -> {"add": 4.0, "sum_squares": 1.0}; sin peso, cuenta 1."""
+    mezcla = {}
+    for parte in texto.split(","):
+        op, _, peso = parte.partition("=")
+        op = op.strip()
+        if op not in OPS:
+            raise argparse.ArgumentTypeError(f"operación desconocida: {op!r} (válidas: {', '.join(OPS)})")
+        mezcla[op] = float(peso or 1)
+    if sum(mezcla.values()) <= 0:
+        raise argparse.ArgumentTypeError("la mezcla no tiene ninguna operación con peso")
+    return mezcla
+
+
+class Mezcla:
+    """Peticiones aleatorias (reproducibles con la semilla) según los pesos de cada operación."""
+
+    def __init__(self, pesos, n, semilla):
+        self.ops = list(pesos)
+        self.pesos = list(pesos.values())
+        self.n = n
+        self._rng = random.Random(semilla)
+        self._lock = threading.Lock()
+
+    def peticion(self, i):
+        with self._lock:
+            op = self._rng.choices(self.ops, self.pesos)[0]
+            a, b = self._rng.uniform(1, 100), self._rng.uniform(1, 100)  # b > 0: sin divisiones por cero
+        if op in REDUCCIONES:
+            return op, calculo_pb2.CalculoRequest(op=op, n=self.n, id=str(i), **PARAMETROS_REDUCCION.get(op, {}))
+        return op, calculo_pb2.CalculoRequest(op=op, a=a, b=b, id=str(i))
+
+
+class Registro:
+    """Resultados de la carga: latencias por operación, errores por código y ventanas de 1 s."""
+
+    def __init__(self, inicio):
+        self.inicio = inicio
+        self.enviadas = 0
+        self.operaciones = 0   # en un lote, cada item cuenta
+        self.latencias = collections.defaultdict(list)
+        self.errores = collections.Counter()
+        self.ventanas = collections.defaultdict(lambda: [0, 0])  # segundo -> [ok, errores]
+        self.muertes = []
+        self._lock = threading.Lock()
+
+    def enviada(self):
+        with self._lock:
+            self.enviadas += 1
+
+    def anotar(self, etiqueta, t0, codigo, operaciones=1):
+        """Una respuesta: `codigo` es None si fue bien, o el nombre del error."""
+        t1 = time.perf_counter()
+        with self._lock:
+            ventana = self.ventanas[int(t1 - self.inicio)]
+            if codigo is None:
+                self.latencias[etiqueta].append(t1 - t0)
+                self.operaciones += operaciones
+                ventana[0] += 1
+            else:
+                self.errores[codigo] += 1
+                ventana[1] += 1
+
+    def resumen(self, segundos):
+        todas = list(itertools.chain.from_iterable(self.latencias.values()))
+        return {
+            "enviadas": self.enviadas,
+            "ok": len(todas),
+            "errores": dict(self.errores),
+            "throughput": round(len(todas) / segundos, 2),
+            "operaciones_s": round(self.operaciones / segundos, 2),
+            "latencia_ms": percentiles(todas),
+            "por_op": {op: {"ok": len(lat), "latencia_ms": percentiles(lat)}
+                       for op, lat in sorted(self.latencias.items())},
+            "ventanas": [{"t": t, "ok": ok, "errores": errores}
+                         for t, (ok, errores) in sorted(self.ventanas.items()) if t < segundos],
+            "muertes": self.muertes,
+        }
+
+
+class Carga:
+    """Construye las peticiones de la RPC elegida y las envía en bucle cerrado o abierto."""
+
+    def __init__(self, stub, rpc, mezcla, tam_lote, timeout):
+        self.stub = stub
+        self.rpc = rpc
+        self.mezcla = mezcla
+        self.tam_lote = tam_lote
+        self.timeout = timeout
+
+    def peticion(self, i):
+        """(etiqueta, request, operaciones) de la petición número i."""
+        if self.rpc != "lote":
+            op, request = self.mezcla.peticion(i)
+            return op, request, 1
+        items = [self.mezcla.peticion(i * self.tam_lote + j)[1] for j in range(self.tam_lote)]
+        return "lote", calculo_pb2.CalculoBatchRequest(items=items), len(items)
+
+    def _metodo(self):
+        return self.stub.CalculoBatch if self.rpc == "lote" else self.stub.CalculoTotal
+
+    def _codigo(self, response):
+        items = response.items if self.rpc == "lote" else (response,)
+        return None if all(it.ok for it in items) else ERROR_OPERACION
+
+    def cerrado(self, registro, fin, concurrencia):
+        if self.rpc == "stream":
+            return self._stream(registro, fin, concurrencia=concurrencia)
+        metodo = self._metodo()
+
+        def cliente(h):
+            for i in itertools.count(h, concurrencia):
+                if time.perf_counter() >= fin:
+                    return
+                etiqueta, request, operaciones = self.peticion(i)
+                registro.enviada()
+                t0 = time.perf_counter()
+                try:
+                    codigo = self._codigo(metodo(request, timeout=self.timeout))
+                except grpc.RpcError as e:
+                    codigo = e.code().name
+                registro.anotar(etiqueta, t0, codigo, operaciones)
+
+        with futures.ThreadPoolExecutor(concurrencia) as clientes:
+            list(clientes.map(cliente, range(concurrencia)))
+
+    def abierto(self, registro, fin, tasa):
+        if self.rpc == "stream":
+            return self._stream(registro, fin, tasa=tasa)
+        metodo = self._metodo()
+        inicio = time.perf_counter()
+        pendientes = []
+
+        def terminada(future, etiqueta, t0, operaciones):
+            codigo = future.code()
+            if codigo == grpc.StatusCode.OK:
+                registro.anotar(etiqueta, t0, self._codigo(future.result()), operaciones)
+            else:
+                registro.anotar(etiqueta, t0, codigo.name)
+
+        for i in itertools.count():
+            programada = inicio + i / tasa
+            if programada >= fin:
+                break
+            if programada > time.perf_counter():
+                time.sleep(programada - time.perf_counter())
+            etiqueta, request, operaciones = self.peticion(i)
+            registro.enviada()
+            future = metodo.future(request, timeout=self.timeout)
+            future.add_done_callback(lambda f, e=etiqueta, t0=programada, n=operaciones: terminada(f, e, t0, n))
+            pendientes.append(future)
+        for future in pendientes:  # esperar a que terminen o venzan todas
+            future.exception()
+
+    def _stream(self, registro, fin, concurrencia=None, tasa=None):
+        """Un CalculoStream; las respuestas se emparejan con su petición por el `id`."""
+        hueco = threading.Semaphore(concurrencia) if concurrencia else None
+        en_vuelo = {}
+        lock = threading.Lock()
+        inicio = time.perf_counter()
+
+        def peticiones():
+            for i in itertools.count():
+                if tasa:
+                    t0 = inicio + i / tasa
+                    if t0 > time.perf_counter():
+                        time.sleep(t0 - time.perf_counter())
+                else:
+                    hueco.acquire()
+                    t0 = time.perf_counter()
+                if t0 >= fin:
+                    return
+                etiqueta, request, _ = self.peticion(i)
+                with lock:
+                    en_vuelo[request.id] = (etiqueta, t0)
+                registro.enviada()
+                yield request
+
+        try:
+            for response in self.stub.CalculoStream(peticiones(), timeout=fin - inicio + self.timeout):
+                with lock:
+                    etiqueta, t0 = en_vuelo.pop(response.id)
+                registro.anotar(etiqueta, t0, None if response.ok else ERROR_OPERACION)
+                if hueco is not None:
+                    hueco.release()
+        except grpc.RpcError as e:
+            with lock:
+                perdidas, en_vuelo = list(en_vuelo.values()), {}
+            for etiqueta, t0 in perdidas:
+                registro.anotar(etiqueta, t0, e.code().name)
+
+
+def programar_muertes(procesos, instantes, inicio, registro):
+    """Un Timer por instante (s desde `inicio`); cada uno mata el siguiente worker de la lista."""
+    victimas = iter(list(procesos.items()))
+
+    def matar():
+        direccion, proceso = next(victimas, (None, None))
+        if proceso is not None:
+            proceso.kill()
+            registro.muertes.append({"t": round(time.perf_counter() - registro.inicio, 3), "worker": direccion})
+            print(f"💀 worker {direccion} eliminado", file=sys.stderr)
+
+    temporizadores = [threading.Timer(max(0.0, inicio + t - time.perf_counter()), matar) for t in sorted(instantes)]
+    for temporizador in temporizadores:
+        temporizador.start()
+    return temporizadores
+
+
+def medir(carga, args, procesos):
+    """Calentamiento (descartado) y medición; retorna el resumen de la medición."""
+    if args.calentamiento > 0:
+        descartado = Registro(time.perf_counter())
+        lanzar(carga, args, descartado, time.perf_counter() + args.calentamiento)
+    registro = Registro(time.perf_counter())
+    temporizadores = programar_muertes(procesos, args.matar, registro.inicio, registro)
+    lanzar(carga, args, registro, registro.inicio + args.segundos)
+    for temporizador in temporizadores:
+        temporizador.cancel()
+    return registro.resumen(args.segundos)
+
+
+def lanzar(carga, args, registro, fin):
+    if args.tasa:
+        carga.abierto(registro, fin, args.tasa)
+    else:
+        carga.cerrado(registro, fin, args.concurrencia)
+
+
+def comparar(actual, base, tolerancia):
+    """Regresiones de `actual` frente a `base`: throughput que baja o p99 que sube más de `tolerancia`."""
+    regresiones = []
+    if actual["throughput"] < base["throughput"] * (1 - tolerancia):
+        regresiones.append(f"throughput {base['throughput']:.1f} -> {actual['throughput']:.1f} peticiones/s")
+    p99, p99_base = actual["latencia_ms"].get("p99"), base["latencia_ms"].get("p99")
+    if p99 is not None and p99_base is not None and p99 > p99_base * (1 + tolerancia):
+        regresiones.append(f"p99 {p99_base:.1f} -> {p99:.1f} ms")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--coordinador", help="host:puerto de un coordinador en marcha (sin él, se levanta uno local)")
+    parser.add_argument("--workers", type=int, default=2, help="workers locales que se levantan")
+    parser.add_argument("--opciones-worker", default="", help='opciones de worker_grpc.py, p. ej. "--motor bucle"')
+    parser.add_argument("--opciones-coordinador", default="",
+                        help='opciones de calc_server_grpc.py, p. ej. "--fanout concurrente --servidor aio"')
+    parser.add_argument("--rpc", choices=RPCS, default="total",
+                        help="CalculoTotal unario, CalculoBatch o CalculoStream bidireccional")
+    parser.add_argument("--mezcla", type=leer_mezcla, default=leer_mezcla("add,sub,mul,div,sum_squares"),
+                        help="pesos de cada operación, p. ej. add=8,sum_squares=2 (por defecto, todas por igual)")
+    parser.add_argument("--n", type=int, default=100_000, help="n de cada reducción (rango 1..n)")
+    parser.add_argument("--tam-lote", type=int, default=100, help="operaciones por CalculoBatch con --rpc lote")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument("--concurrencia", type=int, default=8, help="clientes en bucle cerrado")
+    modo.add_argument("--tasa", type=float, help="peticiones/s en bucle abierto")
+    parser.add_argument("--segundos", type=float, default=10, help="duración de la medición")
+    parser.add_argument("--calentamiento", type=float, default=1, help="segundos de carga previa que no se miden")
+    parser.add_argument("--timeout", type=float, default=30, help="deadline de cada petición (s)")
+    parser.add_argument("--matar", type=float, action="append", default=[],
+                        help="matar un worker a los T s de medición (se puede repetir)")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--salida", help="escribir el JSON en este archivo además de en stdout")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.1,
+                        help="empeoramiento relativo de throughput o p99 que cuenta como regresión")
+    args = parser.parse_args()
+    if args.coordinador and args.matar:
+        parser.error("--matar solo funciona con los workers locales (sin --coordinador)")
+    if args.matar and max(args.matar) >= args.segundos:
+        parser.error("los instantes de --matar deben caer dentro de --segundos")
+
+    with contextlib.ExitStack() as pila:
+        procesos = {}
+        direccion = args.coordinador
+        if direccion is None:
+            procesos = pila.enter_context(workers_con_procesos(args.workers, *shlex.split(args.opciones_worker)))
+            direccion = pila.enter_context(coordinador_local(list(procesos), *shlex.split(args.opciones_coordinador)))
+        channel = pila.enter_context(grpc.insecure_channel(direccion))
+        carga = Carga(calculo_pb2_grpc.CalculoServiceStub(channel), args.rpc,
+                      Mezcla(args.mezcla, args.n, args.semilla), args.tam_lote, args.timeout)
+        print(f"⏱️ {args.rpc} contra {direccion}, " +
+              (f"bucle abierto a {args.tasa:g} peticiones/s" if args.tasa else
+               f"bucle cerrado con {args.concurrencia} clientes") + f", {args.segundos:g} s", file=sys.stderr)
+        resultado = medir(carga, args, procesos)
+
+    configuracion = {clave: valor for clave, valor in vars(args).items() if clave not in ("salida", "comparar")}
+    if args.tasa:
+        configuracion.pop("concurrencia")
+    salida = {"configuracion": configuracion, **resultado}
+    texto = json.dumps(salida, ensure_ascii=False, indent=2)
+    print(texto)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        distintas = [clave for clave in CLAVES_COMPARABLES
+                     if base.get("configuracion", {}).get(clave) != configuracion.get(clave)]
+        if distintas:
+            print(f"⚠️ la base se midió con otra configuración: {', '.join(distintas)}", file=sys.stderr)
+        regresiones = comparar(resultado, base, args.tolerancia)
+        for regresion in regresiones:
+            print(f"❌ regresión: {regresion}", file=sys.stderr)
+        if regresiones:
+            sys.exit(1)
+        print(f"✅ sin regresiones frente a {args.comparar} (tolerancia {args.tolerancia:.0%})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark de la agregación de resultados exactos (result_exacto) frente al campo legado double.
+
+Para cada n divide 1..n en muchas partes, serializa/parsea las Part como lo haría
+la red y compara el coste de agregar con enteros exactos vs. con floats, junto
+con el error del camino legado.
+
+Uso: python bench_exacto.py [partes]
+"""
+import sys
+
+import calculo_pb2
+from calc_server_grpc import dividir_rango
+from motor_sumas import suma_cerrada
+from resultados import fijar_exacto, leer_exacto, nueva_part
+from bench_util import cronometrar
+
+
+def main():
+    partes = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print(f"{partes} partes por respuesta")
+    print(f"{'n':>22} {'exacto (ms)':>12} {'legado (ms)':>12} {'bytes':>8} {'error relativo legado':>22}")
+    for n in (10 ** 6, 10 ** 9, 10 ** 12, 10 ** 15, 10 ** 18):
+        parts = [nueva_part(a, b, suma_cerrada(a, b), "w") for a, b in dividir_rango(n, partes)]
+        total = sum(leer_exacto(p) for p in parts)
+        response = fijar_exacto(calculo_pb2.CalculoResponse(ok=True, parts=parts), total)
+        datos = response.SerializeToString()
+
+        def agregar_exacto():
+            r = calculo_pb2.CalculoResponse.FromString(datos)
+            return sum(leer_exacto(p) for p in r.parts)
+
+        def agregar_legado():
+            r = calculo_pb2.CalculoResponse.FromString(datos)
+            return sum(float(p.result_exacto) for p in r.parts)
+
+        assert agregar_exacto() == suma_cerrada(1, n)
+        error = abs(agregar_legado() - total) / total
+        t_exacto = cronometrar(agregar_exacto, 5) * 1000
+        t_legado = cronometrar(agregar_legado, 5) * 1000
+        print(f"{n:>22} {t_exacto:>12.3f} {t_legado:>12.3f} {len(datos):>8} {error:>22.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Prueba de failover: mata un worker a mitad de una carga, lo vuelve a levantar en el mismo
+puerto y mide la latencia por ventana de 1 s.
+
+Con el circuit breaker, tras los primeros fallos el worker caído se salta sin esperar
+a su timeout, así que la latencia debe volver enseguida a los valores previos. Sale con
+código 1 si alguna petición falla o da un resultado incorrecto, si el breaker del worker
+caído no llega a abrirse o si no vuelve a cerrarse cuando el worker regresa (se lee
+coordinador_breaker_abierto en el /metrics del coordinador).
+
+Uso: python bench_failover.py [segundos] [hilos]
+"""
+import collections
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from concurrent import futures
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import coordinador_local, lanzar_proceso, puertos_libres, workers_con_procesos
+
+N = 100_000
+PETICIONES = [(calculo_pb2.CalculoRequest(op="add", a=2, b=3), lambda r: r.result == 5),
+              (calculo_pb2.CalculoRequest(op="sum_squares", n=N),
+               lambda r: r.result_exacto == str(N * (N + 1) * (2 * N + 1) // 6))]
+ESPERA_CIERRE = 15  # s que se espera, tras la carga, a que el breaker se cierre
+
+
+def breaker_abierto(puerto_metricas, worker):
+    """True/False según coordinador_breaker_abierto{worker=...}; None si no aparece."""
+    texto = urllib.request.urlopen(f"http://127.0.0.1:{puerto_metricas}/metrics", timeout=5).read().decode()
+    valor = re.search(rf'^coordinador_breaker_abierto{{worker="{re.escape(worker)}"}} (\S+)$', texto, re.M)
+    return None if valor is None else float(valor.group(1)) == 1
+
+
+def main():
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    hilos = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    t_muerte, t_regreso = segundos * 0.4, segundos * 0.7
+    (puerto_metricas,) = puertos_libres(1)
+
+    with workers_con_procesos(3, "--log-muestreo", 0) as workers, \
+            coordinador_local(list(workers), "--fanout", "concurrente", "--log-muestreo", 0,
+                              "--metricas-puerto", puerto_metricas) as addr:
+        victima, proceso = next(iter(workers.items()))
+        resucitado = []
+
+        def matar():
+            proceso.kill()
+
+        def resucitar():
+            resucitado.append(lanzar_proceso("worker_grpc.py", victima.rsplit(":", 1)[1], "--log-muestreo", 0))
+
+        with grpc.insecure_channel(addr) as channel:
+            stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+            inicio = time.perf_counter()
+            fin = inicio + segundos
+            ventanas = collections.defaultdict(list)
+            errores = collections.Counter()
+            detalles = collections.Counter()
+            breaker = []  # (t, abierto) leídos del /metrics del coordinador
+
+            def cliente(i):
+                request, correcto = PETICIONES[i % len(PETICIONES)]
+                while time.perf_counter() < fin:
+                    t0 = time.perf_counter()
+                    try:
+                        response = stub.CalculoTotal(request, timeout=30)
+                        fallo = None if response.ok and correcto(response) else \
+                            f"{request.op}: {response.error or 'resultado incorrecto'}"
+                    except grpc.RpcError as e:
+                        fallo = f"{request.op}: {e.code().name}"
+                    ventana = int(t0 - inicio)
+                    if fallo is None:
+                        ventanas[ventana].append(time.perf_counter() - t0)
+                    else:
+                        errores[ventana] += 1
+                        detalles[fallo] += 1
+
+            def vigilar_breaker(hasta):
+                while time.perf_counter() < hasta:
+                    abierto = breaker_abierto(puerto_metricas, victima)
+                    breaker.append((time.perf_counter() - inicio, abierto))
+                    if abierto is False and any(a for _, a in breaker):
+                        return  # ya se abrió y se volvió a cerrar
+                    time.sleep(0.1)
+
+            temporizadores = [threading.Timer(t_muerte, matar), threading.Timer(t_regreso, resucitar)]
+            for t in temporizadores:
+                t.start()
+            vigilante = threading.Thread(target=vigilar_breaker, args=(fin + ESPERA_CIERRE,))
+            vigilante.start()
+            try:
+                with futures.ThreadPoolExecutor(hilos) as ex:
+                    list(ex.map(cliente, range(hilos)))
+                for t in temporizadores:
+                    t.join()
+                vigilante.join()
+            finally:
+                for p in resucitado:
+                    p.terminate()
+                    p.wait()
+
+    print(f"worker {victima} eliminado en t={t_muerte:g}s y relanzado en t={t_regreso:g}s; {hilos} clientes")
+    print(f"{'t (s)':>6} {'ops':>6} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10} {'errores':>8}")
+    for ventana in sorted(set(ventanas) | set(errores)):
+        lat = sorted(ventanas[ventana]) or [float("nan")]
+        p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+        print(f"{ventana:>6} {len(ventanas[ventana]):>6} {statistics.median(lat) * 1000:>10.1f} "
+              f"{p99 * 1000:>10.1f} {lat[-1] * 1000:>10.1f} {errores[ventana]:>8}")
+
+    abierto_en = next((t for t, a in breaker if a), None)
+    cerrado_en = next((t for t, a in breaker if abierto_en is not None and t > abierto_en and a is False), None)
+    print(f"breaker de {victima}: " + (f"abierto en t={abierto_en:.1f}s" if abierto_en is not None else "no se abrió")
+          + (f", cerrado en t={cerrado_en:.1f}s" if cerrado_en is not None else ", no se volvió a cerrar"))
+
+    fallos = []
+    if errores:
+        fallos.append(f"{sum(errores.values())} peticiones fallidas o incorrectas: {dict(detalles)}")
+    if abierto_en is None:
+        fallos.append("el breaker del worker caído no se abrió")
+    elif cerrado_en is None:
+        fallos.append(f"el breaker no se cerró en los {ESPERA_CIERRE} s siguientes a la carga")
+    for fallo in fallos:
+        print(f"❌ {fallo}")
+    if fallos:
+        sys.exit(1)
+    print("✅ ninguna petición falló, el breaker se abrió al caer el worker y se cerró al volver")
+
+
+if __name__ == "__main__":
+    main()
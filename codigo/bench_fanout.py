@@ -0,0 +1,32 @@
+"""
+Benchmark: sum_squares con despacho secuencial vs. concurrente (scatter-gather) vs. por trozos.
+
+Uso: python bench_fanout.py [n]
+"""
+import sys
+
+import calculo_pb2
+from calc_server_grpc import CalculoService
+from bench_util import workers_locales, silencio, cronometrar
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4_000_000
+    request = calculo_pb2.CalculoRequest(op="sum_squares", n=n)
+
+    print(f"sum_squares(1..{n})")
+    modos = ("secuencial", "concurrente", "trozos")
+    print(f"{'workers':>8} " + " ".join(f"{m + ' (s)':>16}" for m in modos))
+    for k in (2, 4, 8):
+        # motor "bucle" para que el trabajo en cada worker sea proporcional al rango
+        with workers_locales(k, "--motor", "bucle") as addrs:
+            tiempos = {}
+            for modo in modos:
+                servicio = CalculoService(addrs, fanout=modo)
+                with silencio():
+                    tiempos[modo] = cronometrar(lambda: servicio.CalculoTotal(request, None))
+        print(f"{k:>8} " + " ".join(f"{tiempos[m]:>16.3f}" for m in modos))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: latencia de sum_squares sobre rangos aleatorios con el índice de prefijos.
+
+Compara, con el mismo motor del worker:
+- sin índice: cada rango se calcula entero;
+- índice frío: el índice empieza vacío y se va construyendo con las consultas;
+- índice caliente: las mismas consultas con el índice ya construido;
+- tras reinicio: un índice nuevo abierto sobre el fichero mapeado que dejó el anterior.
+
+Uso: python bench_indice.py [consultas] [alcance] [motor] [paso]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from indice_prefijos import IndicePrefijos, PASO_POR_DEFECTO
+from motor_sumas import suma_cerrada, suma_potencias
+from bench_util import silencio
+
+
+def rangos_aleatorios(consultas, alcance, semilla=1):
+    rng = random.Random(semilla)
+    rangos = []
+    for _ in range(consultas):
+        a, b = sorted(rng.randint(1, alcance) for _ in range(2))
+        rangos.append((a, b))
+    return rangos
+
+
+def medir(calcular, rangos):
+    latencias = []
+    for a, b in rangos:
+        t0 = time.perf_counter()
+        resultado = calcular(a, b)
+        latencias.append(time.perf_counter() - t0)
+        assert resultado == suma_cerrada(a, b), (a, b)
+    cuantiles = statistics.quantiles(latencias, n=100)
+    return cuantiles[49] * 1000, cuantiles[98] * 1000, sum(latencias)
+
+
+def main():
+    consultas = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    alcance = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000_000
+    motor = sys.argv[3] if len(sys.argv) > 3 else "numpy"
+    paso = int(sys.argv[4]) if len(sys.argv) > 4 else PASO_POR_DEFECTO
+    rangos = rangos_aleatorios(consultas, alcance)
+    archivo = os.path.join(tempfile.mkdtemp(), "indice.bin")
+
+    print(f"{consultas} rangos aleatorios en 1..{alcance}, motor {motor}, paso {paso}")
+    print(f"{'modo':>16} {'p50 (ms)':>10} {'p99 (ms)':>10} {'total (s)':>10}")
+    filas = [("sin índice", lambda: (lambda a, b: suma_potencias(a, b, 2, motor)))]
+    indice = IndicePrefijos(paso, motor=motor, archivo=archivo)
+    filas.append(("índice frío", lambda: indice.suma))
+    filas.append(("índice caliente", lambda: indice.suma))
+
+    def reabrir():
+        indice.cerrar()
+        with silencio():
+            return IndicePrefijos(paso, motor=motor, archivo=archivo).suma
+
+    filas.append(("tras reinicio", reabrir))
+    for nombre, preparar in filas:
+        p50, p99, total = medir(preparar(), rangos)
+        print(f"{nombre:>16} {p50:>10.3f} {p99:>10.3f} {total:>10.3f}")
+    print(f"Índice: {indice.contadores()}")
+    os.remove(archivo)
+
+
+if __name__ == "__main__":
+    main()
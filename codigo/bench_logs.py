@@ -0,0 +1,90 @@
+"""
+Benchmark: coste de los logs por petición en el coordinador.
+
+Varios clientes concurrentes llaman a CalculoService (en este proceso, sobre 2 workers
+locales) con `add` y con `sum_squares` en modo concurrente, que registra varias líneas
+por petición. Se compara:
+  - síncrono: cada hilo formatea y escribe su línea, como hacían los print
+  - cola: QueueHandler + QueueListener (lo que usa el coordinador)
+  - muestreo 1 %: solo se registran los logs de 1 de cada 100 peticiones
+  - silencio: `--log-muestreo 0`, sin logs por petición
+Los logs se escriben en un fichero temporal. Las configuraciones se alternan en varias
+rondas (en orden rotado) y se queda la mejor de cada una.
+
+Uso: python bench_logs.py [peticiones] [rondas]
+"""
+import statistics
+import sys
+import tempfile
+import time
+from concurrent import futures
+
+import calculo_pb2
+from bitacora import configurar_logs, parar_logs
+from calc_server_grpc import CalculoService
+from bench_util import workers_locales
+
+CLIENTES = 8
+CONFIGURACIONES = {
+    "síncrono": dict(cola=False),
+    "cola": dict(),
+    "muestreo 1 %": dict(muestreo=0.01),
+    "silencio": dict(muestreo=0),
+}
+PETICIONES = {
+    "add": calculo_pb2.CalculoRequest(op="add", a=2, b=3),
+    "sum_squares": calculo_pb2.CalculoRequest(op="sum_squares", n=100_000),
+}
+
+
+def carga(servicio, request, peticiones):
+    latencias = []
+
+    def pedir(_):
+        t0 = time.perf_counter()
+        servicio.CalculoTotal(request, None)
+        latencias.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with futures.ThreadPoolExecutor(CLIENTES) as clientes:
+        list(clientes.map(pedir, range(peticiones)))
+    duracion = time.perf_counter() - t0
+    return peticiones / duracion, statistics.median(latencias) * 1000
+
+
+def main():
+    peticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rondas = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    mejores = {config: {} for config in CONFIGURACIONES}
+    lineas = {}
+    orden = list(CONFIGURACIONES)
+    with workers_locales(2, "--log-muestreo", 0) as workers:
+        servicio = CalculoService(workers, fanout="concurrente", sondeo=0)
+        for op, request in PETICIONES.items():  # calentar canales
+            servicio.CalculoTotal(request, None)
+        for ronda in range(rondas):
+            for config in orden[ronda % len(orden):] + orden[:ronda % len(orden)]:
+                with tempfile.TemporaryFile("w+", encoding="utf-8") as destino:
+                    configurar_logs(destino=destino, **CONFIGURACIONES[config])
+                    for op, request in PETICIONES.items():
+                        ops, p50 = carga(servicio, request, peticiones)
+                        if ops > mejores[config].get(op, (0, 0))[0]:
+                            mejores[config][op] = (ops, p50)
+                    parar_logs()  # incluye escribir lo que quede en la cola
+                    destino.flush()
+                    destino.seek(0)
+                    lineas[config] = sum(1 for _ in destino)
+        servicio.cerrar()
+
+    print(f"{peticiones} peticiones por operación, {CLIENTES} clientes, coordinador en proceso "
+          f"con 2 workers, mejor de {rondas} rondas")
+    print(f"{'logs':>14} {'operación':>12} {'ops/s':>9} {'p50 (ms)':>9} {'vs. síncrono':>13} {'líneas':>8}")
+    for config, resultados in mejores.items():
+        for op, (ops, p50) in resultados.items():
+            base = mejores["síncrono"][op][0]
+            print(f"{config:>14} {op:>12} {ops:>9.1f} {p50:>9.2f} {ops / base - 1:>+12.1%} {lineas[config]:>8}")
+
+
+if __name__ == "__main__":
+    main()
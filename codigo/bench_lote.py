@@ -0,0 +1,48 @@
+"""
+Benchmark: N operaciones básicas con CalculoTotal (una RPC por operación) vs. CalculoBatch.
+
+Uso: python bench_lote.py [operaciones] [workers]
+"""
+import random
+import sys
+import time
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import workers_locales, coordinador_local
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    rng = random.Random(7)
+    items = [calculo_pb2.CalculoRequest(op=rng.choice(("add", "sub", "mul", "div")),
+                                        a=rng.uniform(-100, 100), b=rng.choice((0.0, rng.uniform(-100, 100))))
+             for _ in range(total)]
+
+    with workers_locales(num_workers) as workers, coordinador_local(workers) as addr:
+        with grpc.insecure_channel(addr) as channel:
+            stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+
+            t0 = time.perf_counter()
+            unarias = [stub.CalculoTotal(it) for it in items]
+            t_unario = time.perf_counter() - t0
+
+            print(f"{total} operaciones, {num_workers} workers")
+            print(f"{'tamaño lote':>12} {'ops/s':>12} {'speedup':>8}")
+            print(f"{'unario':>12} {total / t_unario:>12.0f} {1:>8.2f}x")
+            for tam in (10, 100, 1000):
+                t0 = time.perf_counter()
+                lotes = [stub.CalculoBatch(calculo_pb2.CalculoBatchRequest(items=items[i:i + tam]))
+                         for i in range(0, total, tam)]
+                t_lote = time.perf_counter() - t0
+                respuestas = [r for lote in lotes for r in lote.items]
+                assert [(r.ok, r.result, r.error) for r in respuestas] == \
+                       [(r.ok, r.result, r.error) for r in unarias]
+                print(f"{tam:>12} {total / t_lote:>12.0f} {t_unario / t_lote:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
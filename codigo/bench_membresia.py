@@ -0,0 +1,89 @@
+"""
+Prueba de membresía dinámica: escala de 2 a 16 workers (y vuelta a 2) en mitad de una carga.
+
+El coordinador arranca sin workers en la línea de comandos; los workers se dan de alta
+solos con --coordinador. Con la carga en marcha se lanzan 14 workers más y, más tarde,
+se paran con SIGINT para que se den de baja. Por cada ventana de 1 s se muestran las
+operaciones, los errores vistos por los clientes y cuántos workers distintos aparecen
+en las partes de sum_squares. La prueba falla si algún cliente recibe un error; la
+comprobación de que las respuestas son correctas está en test_membresia.py.
+
+Uso: python bench_membresia.py [segundos_por_fase] [hilos] [servidor]
+"""
+import collections
+import signal
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import workers_con_procesos, coordinador_local
+
+INICIALES = 2
+FINALES = 16
+
+
+def main():
+    fase = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    hilos = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    servidor = sys.argv[3] if len(sys.argv) > 3 else "hilos"
+    peticiones = [calculo_pb2.CalculoRequest(op="add", a=2, b=3),
+                  calculo_pb2.CalculoRequest(op="sum_squares", n=100_000)]
+
+    with coordinador_local([], "--fanout", "concurrente", "--servidor", servidor) as coordinador:
+        with workers_con_procesos(INICIALES, "--coordinador", coordinador), grpc.insecure_channel(coordinador) as channel:
+            stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+            # esperar a que los primeros workers estén dados de alta
+            while len({p.worker for p in stub.CalculoTotal(peticiones[1]).parts}) < INICIALES:
+                time.sleep(0.2)
+
+            inicio = time.perf_counter()
+            detener = threading.Event()
+            ventanas = collections.defaultdict(lambda: {"ops": 0, "errores": 0, "workers": set()})
+
+            def cliente(i):
+                request = peticiones[i % len(peticiones)]
+                while not detener.is_set():
+                    try:
+                        response = stub.CalculoTotal(request, timeout=30)
+                        error = not response.ok
+                    except grpc.RpcError:
+                        response, error = None, True
+                    ventana = ventanas[int(time.perf_counter() - inicio)]
+                    ventana["ops"] += 1
+                    ventana["errores"] += error
+                    if response is not None:
+                        ventana["workers"].update(p.worker for p in response.parts if p.worker != "coordinator_local")
+
+            with futures.ThreadPoolExecutor(hilos) as clientes:
+                for i in range(hilos):
+                    clientes.submit(cliente, i)
+                time.sleep(fase)
+                print(f"[t={time.perf_counter() - inicio:.1f}s] lanzando {FINALES - INICIALES} workers más")
+                with workers_con_procesos(FINALES - INICIALES, "--coordinador", coordinador) as extra:
+                    time.sleep(fase)
+                    print(f"[t={time.perf_counter() - inicio:.1f}s] parando {len(extra)} workers (SIGINT → baja)")
+                    for proc in extra.values():
+                        proc.send_signal(signal.SIGINT)
+                    for proc in extra.values():
+                        proc.wait()
+                time.sleep(fase)
+                detener.set()
+
+    print(f"{'segundo':>8} {'ops':>6} {'errores':>8} {'workers':>8}")
+    for s in sorted(ventanas):
+        v = ventanas[s]
+        print(f"{s:>8} {v['ops']:>6} {v['errores']:>8} {len(v['workers']):>8}")
+    errores = sum(v["errores"] for v in ventanas.values())
+    maximo = max(len(v["workers"]) for v in ventanas.values())
+    print(f"Errores de cliente: {errores}; máximo de workers a la vez: {maximo}")
+    if errores or maximo < FINALES:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
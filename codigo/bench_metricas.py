@@ -0,0 +1,102 @@
+"""
+Benchmark: coste de las métricas (y de las trazas) en el camino de cada petición.
+
+Levanta 2 workers y un coordinador sin métricas, con `--metricas-puerto` y con
+`--metricas-puerto --trazas`, y mide con varios clientes concurrentes el throughput
+y la latencia p50 de `add` y de `sum_squares` de extremo a extremo. Las
+configuraciones se alternan (en orden rotado) en varias rondas y se queda la mejor
+de cada una, para que el ruido de la máquina no se confunda con el sobrecoste.
+
+Con el motor por defecto cada petición es casi solo gRPC, el peor caso para el
+sobrecoste; con `bucle` los workers hacen un trabajo de cálculo apreciable.
+
+Uso: python bench_metricas.py [peticiones] [rondas] [servidor] [motor]
+"""
+import statistics
+import sys
+import time
+from concurrent import futures
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import coordinador_local, workers_locales
+from motor_sumas import MOTOR_POR_DEFECTO
+
+CLIENTES = 8
+CONFIGURACIONES = {
+    "sin métricas": (),
+    "métricas": ("--metricas-puerto",),
+    "métricas+trazas": ("--metricas-puerto", "--trazas"),
+}
+PETICIONES = {
+    "add": calculo_pb2.CalculoRequest(op="add", a=2, b=3),
+    "sum_squares": calculo_pb2.CalculoRequest(op="sum_squares", n=100_000),
+}
+
+
+def opciones(config):
+    """Argumentos de línea de comandos de la configuración; /metrics en un puerto que elige el sistema."""
+    args = []
+    for opcion in CONFIGURACIONES[config]:
+        args.append(opcion)
+        if opcion == "--metricas-puerto":
+            args.append(0)
+    return args
+
+
+def carga(addr, request, peticiones):
+    latencias = []
+    with grpc.insecure_channel(addr) as channel:
+        stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+        stub.CalculoTotal(request, timeout=30)  # calentar el canal y los del coordinador
+
+        def pedir(_):
+            t0 = time.perf_counter()
+            stub.CalculoTotal(request, timeout=30)
+            latencias.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        with futures.ThreadPoolExecutor(CLIENTES) as clientes:
+            list(clientes.map(pedir, range(peticiones)))
+        duracion = time.perf_counter() - t0
+    return peticiones / duracion, statistics.median(latencias) * 1000
+
+
+def medir(config, peticiones, servidor, motor):
+    """{operación: (ops/s, p50 ms)} con workers y coordinador lanzados con la configuración dada."""
+    with workers_locales(2, "--motor", motor, *opciones(config)) as workers:
+        with coordinador_local(workers, "--fanout", "concurrente", "--servidor", servidor,
+                               *opciones(config)) as coordinador:
+            return {op: carga(coordinador, request, peticiones) for op, request in PETICIONES.items()}
+
+
+def main():
+    peticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rondas = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    servidor = sys.argv[3] if len(sys.argv) > 3 else "hilos"
+    motor = sys.argv[4] if len(sys.argv) > 4 else MOTOR_POR_DEFECTO
+
+    mejores = {config: {} for config in CONFIGURACIONES}
+    orden = list(CONFIGURACIONES)
+    for ronda in range(rondas):
+        # rotar el orden en cada ronda: la primera configuración de una ronda suele salir peor
+        for config in orden[ronda % len(orden):] + orden[:ronda % len(orden)]:
+            for op, (ops, p50) in medir(config, peticiones, servidor, motor).items():
+                previo = mejores[config].get(op)
+                if previo is None or ops > previo[0]:
+                    mejores[config][op] = (ops, p50)
+        print(f"ronda {ronda + 1}/{rondas} terminada")
+
+    print(f"{peticiones} peticiones por operación, {CLIENTES} clientes, coordinador {servidor}, "
+          f"motor {motor}, mejor de {rondas} rondas")
+    print(f"{'configuración':>16} {'operación':>12} {'ops/s':>9} {'p50 (ms)':>9} {'sobrecoste':>11}")
+    for config, resultados in mejores.items():
+        for op, (ops, p50) in resultados.items():
+            base = mejores["sin métricas"][op][0]
+            print(f"{config:>16} {op:>12} {ops:>9.1f} {p50:>9.2f} {(base - ops) / base:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
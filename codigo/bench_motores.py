@@ -0,0 +1,26 @@
+"""
+Microbenchmark de los motores de motor_sumas.py.
+
+La equivalencia de los motores con el bucle de referencia se comprueba en test_motores.py.
+
+Uso: python bench_motores.py
+"""
+from motor_sumas import MOTORES, motores_disponibles
+from bench_util import cronometrar
+
+
+def main():
+    print(f"{'n':>14} " + " ".join(f"{m + ' (s)':>12}" for m in motores_disponibles()))
+    for n in (10 ** 4, 10 ** 6, 10 ** 7, 10 ** 9):
+        tiempos = []
+        for nombre in motores_disponibles():
+            if nombre == "bucle" and n > 10 ** 7:
+                tiempos.append("-")
+                continue
+            fn = MOTORES[nombre]
+            tiempos.append(f"{cronometrar(lambda: fn(1, n, 2)):.6f}")
+        print(f"{n:>14} " + " ".join(f"{t:>12}" for t in tiempos))
+
+
+if __name__ == "__main__":
+    main()
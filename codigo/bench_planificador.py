@@ -0,0 +1,76 @@
+"""
+Simulación (sin red) de los planificadores con workers de velocidad mixta.
+
+1. Operaciones básicas: llegadas de Poisson a un conjunto de workers FIFO con tiempos de
+   servicio exponenciales inversamente proporcionales a su velocidad. Se usan las clases
+   reales de planificador.py para elegir worker y se informa la latencia p50/p99.
+2. sum_squares: makespan de repartir 1..n en partes iguales vs. proporcionales al
+   rendimiento medido en los trabajos anteriores.
+
+Uso: python bench_planificador.py [carga]   (carga = fracción de la capacidad total, 0.8 por defecto)
+"""
+import heapq
+import random
+import sys
+
+from calc_server_grpc import dividir_rango
+from planificador import POLITICAS, crear_planificador, dividir_rango_ponderado
+
+VELOCIDADES = {"rapido": 4.0, "medio": 2.0, "lento-1": 1.0, "lento-2": 1.0}
+SERVICIO_MEDIO = 0.010  # s por operación en un worker de velocidad 1
+
+
+def simular_basicas(politica, carga, peticiones=50_000, semilla=1):
+    rng = random.Random(semilla)
+    workers = list(VELOCIDADES)
+    plan = crear_planificador(politica, workers, capacidades=[VELOCIDADES[w] for w in workers])
+    tasa = carga * sum(VELOCIDADES.values()) / SERVICIO_MEDIO
+    libre = {w: 0.0 for w in workers}
+    completados = []  # heap de (t_fin, worker, latencia)
+    latencias = []
+    t = 0.0
+    for _ in range(peticiones):
+        t += rng.expovariate(tasa)
+        while completados and completados[0][0] <= t:
+            _, w, lat = heapq.heappop(completados)
+            plan.fin(w, lat)
+        w = plan.orden(workers)[0]
+        plan.inicio(w)
+        inicio = max(t, libre[w])
+        libre[w] = inicio + rng.expovariate(VELOCIDADES[w] / SERVICIO_MEDIO)
+        heapq.heappush(completados, (libre[w], w, libre[w] - t))
+        latencias.append(libre[w] - t)
+    latencias.sort()
+    return latencias[len(latencias) // 2] * 1000, latencias[int(len(latencias) * 0.99)] * 1000
+
+
+def simular_sum_squares(n=10_000_000, trabajos=5):
+    workers = list(VELOCIDADES)
+    plan = crear_planificador("rr", workers)
+    optimo = n / sum(VELOCIDADES.values())
+    igual = max((b - a + 1) / VELOCIDADES[w] for (a, b), w in zip(dividir_rango(n, len(workers)), workers))
+    print(f"\nsum_squares(1..{n}): makespan relativo al óptimo ({optimo:.0f} u)")
+    print(f"  partes iguales:          {igual / optimo:.2f}x")
+    for j in range(trabajos):
+        rangos = dividir_rango_ponderado(n, plan.pesos(workers))
+        makespan = 0.0
+        for (a, b), w in zip(rangos, workers):
+            duracion = (b - a + 1) / VELOCIDADES[w]
+            plan.inicio(w)
+            plan.fin(w, duracion, b - a + 1)
+            makespan = max(makespan, duracion)
+        print(f"  por rendimiento, trabajo {j + 1}: {makespan / optimo:.2f}x")
+
+
+def main():
+    carga = float(sys.argv[1]) if len(sys.argv) > 1 else 0.8
+    print(f"workers: {VELOCIDADES}; carga {carga:.0%} de la capacidad total")
+    print(f"{'planificador':>18} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for politica in POLITICAS:
+        p50, p99 = simular_basicas(politica, carga)
+        print(f"{politica:>18} {p50:>10.1f} {p99:>10.1f}")
+    simular_sum_squares()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Prueba de plazos y cancelación: la mitad de las peticiones se abandona.
+
+Levanta 2 workers con el motor `bucle` (cada sum_squares cuesta CPU de verdad) y un
+coordinador. Unos clientes "pacientes" (deadline largo) piden sum_squares en bucle y
+se mide su throughput en tres escenarios:
+  - solo pacientes: sin más carga
+  - abandonan: además llegan TASA peticiones/s iguales (tantas como completan los
+    pacientes solos) cuyos clientes se rinden a los ABANDONO s, la mitad con un
+    deadline corto y la otra mitad cancelando la llamada
+  - abandonan sin avisar: las mismas peticiones, pero el cliente se va sin deadline
+    ni cancelación; el coordinador y los workers las calculan enteras, que es lo que
+    pasaba antes con cualquier cliente que se rendía
+Cuanto más se parezca "abandonan" a "solo pacientes", más capacidad se libera al
+propagar el plazo y la cancelación. Los workers publican /metrics para contar los
+cálculos que dejaron a medias. La prueba falla si un cliente paciente recibe un error
+o si ningún worker interrumpió un cálculo (salvo con `--fanout trozos`, cuyos trozos
+son más cortos que un bloque cancelable: allí lo que se ahorra es no repartir más).
+
+Al final se abren más CalculoStream que hilos tiene el servidor, con un deadline que
+vence mientras el coordinador resuelve un sum_squares y con la entrada aún abierta.
+Cada stream debe cerrarse con DEADLINE_EXCEEDED (tras recibir la respuesta de su `add`), grpc_servidor_en_curso del método
+CalculoStream (en el /metrics del coordinador) debe volver a 0 y un `add` posterior
+debe responder: si no, la prueba también falla.
+
+Uso: python bench_plazos.py [segundos] [fanout] [servidor]
+"""
+import collections
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from concurrent import futures
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import coordinador_local, puertos_libres, workers_locales
+
+PACIENTES = 4      # hilos de clientes pacientes
+N = 2_000_000      # elementos de cada sum_squares
+ABANDONO = 0.05    # s que aguantan los clientes impacientes
+ESCENARIOS = ("solo pacientes", "abandonan", "abandonan sin avisar")
+STREAMS = 12       # CalculoStream abandonados: más que los hilos del coordinador (HILOS_SERVIDOR)
+PLAZO_STREAM = 0.5  # s de deadline de cada stream: da para responder el add, no el sum_squares de N_STREAM
+N_STREAM = 20 * N
+
+
+def abandonados(puertos_metricas):
+    """Suma de worker_calculos_abandonados_total en los /metrics de los workers."""
+    total = 0
+    for puerto in puertos_metricas:
+        texto = urllib.request.urlopen(f"http://127.0.0.1:{puerto}/metrics", timeout=5).read().decode()
+        total += sum(int(float(v)) for v in re.findall(r"^worker_calculos_abandonados_total\S* (\S+)$", texto, re.M))
+    return total
+
+
+def en_curso_stream(puerto_metricas):
+    """grpc_servidor_en_curso{metodo="CalculoStream"} del coordinador (0 si aún no aparece)."""
+    texto = urllib.request.urlopen(f"http://127.0.0.1:{puerto_metricas}/metrics", timeout=5).read().decode()
+    valor = re.search(r'^grpc_servidor_en_curso{metodo="CalculoStream"} (\S+)$', texto, re.M)
+    return 0 if valor is None else int(float(valor.group(1)))
+
+
+def streams_con_plazo_agotado(stub, puerto_metricas):
+    """
+    Abre STREAMS CalculoStream cuyo deadline vence con peticiones en curso y la entrada abierta.
+    Retorna (cómo terminó cada stream: su código y si llegó la respuesta del add, streams aún
+    en curso en el servidor tras esperar, error del `add` posterior o None).
+    """
+    abierta = threading.Event()
+
+    def peticiones():
+        yield calculo_pb2.CalculoRequest(op="sum_squares", n=N_STREAM, id="1")  # se resuelve por la vía unaria
+        yield calculo_pb2.CalculoRequest(op="add", a=2, b=3, id="2")
+        abierta.wait()  # el cliente no cierra la entrada
+
+    def consumir(_):
+        ids = set()
+        try:
+            for response in stub.CalculoStream(peticiones(), timeout=PLAZO_STREAM):
+                ids.add(response.id)
+            codigo = "OK"
+        except grpc.RpcError as e:
+            codigo = e.code().name
+        return codigo, "2" in ids
+
+    try:
+        with futures.ThreadPoolExecutor(STREAMS) as clientes:
+            codigos = list(clientes.map(consumir, range(STREAMS)))
+    finally:
+        abierta.set()
+    limite = time.monotonic() + 5
+    while (en_curso := en_curso_stream(puerto_metricas)) and time.monotonic() < limite:
+        time.sleep(0.1)
+    try:
+        response = stub.CalculoTotal(calculo_pb2.CalculoRequest(op="add", a=2, b=3), timeout=5)
+        error_add = None if response.ok and response.result == 5 else response.error or "resultado incorrecto"
+    except grpc.RpcError as e:
+        error_add = e.code().name
+    return codigos, en_curso, error_add
+
+
+def medir(stub, escenario, segundos, tasa):
+    request = calculo_pb2.CalculoRequest(op="sum_squares", n=N)
+    detener = threading.Event()
+    latencias, errores = [], []
+    impacientes = {}
+
+    def anotar(future):
+        codigo = future.code().name if future.cancelled() or future.exception() else "OK"
+        impacientes[codigo] = impacientes.get(codigo, 0) + 1
+
+    def paciente():
+        while not detener.is_set():
+            t0 = time.perf_counter()
+            try:
+                response = stub.CalculoTotal(request, timeout=60)
+            except grpc.RpcError as e:
+                errores.append(e.code())
+                continue
+            if not response.ok:
+                errores.append(response.error)
+            latencias.append(time.perf_counter() - t0)
+
+    def impacientes_llegan():
+        """Bucle abierto: una petición cada 1/tasa s, pase lo que pase con las anteriores."""
+        por_cancelar, sin_avisar = [], []
+        siguiente = time.perf_counter()
+        i = 0
+        while not detener.is_set():
+            ahora = time.perf_counter()
+            while por_cancelar and por_cancelar[0][0] <= ahora:
+                por_cancelar.pop(0)[1].cancel()
+            if ahora >= siguiente:
+                siguiente += 1 / tasa
+                i += 1
+                if escenario == "abandonan sin avisar":
+                    sin_avisar.append(stub.CalculoTotal.future(request))  # nadie leerá el resultado
+                elif i % 2:
+                    # deadline corto: el coordinador lo hereda en las llamadas a los workers
+                    stub.CalculoTotal.future(request, timeout=ABANDONO).add_done_callback(anotar)
+                else:
+                    # sin deadline, pero el cliente cancela la llamada
+                    future = stub.CalculoTotal.future(request)
+                    future.add_done_callback(anotar)
+                    por_cancelar.append((ahora + ABANDONO, future))
+            time.sleep(0.002)
+        for future in sin_avisar:  # que no sigan ocupando los workers en el siguiente escenario
+            future.exception()
+            anotar(future)
+
+    with futures.ThreadPoolExecutor(PACIENTES + 1) as clientes:
+        for _ in range(PACIENTES):
+            clientes.submit(paciente)
+        if escenario != "solo pacientes":
+            clientes.submit(impacientes_llegan)
+        time.sleep(segundos)
+        detener.set()
+    return len(latencias) / segundos, statistics.median(latencias) * 1000 if latencias else 0, errores, impacientes
+
+
+def main():
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    fanout = sys.argv[2] if len(sys.argv) > 2 else "concurrente"
+    servidor = sys.argv[3] if len(sys.argv) > 3 else "hilos"
+
+    puertos_metricas = puertos_libres(2)
+    (puerto_coordinador,) = puertos_libres(1)
+    resultados = {}
+    # cada worker con su /metrics: se lanzan por separado para darles puertos distintos
+    with workers_locales(1, "--motor", "bucle", "--log-muestreo", 0, "--metricas-puerto", puertos_metricas[0]) as w1, \
+            workers_locales(1, "--motor", "bucle", "--log-muestreo", 0, "--metricas-puerto", puertos_metricas[1]) as w2:
+        workers = w1 + w2
+        with coordinador_local(workers, "--fanout", fanout, "--servidor", servidor, "--sondeo", 0,
+                               "--log-muestreo", 0, "--metricas-puerto", puerto_coordinador) as coordinador, \
+                grpc.insecure_channel(coordinador) as channel:
+            stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+            stub.CalculoTotal(calculo_pb2.CalculoRequest(op="sum_squares", n=N), timeout=60)  # calentar
+            tasa = None
+            for escenario in ESCENARIOS:
+                antes = abandonados(puertos_metricas)
+                ops, p50, errores, impacientes = medir(stub, escenario, segundos, tasa)
+                tasa = tasa or ops  # tantas peticiones abandonadas como completan los pacientes solos
+                time.sleep(1)  # que terminen (o se interrumpan) los cálculos que queden en los workers
+                resultados[escenario] = (ops, p50, errores, impacientes, abandonados(puertos_metricas) - antes)
+                print(f"{escenario} terminado")
+            codigos, en_curso, error_add = streams_con_plazo_agotado(stub, puerto_coordinador)
+
+    print(f"sum_squares n={N:,} con motor bucle en 2 workers, fanout {fanout}, coordinador {servidor}, "
+          f"{PACIENTES} clientes pacientes, {segundos:.0f} s por escenario; llegan {tasa:.1f} peticiones/s "
+          f"que se abandonan a los {ABANDONO * 1000:.0f} ms")
+    print(f"{'escenario':>20} {'pacientes ops/s':>16} {'p50 (ms)':>9} {'errores':>8} "
+          f"{'abandonadas':>34} {'cálculos interrumpidos':>23}")
+    base = resultados["solo pacientes"][0]
+    for escenario, (ops, p50, errores, impacientes, interrumpidos) in resultados.items():
+        detalle = ", ".join(f"{k} {v}" for k, v in impacientes.items() if v) if escenario != "solo pacientes" else "-"
+        print(f"{escenario:>20} {ops:>9.2f} ({ops / base:>4.0%}) {p50:>9.0f} {len(errores):>8} "
+              f"{detalle:>34} {interrumpidos:>23}")
+    cierres = collections.Counter(codigo for codigo, _ in codigos)
+    con_add = sum(1 for _, add in codigos if add)
+    print(f"{STREAMS} CalculoStream con deadline de {PLAZO_STREAM * 1000:.0f} ms: terminaron con {dict(cierres)} "
+          f"({con_add} tras responder su add); en curso después: {en_curso}; add posterior: {error_add or 'OK'}")
+    fallos = []
+    errores = sum(len(r[2]) for r in resultados.values())
+    if errores or (not resultados["abandonan"][4] and fanout != "trozos"):
+        fallos.append(f"errores de clientes pacientes: {errores}; cálculos interrumpidos: {resultados['abandonan'][4]}")
+    if set(cierres) != {"DEADLINE_EXCEEDED"} or not con_add:
+        fallos.append(f"los CalculoStream con el plazo agotado terminaron con {dict(cierres)}, {con_add} con su add")
+    if en_curso:
+        fallos.append(f"{en_curso} CalculoStream siguen en curso en el coordinador")
+    if error_add is not None:
+        fallos.append(f"add tras los streams abandonados: {error_add}")
+    for fallo in fallos:
+        print(f"❌ {fallo}")
+    if fallos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
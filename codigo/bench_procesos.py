@@ -0,0 +1,50 @@
+"""
+Benchmark: escalado de un worker con 1..N procesos de cálculo detrás de un solo puerto.
+
+Para cada número de procesos lanza `worker_grpc.py --procesos p`, le pregunta su
+capacidad con la RPC Info y mide el tiempo de varias peticiones sum_squares
+concurrentes sobre rangos grandes. El motor por defecto es "bucle", que depende
+del GIL y es donde más se nota el reparto entre procesos.
+
+Uso: python bench_procesos.py [max_procesos] [n] [peticiones] [motor]
+"""
+import sys
+from concurrent import futures
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import workers_locales, cronometrar
+from multiproceso import nucleos_disponibles
+
+
+def main():
+    max_procesos = int(sys.argv[1]) if len(sys.argv) > 1 else nucleos_disponibles()
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000
+    peticiones = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    motor = sys.argv[4] if len(sys.argv) > 4 else "bucle"
+    request = calculo_pb2.CalculoRequest(op="sum_squares", a=1, b=n)
+
+    print(f"{peticiones} peticiones concurrentes sum_squares(1..{n}), motor {motor}, "
+          f"{nucleos_disponibles()} núcleos en esta máquina")
+    print(f"{'procesos':>9} {'anunciados':>11} {'tiempo (s)':>11} {'speedup':>8} {'eficiencia':>11}")
+    base = None
+    procesos = 1
+    while procesos <= max_procesos:
+        with workers_locales(1, "--procesos", procesos, "--motor", motor) as (addr,):
+            with grpc.insecure_channel(addr) as channel:
+                stub = calculo_pb2_grpc.OperacionServiceStub(channel)
+                info = stub.Info(calculo_pb2.InfoRequest())
+                with futures.ThreadPoolExecutor(peticiones) as clientes:
+                    def carga():
+                        list(clientes.map(lambda _: stub.Calcular(request, timeout=600), range(peticiones)))
+                    tiempo = cronometrar(carga, repeticiones=2)
+        base = base or tiempo
+        print(f"{procesos:>9} {info.procesos:>11} {tiempo:>11.3f} {base / tiempo:>7.2f}x "
+              f"{base / tiempo / procesos:>10.0%}")
+        procesos *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark de las reducciones: un solo proceso vs. el coordinador repartiendo entre workers.
+
+Para cada reducción registrada en reducciones.py mide el núcleo sobre todo el rango en
+este proceso (la línea base, sin gRPC) y la misma petición al coordinador con W workers
+(procesos aparte) y despacho concurrente. Comprueba que los dos resultados coinciden.
+En una máquina con menos núcleos que workers el speedup no puede pasar de los núcleos.
+
+Uso: python bench_reducciones.py [workers] [motor] [escala]
+"""
+import sys
+
+import calculo_pb2
+from calc_server_grpc import CalculoService
+from bench_util import workers_con_procesos, silencio, cronometrar
+from multiproceso import nucleos_disponibles
+from reducciones import REDUCCIONES, rango
+
+# petición de cada reducción con escala 1; la escala multiplica n
+PETICIONES = {
+    "sum_squares": dict(n=4_000_000),
+    "sum_powers": dict(n=4_000_000, k=5),
+    "poly_sum": dict(n=1_000_000, coeficientes=(7, -3, 0, 2)),
+    "prod_mod": dict(n=4_000_000, modulo=1_000_000_007),
+    "count_primes": dict(n=20_000_000),
+}
+
+
+def main():
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    motor = sys.argv[2] if len(sys.argv) > 2 else "numpy"
+    escala = float(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    print(f"{num_workers} workers (motor {motor}, fanout concurrente), {nucleos_disponibles()} núcleos en esta máquina")
+    print(f"{'reducción':>13} {'n':>12} {'1 proceso (s)':>14} {'coordinador (s)':>16} {'speedup':>8}")
+    with workers_con_procesos(num_workers, "--motor", motor, "--log-muestreo", 0) as workers:
+        servicio = CalculoService(list(workers), fanout="concurrente")
+        for op, campos in PETICIONES.items():
+            campos = dict(campos, n=max(1, int(campos["n"] * escala)))
+            request = calculo_pb2.CalculoRequest(op=op, **campos)
+            reduccion = REDUCCIONES[op]
+            parametros = reduccion.parametros(request)
+
+            local = []
+            t_local = cronometrar(lambda: local.append(reduccion.mapear(*rango(request), parametros, motor)))
+            remoto = []
+            with silencio():
+                t_remoto = cronometrar(lambda: remoto.append(servicio.CalculoTotal(request, None)))
+            response = remoto[-1]
+            if not response.ok or int(response.result_exacto) != local[-1]:
+                raise SystemExit(f"❌ {op}: el coordinador dio {response.result_exacto or response.error!r}, "
+                                 f"un proceso {local[-1]}")
+            print(f"{op:>13} {campos['n']:>12,} {t_local:>14.3f} {t_remoto:>16.3f} {t_local / t_remoto:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark de sobrecarga: goodput del coordinador más allá de la saturación.
+
+Levanta 2 workers (motor `bucle`) y el coordinador sin control de admisión, con un
+límite fijo y con el límite adaptativo (los dos con `--max-rpcs`). Primero mide la capacidad con clientes en
+bucle cerrado; después envía peticiones en bucle abierto (a ritmo fijo, como llegan
+de muchos clientes independientes) a 0,5×, 1×, 2× y 4× esa capacidad. La mezcla es
+de `add` y de algún `sum_squares` caro, todas con deadline de DEADLINE s.
+
+El goodput son las respuestas ok por segundo, todas dentro del deadline. Sin control,
+pasada la saturación la cola de gRPC crece y casi todo vence: el goodput se hunde. Con
+admisión, lo que no cabe se rechaza al momento con RESOURCE_EXHAUSTED y lo admitido
+sigue saliendo a tiempo. En la segunda tabla, un cliente glotón (4× la capacidad)
+comparte el coordinador con uno modesto, con y sin `--tasa-cliente`.
+
+Uso: python bench_sobrecarga.py [segundos] [servidor]
+"""
+import collections
+import statistics
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import coordinador_local, workers_locales
+
+DEADLINE = 1.0
+CARGAS = (0.5, 1, 2, 4)
+N_CARO = 200_000          # sum_squares caro: unos 25 ms de CPU con el motor bucle
+PROPORCION_CARAS = 0.1
+COSTE_ELEMENTOS = 20_000  # así un sum_squares de N_CARO cuenta como 11 add, parecido a su coste real
+CONFIGURACIONES = {
+    "sin control": (),
+    "límite fijo": ("--admision-limite", 32, "--max-rpcs", 20),
+    "adaptativo": ("--admision-limite", 32, "--admision-adaptativa", "--max-rpcs", 20),
+}
+PETICIONES = (calculo_pb2.CalculoRequest(op="add", a=2, b=3), calculo_pb2.CalculoRequest(op="sum_squares", n=N_CARO))
+
+
+def peticion(i):
+    return PETICIONES[1] if i % round(1 / PROPORCION_CARAS) == 0 else PETICIONES[0]
+
+
+def capacidad(stub, segundos, hilos=16):
+    """Peticiones/s que completa el coordinador con `hilos` clientes en bucle cerrado."""
+    detener = threading.Event()
+    completadas = [0] * hilos
+
+    def cliente(h):
+        i = h
+        while not detener.is_set():
+            stub.CalculoTotal(peticion(i), timeout=30)
+            completadas[h] += 1
+            i += hilos
+
+    with futures.ThreadPoolExecutor(hilos) as clientes:
+        for h in range(hilos):
+            clientes.submit(cliente, h)
+        time.sleep(segundos)
+        detener.set()
+    return sum(completadas) / segundos
+
+
+def bucle_abierto(stub, tasas, segundos):
+    """
+    Envía a cada cliente {nombre: peticiones/s} a ritmo fijo durante `segundos` sin esperar
+    respuestas. Retorna {nombre: {"ok": n, código: n, "latencias": [...]}}.
+    """
+    resultados = {nombre: collections.Counter() for nombre in tasas}
+    latencias = {nombre: [] for nombre in tasas}
+    pendientes = []
+
+    def anotar(nombre, t0, future):
+        codigo = future.code()
+        if codigo == grpc.StatusCode.OK and future.result().ok:
+            resultados[nombre]["ok"] += 1
+            latencias[nombre].append(time.perf_counter() - t0)
+        else:
+            resultados[nombre][codigo.name if codigo != grpc.StatusCode.OK else "error"] += 1
+
+    inicio = time.perf_counter()
+    enviadas = {nombre: 0 for nombre in tasas}
+    while (ahora := time.perf_counter()) - inicio < segundos:
+        for nombre, tasa in tasas.items():
+            while enviadas[nombre] < (ahora - inicio) * tasa:
+                i = enviadas[nombre]
+                enviadas[nombre] += 1
+                future = stub.CalculoTotal.future(peticion(i), timeout=DEADLINE, metadata=(("x-cliente", nombre),))
+                future.add_done_callback(lambda f, n=nombre, t0=ahora: anotar(n, t0, f))
+                pendientes.append(future)
+        time.sleep(0.001)
+    for future in pendientes:  # esperar a que venzan o terminen todas
+        future.exception()
+    for nombre in tasas:
+        resultados[nombre]["enviadas"] = enviadas[nombre]
+        resultados[nombre]["latencias"] = latencias[nombre]
+    return resultados
+
+
+def fila(etiqueta, r, segundos):
+    lat = sorted(r["latencias"])
+    p50 = statistics.median(lat) * 1000 if lat else 0
+    p99 = lat[int(len(lat) * 0.99)] * 1000 if lat else 0
+    return (f"{etiqueta:>24} {r['enviadas'] / segundos:>9.0f} {r['ok'] / segundos:>9.0f} {p50:>9.1f} {p99:>9.1f} "
+            f"{r['RESOURCE_EXHAUSTED'] / segundos:>9.0f} {r['DEADLINE_EXCEEDED'] / segundos:>9.0f}")
+
+
+def main():
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    servidor = sys.argv[2] if len(sys.argv) > 2 else "hilos"
+    comunes = ("--servidor", servidor, "--fanout", "concurrente", "--sondeo", 0, "--log-muestreo", 0,
+               "--coste-elementos", COSTE_ELEMENTOS)
+    cabecera = (f"{'':>24} {'enviadas/s':>9} {'goodput':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+                f"{'rechaz./s':>9} {'vencidas/s':>9}")
+
+    with workers_locales(2, "--motor", "bucle", "--log-muestreo", 0) as workers:
+        with coordinador_local(workers, *comunes) as coordinador, grpc.insecure_channel(coordinador) as channel:
+            stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+            capacidad(stub, 1)  # calentar
+            base = capacidad(stub, segundos)
+        print(f"Capacidad (bucle cerrado, 16 clientes): {base:.0f} peticiones/s; "
+              f"{PROPORCION_CARAS:.0%} son sum_squares n={N_CARO:,}; deadline {DEADLINE:.0f} s; {servidor}")
+        print(cabecera)
+
+        for config, opciones in CONFIGURACIONES.items():
+            with coordinador_local(workers, *comunes, *opciones) as coordinador, \
+                    grpc.insecure_channel(coordinador) as channel:
+                stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+                capacidad(stub, 1)
+                for carga in CARGAS:
+                    r = bucle_abierto(stub, {"cliente": carga * base}, segundos)["cliente"]
+                    print(fila(f"{config} {carga:g}×", r, segundos))
+                    time.sleep(DEADLINE)
+
+        # un cliente glotón y uno modesto: sin tasa por cliente el modesto sufre la saturación del glotón
+        print("\nCliente glotón a 4× y modesto a 0,25× la capacidad, con límite adaptativo")
+        print(cabecera)
+        coste_medio = 1 + PROPORCION_CARAS * N_CARO / COSTE_ELEMENTOS
+        tasa = base * 0.25 * coste_medio  # por cliente y en unidades de coste: lo que pide el modesto
+        for config, opciones in {"sin tasa": (), f"tasa {tasa:.0f}/s": ("--tasa-cliente", tasa)}.items():
+            with coordinador_local(workers, *comunes, *CONFIGURACIONES["adaptativo"], *opciones) as coordinador, \
+                    grpc.insecure_channel(coordinador) as channel:
+                stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+                capacidad(stub, 1)
+                resultados = bucle_abierto(stub, {"gloton": 4 * base, "modesto": 0.25 * base}, segundos)
+                for nombre, r in resultados.items():
+                    print(fila(f"{config}: {nombre}", r, segundos))
+                time.sleep(DEADLINE)
+
+
+if __name__ == "__main__":
+    main()
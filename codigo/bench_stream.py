@@ -0,0 +1,80 @@
+"""
+Generador de carga: ops/s sostenidas con CalculoTotal unario vs. CalculoStream bidireccional.
+
+Uso: python bench_stream.py [segundos] [workers] [ventana]
+"""
+import itertools
+import random
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import workers_locales, coordinador_local
+
+
+def peticion(rng, i):
+    return calculo_pb2.CalculoRequest(op=rng.choice(("add", "sub", "mul", "div")),
+                                      a=rng.uniform(1, 100), b=rng.uniform(1, 100), id=str(i))
+
+
+def carga_unaria(stub, segundos, hilos):
+    """Clientes cerrados: cada hilo espera su respuesta antes de enviar la siguiente."""
+    fin = time.perf_counter() + segundos
+    contador = itertools.count()
+
+    def cliente(semilla):
+        rng = random.Random(semilla)
+        while time.perf_counter() < fin:
+            assert stub.CalculoTotal(peticion(rng, 0)).ok
+            next(contador)
+
+    with futures.ThreadPoolExecutor(hilos) as ex:
+        list(ex.map(cliente, range(hilos)))
+    return next(contador) / segundos
+
+
+def carga_stream(stub, segundos, ventana):
+    """Un stream; como mucho `ventana` peticiones sin respuesta (control de flujo del cliente)."""
+    hueco = threading.Semaphore(ventana)
+    fin = time.perf_counter() + segundos
+    rng = random.Random(1)
+    enviados = set()
+
+    def peticiones():
+        for i in itertools.count():
+            hueco.acquire()
+            if time.perf_counter() >= fin:
+                return
+            enviados.add(str(i))
+            yield peticion(rng, i)
+
+    recibidas = 0
+    for response in stub.CalculoStream(peticiones()):
+        assert response.ok and response.id in enviados
+        recibidas += 1
+        hueco.release()
+    return recibidas / segundos
+
+
+def main():
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    ventana = int(sys.argv[3]) if len(sys.argv) > 3 else 128
+
+    with workers_locales(num_workers) as workers, coordinador_local(workers) as addr:
+        with grpc.insecure_channel(addr) as channel:
+            stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+            print(f"{num_workers} workers, {segundos:g} s por prueba")
+            print(f"{'modo':>24} {'ops/s':>10}")
+            for hilos in (1, 10):
+                print(f"{f'unario ({hilos} hilos)':>24} {carga_unaria(stub, segundos, hilos):>10.0f}")
+            print(f"{f'stream (ventana {ventana})':>24} {carga_stream(stub, segundos, ventana):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
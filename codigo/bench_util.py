@@ -0,0 +1,126 @@
+"""Utilidades comunes para los scripts de benchmark y de prueba (levantar workers locales, medir tiempos)."""
+import contextlib
+import io
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import grpc
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+
+
+def puertos_libres(k):
+    """Reserva k puertos TCP libres en localhost y los devuelve."""
+    sockets = []
+    for _ in range(k):
+        s = socket.socket()
+        s.bind(("127.0.0.1", 0))
+        sockets.append(s)
+    puertos = [s.getsockname()[1] for s in sockets]
+    for s in sockets:
+        s.close()
+    return puertos
+
+
+def esperar_puerto(addr, timeout=10):
+    """Espera hasta que haya un servidor gRPC escuchando en addr."""
+    channel = grpc.insecure_channel(addr)
+    try:
+        grpc.channel_ready_future(channel).result(timeout=timeout)
+    finally:
+        channel.close()
+
+
+def lanzar_proceso(script, *args):
+    """Lanza `python script args...` en segundo plano, sin salida por consola."""
+    return subprocess.Popen([sys.executable, os.path.join(AQUI, script), *map(str, args)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=AQUI)
+
+
+@contextlib.contextmanager
+def workers_con_procesos(k, *extra_args):
+    """Levanta k procesos worker_grpc.py en puertos libres; produce {dirección: Popen}."""
+    puertos = puertos_libres(k)
+    workers = {f"127.0.0.1:{p}": lanzar_proceso("worker_grpc.py", p, *extra_args) for p in puertos}
+    try:
+        for addr in workers:
+            esperar_puerto(addr)
+        yield workers
+    finally:
+        for proc in workers.values():
+            proc.terminate()
+        for proc in workers.values():
+            proc.wait()
+
+
+@contextlib.contextmanager
+def workers_locales(k, *extra_args):
+    """Levanta k procesos worker_grpc.py en puertos libres; produce la lista de direcciones."""
+    with workers_con_procesos(k, *extra_args) as workers:
+        yield list(workers)
+
+
+@contextlib.contextmanager
+def coordinador_local(workers, *extra_args):
+    """Levanta calc_server_grpc.py sobre `workers` en un puerto libre; produce su dirección."""
+    (puerto,) = puertos_libres(1)
+    proc = lanzar_proceso("calc_server_grpc.py", puerto, *workers, *extra_args)
+    addr = f"127.0.0.1:{puerto}"
+    try:
+        esperar_puerto(addr)
+        yield addr
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+@contextlib.contextmanager
+def silencio():
+    """Descarta los print del código medido."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def cronometrar(fn, repeticiones=3):
+    """Ejecuta fn varias veces y devuelve el mejor tiempo de pared en segundos."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def percentiles(latencias, cuantiles=(50, 95, 99, 99.9)):
+    """{"p50": ms, "p95": ms, ..., "media": ms, "max": ms} de latencias en segundos (percentil por rango más cercano)."""
+    orden = sorted(latencias)
+    if not orden:
+        return {}
+    datos = {}
+    for q in cuantiles:
+        rango = math.ceil(round(q * len(orden) / 100, 9))  # el round evita que 99.9 % de 1000 dé 1000
+        datos[f"p{q:g}".replace(".", "")] = round(orden[max(0, rango - 1)] * 1000, 3)
+    datos["media"] = round(sum(orden) / len(orden) * 1000, 3)
+    datos["max"] = round(orden[-1] * 1000, 3)
+    return datos
+
+
+def ejecutar_pruebas(espacio):
+    """
+    Ejecuta las funciones test_* de un módulo de prueba sin pytest (`espacio` = sus globals()).
+    Retorna el código de salida: 1 si alguna falló.
+    """
+    fallos = 0
+    for nombre, prueba in list(espacio.items()):
+        if nombre.startswith("test_") and callable(prueba):
+            try:
+                prueba()
+                print(f"✅ {nombre}")
+            except Exception as e:
+                fallos += 1
+                print(f"❌ {nombre}: {e!r}")
+    return 1 if fallos else 0
@@ -0,0 +1,154 @@
+"""
+Logs del coordinador y de los workers con `logging`, sin bloquear el camino de cada petición.
+
+- Cada módulo usa dos loggers: `calculo.<proceso>` para el ciclo de vida (arranque,
+  altas y bajas de workers, breakers, resúmenes al apagar) y
+  `calculo.<proceso>.peticiones` para lo que se registra en cada petición.
+- Los mensajes se pasan con argumentos `%s` y solo se formatean si el registro se
+  llega a escribir. El QueueHandler no formatea nada: deja el registro en una cola y
+  un QueueListener en segundo plano lo formatea y lo escribe, así los hilos del
+  servidor no compiten por el lock de stdout.
+- `--log-muestreo F` registra solo una fracción F de las peticiones (todas las líneas
+  de una petición salen o no juntas) y con 0 silencia por completo los logs por
+  petición. Los avisos y errores (WARNING o más) se registran siempre.
+- `--log-formato json` escribe una línea JSON por registro con sus campos `extra`.
+
+Sin llamar a configurar_logs los loggers no escriben nada (NullHandler), como cuando
+el coordinador se usa dentro de un benchmark.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+
+RAIZ = "calculo"
+SUFIJO_PETICIONES = ".peticiones"
+NIVELES = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+logging.getLogger(RAIZ).addHandler(logging.NullHandler())
+
+# atributos que trae todo LogRecord; el resto son los `extra` de la llamada
+_ATRIBUTOS_ESTANDAR = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+_muestreada = contextvars.ContextVar("peticion_muestreada", default=True)
+_tasa_muestreo = 1.0
+_listener = None
+
+
+class LoggerPeticiones(logging.LoggerAdapter):
+    """
+    Logger por petición: en las peticiones no muestreadas, INFO y DEBUG se descartan en
+    isEnabledFor, antes de crear el LogRecord y sin evaluar el mensaje.
+    """
+
+    def isEnabledFor(self, level):
+        if level < logging.WARNING and _tasa_muestreo < 1 and not _muestreada.get():
+            return False
+        return self.logger.isEnabledFor(level)
+
+    def process(self, msg, kwargs):
+        return msg, kwargs  # conservar el `extra` de cada llamada
+
+
+def obtener(proceso, peticiones=False):
+    """Logger de ciclo de vida de `proceso` ("coordinador" o "worker") o, con `peticiones`, el de cada petición."""
+    if peticiones:
+        return LoggerPeticiones(logging.getLogger(f"{RAIZ}.{proceso}{SUFIJO_PETICIONES}"))
+    return logging.getLogger(f"{RAIZ}.{proceso}")
+
+
+def nueva_peticion():
+    """Decide si se registran los logs de la petición que empieza en este hilo o tarea."""
+    if 0 < _tasa_muestreo < 1:
+        _muestreada.set(random.random() < _tasa_muestreo)
+
+
+def _proceso(record):
+    return record.name.split(".")[1] if record.name.count(".") else record.name
+
+
+class ManejadorCola(logging.handlers.QueueHandler):
+    """QueueHandler que encola el registro tal cual: el formato se hace en el hilo del listener."""
+
+    def prepare(self, record):
+        return record
+
+
+class FormatoTexto(logging.Formatter):
+    """`[COORDINADOR] mensaje`, como los print de antes."""
+
+    def format(self, record):
+        linea = f"[{_proceso(record).upper()}] {record.getMessage()}"
+        if record.exc_info:
+            linea += "\n" + self.formatException(record.exc_info)
+        return linea
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro: instante, nivel, proceso, mensaje y los campos `extra`."""
+
+    def format(self, record):
+        datos = {"ts": round(record.created, 6), "nivel": record.levelname, "proceso": _proceso(record),
+                 "hilo": record.threadName, "mensaje": record.getMessage()}
+        datos.update((k, v) for k, v in record.__dict__.items() if k not in _ATRIBUTOS_ESTANDAR)
+        if record.exc_info:
+            datos["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+def configurar_logs(nivel="INFO", formato="texto", muestreo=1.0, destino=None, cola=True):
+    """
+    Instala el QueueHandler en el logger raíz `calculo` y arranca el QueueListener que
+    escribe en `destino` (stdout por defecto). Se puede llamar de nuevo para cambiar
+    la configuración; el listener anterior se para tras vaciar su cola.
+    Con cola=False cada hilo formatea y escribe él mismo (la referencia de bench_logs.py).
+    """
+    global _tasa_muestreo, _listener
+    parar_logs()
+    _tasa_muestreo = muestreo
+    raiz = logging.getLogger(RAIZ)
+    raiz.setLevel(nivel)
+    raiz.propagate = False
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+
+    # con muestreo 0 los loggers por petición ni siquiera crean el registro
+    nivel_peticiones = logging.WARNING if muestreo <= 0 else logging.NOTSET
+    for proceso in ("coordinador", "worker"):
+        obtener(proceso, peticiones=True).logger.setLevel(nivel_peticiones)
+
+    escritor = logging.StreamHandler(destino or sys.stdout)
+    escritor.setFormatter(FormatoJSON() if formato == "json" else FormatoTexto())
+    manejador = escritor
+    if cola:
+        pendientes = queue.SimpleQueue()
+        manejador = ManejadorCola(pendientes)
+        _listener = logging.handlers.QueueListener(pendientes, escritor)
+        _listener.start()
+    raiz.addHandler(manejador)
+
+
+@atexit.register
+def parar_logs():
+    """Para el QueueListener después de escribir lo que quede en la cola."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def agregar_opciones(parser):
+    """Opciones de línea de comandos comunes al coordinador y a los workers."""
+    parser.add_argument("--log-nivel", choices=NIVELES, default="INFO", help="nivel mínimo de los logs")
+    parser.add_argument("--log-formato", choices=("texto", "json"), default="texto",
+                        help="texto como hasta ahora o una línea JSON por registro")
+    parser.add_argument("--log-muestreo", type=float, default=1.0,
+                        help="fracción de peticiones cuyos logs se registran (0 = ninguna; avisos y errores siempre)")
+
+
+def configurar_desde_args(args):
+    configurar_logs(args.log_nivel, args.log_formato, args.log_muestreo)
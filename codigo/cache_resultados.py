@@ -0,0 +1,182 @@
+"""
+Caché de resultados del coordinador.
+
+Guarda las respuestas de CalculoTotal por petición normalizada (sin el id de
+correlación ni los campos que la operación no usa), con tamaño acotado, expulsión
+LRU y TTL opcional. Además agrupa peticiones idénticas concurrentes (single-flight):
+mientras una se está calculando, las demás esperan su resultado en lugar de lanzar
+otro reparto entre los workers.
+
+Solo se guardan respuestas ok: un fallo transitorio ("Ningún worker disponible")
+no debe quedar cacheado. Si el cálculo compartido se abandona porque su cliente
+canceló o agotó su plazo (PlazoAgotado), los demás que lo esperaban lo repiten por
+su cuenta: ese plazo no era el suyo. Cada uno espera como mucho lo que le queda de su
+propio plazo; agotado, recibe PlazoAgotado aunque el cálculo compartido siga.
+"""
+import asyncio
+import collections
+import threading
+import time
+from concurrent import futures
+
+import calculo_pb2
+from operaciones import OPS_BASICAS
+from reducciones import REDUCCIONES, rango
+from plazos import PlazoAgotado
+
+
+def clave_peticion(request):
+    """Clave de caché de un CalculoRequest: solo los campos que usa su operación."""
+    if request.op in OPS_BASICAS:
+        return request.op, request.a, request.b
+    reduccion = REDUCCIONES.get(request.op)
+    if reduccion is not None:
+        try:
+            # 1..n y [1, n] son la misma petición
+            return request.op, rango(request), tuple(sorted(reduccion.parametros(request).items()))
+        except ValueError:
+            pass
+    return request.op, request.a, request.b, request.n, request.k, tuple(request.coeficientes), request.modulo
+
+
+def _copia(response):
+    """Las respuestas son mutables (p. ej. CalculoStream les pone el id): cada llamador recibe la suya."""
+    copia = calculo_pb2.CalculoResponse()
+    copia.CopyFrom(response)
+    return copia
+
+
+def _espera(plazo):
+    """Segundos que puede esperar a un cálculo ajeno quien tiene `plazo` (None = sin límite)."""
+    restante = plazo.restante() if plazo is not None else None
+    return None if restante is None else max(0.0, restante)
+
+
+class CacheResultados:
+    def __init__(self, capacidad=1024, ttl=None):
+        self.capacidad = capacidad
+        self.ttl = ttl  # segundos; None = sin caducidad
+        self._lock = threading.Lock()
+        self._entradas = collections.OrderedDict()  # clave -> (response, instante de alta)
+        self._en_curso = {}                          # clave -> Future del cálculo en marcha
+        self._en_curso_aio = {}                      # clave -> asyncio.Task (coordinador aio)
+        self.aciertos = 0
+        self.fallos = 0
+        self.agrupadas = 0
+        self.expulsadas = 0
+        self.caducadas = 0
+
+    def _buscar(self, clave):
+        """Respuesta cacheada y vigente para clave, o None. Llamar con el lock tomado."""
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            return None
+        response, alta = entrada
+        if self.ttl is not None and time.monotonic() - alta > self.ttl:
+            del self._entradas[clave]
+            self.caducadas += 1
+            return None
+        self._entradas.move_to_end(clave)
+        return response
+
+    def _guardar(self, clave, response):
+        if not response.ok or self.capacidad <= 0:
+            return
+        with self._lock:
+            self._entradas[clave] = (_copia(response), time.monotonic())
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self.expulsadas += 1
+
+    def resolver(self, request, calcular, plazo=None):
+        """
+        Devuelve la respuesta para request: de la caché, esperando a un cálculo idéntico
+        en curso (como mucho lo que le queda a `plazo`) o llamando a calcular(request)
+        si no hay ninguno.
+        """
+        clave = clave_peticion(request)
+        propio = False
+        with self._lock:
+            response = self._buscar(clave)
+            if response is not None:
+                self.aciertos += 1
+                return _copia(response)
+            futuro = self._en_curso.get(clave)
+            if futuro is not None:
+                self.agrupadas += 1
+            else:
+                self.fallos += 1
+                futuro = self._en_curso[clave] = futures.Future()
+                propio = True
+        if not propio:
+            if not futures.wait([futuro], timeout=_espera(plazo)).done:
+                raise plazo.error()
+            try:
+                return _copia(futuro.result())
+            except PlazoAgotado:
+                return self.resolver(request, calcular, plazo)
+
+        try:
+            response = calcular(request)
+        except Exception as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            self._guardar(clave, response)
+            futuro.set_result(_copia(response))
+            return response
+        finally:
+            with self._lock:
+                self._en_curso.pop(clave, None)
+
+    async def resolver_async(self, request, calcular, plazo=None):
+        """
+        Igual que resolver, para el coordinador aio: calcular(request) es una corrutina.
+        El cálculo corre en su propia tarea, así que si el cliente que lo lanzó cancela,
+        los que esperan el mismo resultado no se quedan sin él.
+        """
+        clave = clave_peticion(request)
+        propio = False
+        with self._lock:
+            response = self._buscar(clave)
+            if response is not None:
+                self.aciertos += 1
+                return _copia(response)
+            tarea = self._en_curso_aio.get(clave)
+            if tarea is not None:
+                self.agrupadas += 1
+            else:
+                self.fallos += 1
+                tarea = self._en_curso_aio[clave] = asyncio.create_task(self._calcular_async(clave, request, calcular))
+                propio = True
+        if not propio and not (await asyncio.wait({tarea}, timeout=_espera(plazo)))[0]:
+            raise plazo.error()
+        try:
+            return _copia(await asyncio.shield(tarea))
+        except PlazoAgotado:
+            if propio:
+                raise
+            return await self.resolver_async(request, calcular, plazo)
+
+    async def _calcular_async(self, clave, request, calcular):
+        try:
+            response = await calcular(request)
+            self._guardar(clave, response)
+            return response
+        finally:
+            with self._lock:
+                self._en_curso_aio.pop(clave, None)
+
+    def contadores(self):
+        """Aciertos, fallos, peticiones agrupadas (single-flight) y estado de la caché."""
+        consultas = self.aciertos + self.fallos + self.agrupadas
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "agrupadas": self.agrupadas,
+            "expulsadas": self.expulsadas,
+            "caducadas": self.caducadas,
+            "entradas": len(self._entradas),
+            "tasa_aciertos": round((self.aciertos + self.agrupadas) / consultas, 3) if consultas else 0.0,
+        }
@@ -0,0 +1,424 @@
+"""
+Coordinador sobre grpc.aio (asyncio). Se elige con `python calc_server_grpc.py ... --servidor aio`.
+
+Las llamadas a los workers no bloquean ningún hilo, así que un solo proceso puede
+mantener miles de peticiones de clientes en curso. Los subrangos de las reducciones
+(sum_squares, sum_powers...), los sub-lotes y los fragmentos de vector se despachan siempre a
+la vez (asyncio.gather).
+
+Si el cliente cancela, grpc.aio cancela la tarea de su petición y con ella las llamadas
+a los workers que tuviera en vuelo; el plazo del cliente acota el timeout de cada una.
+"""
+import asyncio
+import time
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from calc_server_grpc import dividir_rango, publicar_metricas
+from motor_sumas import MOTOR_POR_DEFECTO
+from operaciones import OPS_BASICAS, calcular_basica, calcular_basicas_lote
+from arreglos import calcular_arreglo, fragmentar, validar
+from pool_canales import OPCIONES_KEEPALIVE, PoolCanales
+from registro_workers import RegistroWorkers
+from planificador import PlanificadorPonderado, crear_planificador, dividir_rango_ponderado
+from resultados import fijar_exacto, leer_exacto, nueva_part
+from reducciones import REDUCCIONES, rango, subpeticion
+from cache_resultados import CacheResultados
+from membresia import Membresia
+from metricas import (FALLBACK_LOCAL, PLAZOS_AGOTADOS, REINTENTOS, InterceptorServidorAio, LlamadasWorkers,
+                      etiqueta_op, servir_metricas)
+from plazos import Plazo, PlazoAgotado
+from admision import InterceptorAdmisionAio
+from bitacora import nueva_peticion, obtener
+
+log = obtener("coordinador")
+log_peticiones = obtener("coordinador", peticiones=True)
+
+
+class CalculoServiceAio(calculo_pb2_grpc.CalculoServiceServicer):
+    def __init__(self, workers, motor=MOTOR_POR_DEFECTO, sondeo=0, planificador="rr", capacidades=None,
+                 reparto="igual", cache=0, cache_ttl=None, metricas=False, max_en_vuelo=64):
+        # tupla inmutable que las altas y bajas sustituyen entera (ver CalculoService)
+        self.workers = tuple(workers)
+        self._fijos = frozenset(workers)
+        self.membresia = Membresia()
+        self.planificador = crear_planificador(planificador, workers, capacidades)
+        self.capacidades_automaticas = capacidades is None
+        self.info_workers = {}  # worker_addr -> InfoWorker
+        self.reparto = reparto
+        self.motor = motor
+        self.metricas = metricas
+        # latencia por worker de las llamadas a los workers (y su span), medida al recibir cada respuesta
+        self.llamadas = LlamadasWorkers(activas=metricas)
+        self.max_en_vuelo = max_en_vuelo  # peticiones de un mismo CalculoStream resolviéndose a la vez
+        self._stubs = {}  # worker_addr -> (channel, stub), creados en el primer uso
+        # salud y circuit breaker por worker; el sondeo corre en un hilo con canales síncronos propios
+        self.registro = RegistroWorkers(workers)
+        self._canales_sondeo = PoolCanales()
+        if sondeo:
+            self.registro.iniciar_sondeo(self._canales_sondeo.obtener_canal, intervalo=sondeo)
+        self.cache = CacheResultados(cache, cache_ttl) if cache else None
+
+    def obtener_stub(self, worker_addr):
+        """Stub aio de OperacionService hacia worker_addr (canal persistente)."""
+        entrada = self._stubs.get(worker_addr)
+        if entrada is None:
+            channel = grpc.aio.insecure_channel(worker_addr, options=OPCIONES_KEEPALIVE)
+            entrada = (channel, calculo_pb2_grpc.OperacionServiceStub(channel))
+            self._stubs[worker_addr] = entrada
+        return entrada[1]
+
+    def agregar_worker(self, worker_addr, capacidad=1):
+        """Alta en caliente de worker_addr. Retorna False si ya estaba en la lista."""
+        if self.capacidades_automaticas and isinstance(self.planificador, PlanificadorPonderado):
+            self.planificador.capacidades[worker_addr] = capacidad
+        if worker_addr in self.workers:
+            return False
+        self.registro.agregar(worker_addr)
+        self.workers = self.workers + (worker_addr,)
+        log.info("➕ Worker %s dado de alta (capacidad %s); %s workers", worker_addr, capacidad, len(self.workers))
+        return True
+
+    async def quitar_worker(self, worker_addr):
+        if worker_addr not in self.workers:
+            return False
+        self.workers = tuple(w for w in self.workers if w != worker_addr)
+        self.registro.quitar(worker_addr)
+        entrada = self._stubs.pop(worker_addr, None)
+        if entrada is not None:
+            await entrada[0].close(grace=5)  # deja terminar las llamadas en curso
+        log.info("➖ Worker %s dado de baja; %s workers", worker_addr, len(self.workers))
+        return True
+
+    async def vigilar_latidos(self):
+        while True:
+            await asyncio.sleep(self.membresia.intervalo_latido)
+            for worker_addr in self.membresia.vencidos():
+                log.warning("💀 Worker %s sin latidos", worker_addr)
+                await self.quitar_worker(worker_addr)
+
+    async def Registrar(self, request, context):
+        if request.direccion not in self._fijos:
+            self.membresia.anotar(request.direccion)
+        self.agregar_worker(request.direccion, request.capacidad or 1)
+        return self.membresia.respuesta()
+
+    async def Latido(self, request, context):
+        if request.direccion not in self.workers:
+            return self.membresia.respuesta(ok=False, error="Worker no registrado")
+        if request.direccion not in self._fijos:
+            self.membresia.anotar(request.direccion)
+        return self.membresia.respuesta()
+
+    async def Baja(self, request, context):
+        self.membresia.olvidar(request.direccion)
+        return self.membresia.respuesta(ok=await self.quitar_worker(request.direccion))
+
+    async def consultar_workers(self):
+        """Pide a cada worker su capacidad con la RPC Info (ver CalculoService.consultar_workers)."""
+        async def consultar(worker_addr):
+            try:
+                info = await self.obtener_stub(worker_addr).Info(calculo_pb2.InfoRequest(), timeout=2)
+            except Exception as e:
+                log.warning("⚠️ Worker %s no informó de su capacidad: %s", worker_addr, e)
+                return
+            self.info_workers[worker_addr] = info
+            log.info("🧮 Worker %s: %s procesos, %s núcleos, motor %s",
+                     worker_addr, info.procesos, info.nucleos, info.motor)
+            if self.capacidades_automaticas and isinstance(self.planificador, PlanificadorPonderado):
+                self.planificador.capacidades[worker_addr] = info.procesos
+
+        await asyncio.gather(*(consultar(w) for w in self.workers))
+
+    def registrar_abandono(self, worker_addr):
+        """Ver CalculoService.registrar_abandono."""
+        self.registro.registrar_abandono(worker_addr)
+        self.planificador.fin(worker_addr)
+
+    async def enviar_con_reintentos(self, request, etiqueta, metodo="Calcular", aceptar=lambda r: r.ok,
+                                    trabajo=None, preferido=None, plazo=None):
+        """
+        Prueba request en cada worker (en el orden del planificador, con `preferido` primero)
+        hasta que uno devuelva una respuesta aceptada. Retorna (response, worker_addr) o (None, None);
+        lanza PlazoAgotado si se acaba el plazo del cliente.
+        """
+        plazo = plazo or Plazo()
+        orden = self.planificador.orden(self.workers)
+        if preferido is not None:
+            orden = [preferido] + [w for w in orden if w != preferido]
+        ultima = None
+        for worker_addr in orden:
+            if not self.registro.disponible(worker_addr):
+                continue
+            if plazo.agotado:
+                self.registro.registrar_abandono(worker_addr)  # por si era la prueba de su breaker
+                raise plazo.error()
+            self.planificador.inicio(worker_addr)
+            metadatos, marca = self.llamadas.empezar(worker_addr)
+            t0 = time.perf_counter()
+            try:
+                response = await getattr(self.obtener_stub(worker_addr), metodo)(request, timeout=plazo.timeout(),
+                                                                                  metadata=metadatos)
+            except asyncio.CancelledError as e:
+                self.llamadas.terminar(marca, metodo, e, time.perf_counter() - t0, getattr(request, "op", ""))
+                self.registrar_abandono(worker_addr)  # el cliente canceló: la llamada se cancela con la tarea
+                raise
+            except Exception as e:
+                self.llamadas.terminar(marca, metodo, e, time.perf_counter() - t0, getattr(request, "op", ""))
+                if plazo.agotado:
+                    self.registrar_abandono(worker_addr)
+                    raise plazo.error() from e
+                log_peticiones.warning("❌ Error conectando a worker %s: %s", worker_addr, e)
+                self.registro.registrar_fallo(worker_addr)
+                self.planificador.fin(worker_addr)
+                REINTENTOS.inc(modo="aio")
+                continue
+            latencia = time.perf_counter() - t0
+            self.llamadas.terminar(marca, metodo, None, latencia, getattr(request, "op", ""))
+            self.registro.registrar_exito(worker_addr, latencia)
+            self.planificador.fin(worker_addr, latencia, trabajo)
+            if aceptar(response):
+                return response, worker_addr
+            log_peticiones.warning("⚠️ Worker %s devolvió error para %s: %s", worker_addr, etiqueta, response.error)
+            ultima = (response, worker_addr)
+        return ultima or (None, None)
+
+    async def CalculoTotal(self, request, context):
+        nueva_peticion()
+        try:
+            return await self._resolver(request, context)
+        except PlazoAgotado as e:
+            return await self._abandonar(e, context)
+
+    async def _resolver(self, request, context, plazo=None):
+        """Ver CalculoService._resolver."""
+        plazo = plazo or Plazo(context)
+        if self.cache is not None:
+            return await self.cache.resolver_async(request, lambda r: self._calculo_total(r, plazo), plazo)
+        return await self._calculo_total(request, plazo)
+
+    async def _abandonar(self, error, context):
+        """Ver CalculoService._abandonar."""
+        PLAZOS_AGOTADOS.inc(motivo=error.motivo)
+        log_peticiones.info("🛑 %s: se abandona la petición", error)
+        if context is None:
+            raise error
+        await context.abort(error.codigo, str(error))
+
+    async def _calculo_total(self, request, plazo):
+        op = request.op
+
+        if op in OPS_BASICAS:
+            # un error de la operación (p. ej. división por cero) se devuelve tal cual al cliente
+            response, _ = await self.enviar_con_reintentos(request, op, aceptar=lambda r: True, plazo=plazo)
+            if response is not None:
+                return response
+            log_peticiones.warning("⚠️ Ningún worker disponible para operación básica. Resolviendo localmente.")
+            FALLBACK_LOCAL.inc(op=op)
+            return calcular_basica(op, request.a, request.b)
+
+        elif op in REDUCCIONES:
+            return await self._reducir(request, plazo)
+
+        else:
+            log_peticiones.warning("❌ Operación no soportada: %s", op)
+            return calculo_pb2.CalculoResponse(ok=False, error="Operación no soportada")
+
+    async def _reducir(self, request, plazo):
+        """Ver CalculoService._reducir; aquí todos los subrangos van a la vez."""
+        op = request.op
+        reduccion = REDUCCIONES[op]
+        try:
+            a, b = rango(request)
+            parametros = reduccion.parametros(request)
+        except ValueError as e:
+            return calculo_pb2.CalculoResponse(ok=False, error=str(e))
+        if b < a:
+            return fijar_exacto(calculo_pb2.CalculoResponse(ok=True), reduccion.neutro(parametros))
+        loop = asyncio.get_running_loop()
+        workers = self.workers
+        if not workers:
+            FALLBACK_LOCAL.inc(op=op)
+            total_local = await loop.run_in_executor(None, reduccion.mapear, a, b, parametros, self.motor)
+            response = calculo_pb2.CalculoResponse(ok=True, parts=[nueva_part(a, b, total_local, "coordinator_local")])
+            return fijar_exacto(response, total_local)
+
+        partes = min(len(workers), b - a + 1)
+        if self.reparto == "rendimiento":
+            preferidos = ([w for w in workers if not self.registro.abierto(w)] or list(workers))[:partes]
+            rangos = dividir_rango_ponderado(b - a + 1, self.planificador.pesos(preferidos), inicio=a)
+        else:
+            preferidos = [None] * partes
+            rangos = dividir_rango(b - a + 1, partes, inicio=a)
+
+        async def resolver(start, end, preferido):
+            response, worker_addr = await self.enviar_con_reintentos(
+                subpeticion(request, start, end), f"rango {start}..{end}", trabajo=end - start + 1,
+                preferido=preferido, plazo=plazo)
+            if response is not None and response.ok:
+                return nueva_part(start, end, leer_exacto(response), worker_addr)
+            log_peticiones.warning("⚠️ Ningún worker procesó rango %s..%s. Calculando localmente ese subrango.",
+                                   start, end)
+            FALLBACK_LOCAL.inc(op=op)
+            local_res = await loop.run_in_executor(None, reduccion.mapear, start, end, parametros, self.motor)
+            return nueva_part(start, end, local_res, "coordinator_local")
+
+        parts_result = await asyncio.gather(*(resolver(x, y, w) for (x, y), w in zip(rangos, preferidos)))
+        total = reduccion.total((leer_exacto(p) for p in parts_result), parametros)
+        return fijar_exacto(calculo_pb2.CalculoResponse(ok=True, parts=parts_result), total)
+
+    async def CalculoBatch(self, request, context):
+        nueva_peticion()
+        items = request.items
+        respuestas = [None] * len(items)
+
+        basicas = [i for i, it in enumerate(items) if it.op in OPS_BASICAS]
+        workers = self.workers
+        plazo = Plazo(context)
+        if basicas and workers:
+            trozos = [basicas[a - 1:b] for a, b in dividir_rango(len(basicas), min(len(workers), len(basicas)))]
+            try:
+                enviados = await asyncio.gather(*(
+                    self.enviar_con_reintentos(calculo_pb2.CalculoBatchRequest(items=[items[i] for i in trozo]),
+                                               f"sub-lote de {len(trozo)} operaciones",
+                                               metodo="CalculoBatch", aceptar=lambda r: True, plazo=plazo)
+                    for trozo in trozos))
+            except PlazoAgotado as e:
+                return await self._abandonar(e, context)
+            for trozo, (response, _) in zip(trozos, enviados):
+                if response is not None:
+                    for i, item_response in zip(trozo, response.items):
+                        respuestas[i] = item_response
+
+        pendientes = [i for i in basicas if respuestas[i] is None]
+        for i in pendientes:
+            FALLBACK_LOCAL.inc(op=items[i].op)
+        for i, response in zip(pendientes, calcular_basicas_lote([items[i] for i in pendientes])):
+            respuestas[i] = response
+
+        otras = [i for i, r in enumerate(respuestas) if r is None]
+        for i, response in zip(otras, await asyncio.gather(*(self.CalculoTotal(items[i], context) for i in otras))):
+            respuestas[i] = response
+
+        return calculo_pb2.CalculoBatchResponse(items=respuestas)
+
+    async def CalculoArray(self, request_iterator, context):
+        """Ver CalculoService.CalculoArray."""
+        nueva_peticion()
+        plazo = Plazo(context)
+        try:
+            async for trozo in request_iterator:
+                for chunk in await self._calcular_trozo(trozo, plazo):
+                    yield chunk
+                    if not chunk.ok:
+                        return
+        except PlazoAgotado as e:
+            await self._abandonar(e, context)
+
+    async def _calcular_trozo(self, trozo, plazo):
+        datos_a, datos_b = trozo.a, trozo.b  # con upb cada lectura de un campo bytes lo copia
+        try:
+            validar(trozo.op, trozo.dtype, len(datos_a), len(datos_b))
+        except ValueError as e:
+            return [calculo_pb2.ArrayChunk(ok=False, error=str(e), desplazamiento=trozo.desplazamiento, id=trozo.id)]
+
+        async def resolver(x, y, subreq):
+            response, worker_addr = await self.enviar_con_reintentos(
+                subreq, f"bytes {subreq.desplazamiento}..{subreq.desplazamiento + y - x}", metodo="CalculoArray",
+                aceptar=lambda r: True, plazo=plazo)
+            if response is None:
+                log_peticiones.warning("⚠️ Ningún worker procesó los bytes %s..%s. Calculando localmente.", x, y)
+                FALLBACK_LOCAL.inc(op=etiqueta_op(trozo.op))
+                response = calcular_arreglo(trozo.op, trozo.dtype, datos_a[x:y], datos_b[x:y],
+                                            trozo.desplazamiento + x)
+                worker_addr = "coordinator_local"
+            response.worker = worker_addr
+            response.id = trozo.id
+            return response
+
+        fragmentos = fragmentar(trozo, datos_a, datos_b, len(self.workers))
+        return await asyncio.gather(*(resolver(x, y, subreq) for x, y, subreq in fragmentos))
+
+    async def CalculoStream(self, request_iterator, context):
+        """
+        Cada petición del stream se resuelve en su propia tarea; las respuestas salen al terminar.
+        Con max_en_vuelo tareas en curso se deja de leer del cliente (backpressure).
+        Una tarea que falla (p. ej. con el plazo agotado) no aborta nada: pasa su excepción
+        por la cola y es el handler quien termina el stream.
+        """
+        salida = asyncio.Queue()
+        huecos = asyncio.Semaphore(self.max_en_vuelo)
+        tareas = set()  # solo las que siguen en curso
+        plazo = Plazo(context)  # uno para todo el stream
+
+        async def resolver(request):
+            nueva_peticion()
+            try:
+                response = await self._resolver(request, context, plazo)
+                response.id = request.id
+            except Exception as e:
+                response = e
+            finally:
+                huecos.release()
+            salida.put_nowait(response)
+
+        async def leer_entrada():
+            async for request in request_iterator:
+                await huecos.acquire()
+                tarea = asyncio.create_task(resolver(request))
+                tareas.add(tarea)
+                tarea.add_done_callback(tareas.discard)
+            await asyncio.gather(*tareas)
+            await salida.put(None)
+
+        lector = asyncio.create_task(leer_entrada())
+        try:
+            while (response := await salida.get()) is not None:
+                if isinstance(response, PlazoAgotado):
+                    await self._abandonar(response, context)
+                if isinstance(response, Exception):
+                    raise response
+                yield response
+        finally:
+            lector.cancel()
+            for tarea in list(tareas):
+                tarea.cancel()
+
+    async def cerrar(self):
+        self.registro.detener_sondeo()
+        self._canales_sondeo.cerrar()
+        for channel, _ in self._stubs.values():
+            await channel.close()
+        self._stubs.clear()
+
+
+async def serve_aio(port, workers, metricas_puerto=None, trazas=False, admision=None, max_rpcs=None, **opciones):
+    """Levanta el coordinador aio; `opciones` se pasan a CalculoServiceAio (métricas y admisión: ver serve)."""
+    metricas = metricas_puerto is not None
+    interceptores = [InterceptorServidorAio("coordinador")] if metricas else []
+    if admision is not None:
+        interceptores.append(InterceptorAdmisionAio(admision))
+    server = grpc.aio.server(interceptors=interceptores or None, maximum_concurrent_rpcs=max_rpcs)
+    servicio = CalculoServiceAio(workers, metricas=metricas, **opciones)
+    calculo_pb2_grpc.add_CalculoServiceServicer_to_server(servicio, server)
+    server.add_insecure_port(f"[::]:{port}")
+    await server.start()
+    log.info("✅ Coordinador gRPC (aio) escuchando en puerto %s con workers: %s", port, workers)
+    consulta = asyncio.create_task(servicio.consultar_workers())
+    latidos = asyncio.create_task(servicio.vigilar_latidos())
+    if metricas:
+        publicar_metricas(servicio, admision)
+        servir_metricas(metricas_puerto, trazas)
+    try:
+        await server.wait_for_termination()
+    finally:
+        consulta.cancel()
+        latidos.cancel()
+        await server.stop(0)
+        if servicio.cache is not None:
+            log.info("Caché de resultados: %s", servicio.cache.contadores())
+        if admision is not None:
+            log.info("Control de admisión: %s", admision.contadores())
+        await servicio.cerrar()
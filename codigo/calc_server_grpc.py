@@ -1,71 +1,434 @@
 import grpc
 from concurrent import futures
+import queue
+import threading
 import time
-import itertools
 
 import calculo_pb2
 import calculo_pb2_grpc
-
-
-def sum_squares_local(a: int, b: int) -> int:
-    """Cálculo local de sumatoria de cuadrados entre a y b (inclusive)."""
-    # implementación simple y robusta
-    total = 0
-    for i in range(a, b + 1):
-        total += i * i
-    return total
+from pool_canales import PoolCanales
+from motor_sumas import motores_disponibles, MOTOR_POR_DEFECTO
+from resultados import fijar_exacto, leer_exacto, nueva_part
+from operaciones import OPS_BASICAS, calcular_basica, calcular_basicas_lote
+from arreglos import calcular_arreglo, fragmentar, validar
+from flujos import StreamWorker
+from registro_workers import RegistroWorkers
+from planificador import POLITICAS, PlanificadorPonderado, crear_planificador, dividir_rango_ponderado
+from trozos import TrabajoPorTrozos
+from reducciones import REDUCCIONES, rango, subpeticion
+from cache_resultados import CacheResultados
+from membresia import Membresia
+from metricas import (FALLBACK_LOCAL, METRICAS, PLAZOS_AGOTADOS, REINTENTOS, InterceptorServidor, LlamadasWorkers,
+                      etiqueta_op, servir_metricas)
+from plazos import Plazo, PlazoAgotado
+from admision import COSTE_ELEMENTOS, ControlAdmision, InterceptorAdmision
+from bitacora import agregar_opciones, configurar_desde_args, nueva_peticion, obtener
+
+log = obtener("coordinador")
+log_peticiones = obtener("coordinador", peticiones=True)
+
+GRACIA_BAJA = 5.0  # s que se mantiene abierto el canal de un worker dado de baja
+HILOS_SERVIDOR = 10  # hilos del servidor síncrono que atienden RPC
+
+
+def dividir_rango(n: int, parts: int, inicio: int = 1):
+    """Divide inicio..inicio+n-1 (1..n por defecto) en `parts` subrangos contiguos [(a, b), ...]."""
+    size = n // parts
+    extra = n % parts
+
+    rangos = []
+    start = inicio
+    for i in range(parts):
+        end = start + size - 1
+        if i < extra:
+            end += 1
+
+        if end < start:
+            end = start  # protección en caso n < parts
+
+        rangos.append((start, end))
+        start = end + 1
+    return rangos
 
 
 class CalculoService(calculo_pb2_grpc.CalculoServiceServicer):
-    def __init__(self, workers):
-        self.workers = workers
-        # ciclo round-robin sobre índices (0..N-1)
-        self.rr_counter = itertools.cycle(range(max(1, len(workers))))
+    def __init__(self, workers, fanout="secuencial", motor=MOTOR_POR_DEFECTO, max_en_vuelo=64, sondeo=0,
+                 planificador="rr", capacidades=None, reparto="igual", tam_trozo=None, cache=0, cache_ttl=None,
+                 metricas=False):
+        # tupla inmutable: las altas y bajas la sustituyen entera, así cada petición la lee sin locks
+        self.workers = tuple(workers)
+        self._fijos = frozenset(workers)  # los de la línea de comandos no caducan por falta de latidos
+        self._lock_membresia = threading.Lock()  # solo lo toman las altas y bajas
+        self.membresia = Membresia()
+        self._fin = threading.Event()
+        self.max_en_vuelo = max_en_vuelo
+        # orden en que se prueban los workers (round robin, ponderado, menos pendientes, p2c)
+        self.planificador = crear_planificador(planificador, workers, capacidades)
+        # sin --capacidades, el planificador ponderado usa los procesos que anuncia cada worker (Info)
+        self.capacidades_automaticas = capacidades is None
+        self.info_workers = {}  # worker_addr -> InfoWorker
+        # "igual": 1..n en partes iguales; "rendimiento": proporcional al rendimiento medido de cada worker
+        self.reparto = reparto
+        # "secuencial": un subrango tras otro; "concurrente": todos a la vez (scatter-gather);
+        # "trozos": muchos trozos pequeños que cada worker va pidiendo (work stealing)
+        self.fanout = fanout
+        # tamaño fijo de trozo en modo "trozos" (None = adaptativo según el rendimiento de cada worker)
+        self.tam_trozo = tam_trozo
+        # motor para los cálculos locales (fallback) de las reducciones
+        self.motor = motor
+        # canales persistentes por worker (se crean al primer uso)
+        self.pool = PoolCanales()
+        # latencia por worker de las llamadas a los workers (y su span), medida al recoger cada respuesta
+        self.llamadas = LlamadasWorkers(activas=metricas)
+        # salud de cada worker: fallos, latencia EWMA y circuit breaker
+        self.registro = RegistroWorkers(workers)
+        if sondeo:
+            self.registro.iniciar_sondeo(self.pool.obtener_canal, intervalo=sondeo)
+        # un stream bidireccional persistente por worker para CalculoStream
+        self.streams = {w: StreamWorker(w, self.obtener_stub, max_en_vuelo) for w in workers}
+        # operaciones de un stream que no van al worker como una sola petición (las reducciones)
+        self.ejecutor_stream = futures.ThreadPoolExecutor(max_workers=10, thread_name_prefix="stream-op")
+        # caché LRU de resultados (cache = nº de entradas; 0 = sin caché) con agrupación de peticiones idénticas
+        self.cache = CacheResultados(cache, cache_ttl) if cache else None
+
+    def obtener_stub(self, worker_addr):
+        """Stub de OperacionService hacia worker_addr, tomado del pool de canales."""
+        return self.pool.obtener_stub(worker_addr)
+
+    def agregar_worker(self, worker_addr, capacidad=1):
+        """Alta en caliente de worker_addr. Retorna False si ya estaba en la lista."""
+        with self._lock_membresia:
+            if self.capacidades_automaticas and isinstance(self.planificador, PlanificadorPonderado):
+                self.planificador.capacidades[worker_addr] = capacidad
+            if worker_addr in self.workers:
+                return False
+            self.registro.agregar(worker_addr)
+            self.streams = {**self.streams,
+                            worker_addr: StreamWorker(worker_addr, self.obtener_stub, self.max_en_vuelo)}
+            # publicar la nueva lista en último lugar, cuando todo lo demás ya está listo
+            self.workers = self.workers + (worker_addr,)
+        log.info("➕ Worker %s dado de alta (capacidad %s); %s workers", worker_addr, capacidad, len(self.workers))
+        return True
+
+    def quitar_worker(self, worker_addr):
+        """Baja de worker_addr: deja de recibir peticiones nuevas; las que tenga en curso terminan o se reintentan."""
+        with self._lock_membresia:
+            if worker_addr not in self.workers:
+                return False
+            self.workers = tuple(w for w in self.workers if w != worker_addr)
+            stream = self.streams.get(worker_addr)
+            self.streams = {w: st for w, st in self.streams.items() if w != worker_addr}
+            self.registro.quitar(worker_addr)
+        if stream is not None:
+            stream.cerrar()
+        # el canal se cierra más tarde para no cortar las llamadas unarias que aún estén en curso
+        temporizador = threading.Timer(GRACIA_BAJA, self._cerrar_canal_si_baja, args=(worker_addr,))
+        temporizador.daemon = True
+        temporizador.start()
+        log.info("➖ Worker %s dado de baja; %s workers", worker_addr, len(self.workers))
+        return True
+
+    def _cerrar_canal_si_baja(self, worker_addr):
+        if worker_addr not in self.workers:  # salvo que haya vuelto a darse de alta entretanto
+            self.pool.invalidar(worker_addr)
+
+    def vigilar_latidos(self):
+        """Da de baja a los workers dinámicos que dejan de enviar latidos (hasta cerrar())."""
+        while not self._fin.wait(self.membresia.intervalo_latido):
+            for worker_addr in self.membresia.vencidos():
+                log.warning("💀 Worker %s sin latidos", worker_addr)
+                self.quitar_worker(worker_addr)
+
+    def Registrar(self, request, context):
+        if request.direccion not in self._fijos:
+            self.membresia.anotar(request.direccion)
+        self.agregar_worker(request.direccion, request.capacidad or 1)
+        return self.membresia.respuesta()
+
+    def Latido(self, request, context):
+        if request.direccion not in self.workers:
+            # p. ej. el coordinador se reinició o el worker caducó: que vuelva a darse de alta
+            return self.membresia.respuesta(ok=False, error="Worker no registrado")
+        if request.direccion not in self._fijos:
+            self.membresia.anotar(request.direccion)
+        return self.membresia.respuesta()
+
+    def Baja(self, request, context):
+        self.membresia.olvidar(request.direccion)
+        return self.membresia.respuesta(ok=self.quitar_worker(request.direccion))
+
+    def consultar_workers(self):
+        """Pide a cada worker su capacidad (procesos, núcleos, motor) con la RPC Info."""
+        for worker_addr in self.workers:
+            try:
+                info = self.obtener_stub(worker_addr).Info(calculo_pb2.InfoRequest(), timeout=2)
+            except Exception as e:
+                log.warning("⚠️ Worker %s no informó de su capacidad: %s", worker_addr, e)
+                continue
+            self.info_workers[worker_addr] = info
+            log.info("🧮 Worker %s: %s procesos, %s núcleos, motor %s",
+                     worker_addr, info.procesos, info.nucleos, info.motor)
+            if self.capacidades_automaticas and isinstance(self.planificador, PlanificadorPonderado):
+                self.planificador.capacidades[worker_addr] = info.procesos
+
+    def orden_workers(self, excluir=(), preferido=None):
+        """
+        Workers a probar para una petición, en el orden del planificador (con `preferido`
+        primero si se indica), saltando los que tienen el breaker abierto. Es un generador
+        para que el paso a semiabierto solo ocurra cuando de verdad se va a enviar la
+        petición de prueba a ese worker.
+        """
+        orden = self.planificador.orden(self.workers)
+        if preferido is not None:
+            orden = [preferido] + [w for w in orden if w != preferido]
+        for worker_addr in orden:
+            if worker_addr not in excluir and self.registro.disponible(worker_addr):
+                yield worker_addr
+
+    def registrar_exito(self, worker_addr, latencia, trabajo=None):
+        """Cierra una petición enviada con planificador.inicio que terminó bien."""
+        self.registro.registrar_exito(worker_addr, latencia)
+        self.planificador.fin(worker_addr, latencia, trabajo)
+
+    def registrar_abandono(self, worker_addr):
+        """Cierra una petición que ya nadie espera (plazo agotado, cancelada, copia sobrante): no es culpa del worker."""
+        self.registro.registrar_abandono(worker_addr)
+        self.planificador.fin(worker_addr)
+
+    def registrar_fallo(self, worker_addr, error):
+        """
+        Cierra una petición fallida y la cuenta en el registro de salud. El canal no se toca
+        aunque el error sea UNAVAILABLE: gRPC lo reconecta solo, y cerrarlo cancelaría las
+        llamadas de otras peticiones al mismo worker (que contarían como más fallos).
+        """
+        self.registro.registrar_fallo(worker_addr)
+        self.planificador.fin(worker_addr)
 
-    def enviar_a_worker(self, request, worker_addr):
+    def enviar_a_worker(self, request, worker_addr, trabajo=None, plazo=None):
         """
-        Intenta enviar request a worker_addr.
-        Retorna (response, worker_addr) o (None, worker_addr) si falla.
+        Intenta enviar request a worker_addr con el timeout que deja el plazo del cliente.
+        Retorna (response, worker_addr) o (None, worker_addr) si falla; lanza PlazoAgotado
+        si el cliente ya no espera la respuesta.
         """
+        plazo = plazo or Plazo()
+        if plazo.agotado:
+            self.registro.registrar_abandono(worker_addr)  # por si era la prueba de su breaker
+            raise plazo.error()
+        self.planificador.inicio(worker_addr)
+        metadatos, marca = self.llamadas.empezar(worker_addr)
+        t0 = time.perf_counter()
         try:
-            channel = grpc.insecure_channel(worker_addr)
-            stub = calculo_pb2_grpc.OperacionServiceStub(channel)
-            # llamar con timeout corto para no bloquear mucho
-            response = stub.Calcular(request, timeout=5)
+            stub = self.obtener_stub(worker_addr)
+            # con future para que la llamada se pueda cancelar si el cliente se desconecta
+            response = plazo.vigilar(stub.Calcular.future(request, timeout=plazo.timeout(), metadata=metadatos)).result()
+            latencia = time.perf_counter() - t0
+            self.llamadas.terminar(marca, "Calcular", None, latencia, request.op)
+            self.registrar_exito(worker_addr, latencia, trabajo)
             return response, worker_addr
         except Exception as e:
-            print(f"❌ Error conectando a worker {worker_addr}: {e}")
+            self.llamadas.terminar(marca, "Calcular", e, time.perf_counter() - t0, request.op)
+            if plazo.agotado:
+                # el worker no tiene la culpa: no se cuenta como fallo suyo
+                self.registrar_abandono(worker_addr)
+                raise plazo.error() from e
+            log_peticiones.warning("❌ Error conectando a worker %s: %s", worker_addr, e)
+            self.registrar_fallo(worker_addr, e)
             return None, worker_addr
 
+    def _reduccion_secuencial(self, request, rangos, preferidos=None, plazo=None):
+        """Envía cada subrango de la reducción a los workers uno tras otro. Retorna la lista de Part."""
+        plazo = plazo or Plazo()
+        parts_result = []
+
+        for i, (start, end) in enumerate(rangos):
+            subreq = subpeticion(request, start, end)
+
+            # Intentar con todos los workers hasta que uno responda para este subrango
+            success = False
+            for worker_addr in self.orden_workers(preferido=preferidos[i] if preferidos else None):
+                log_peticiones.info("Intentando rango %s..%s en worker %s", start, end, worker_addr)
+
+                response, used_worker = self.enviar_a_worker(subreq, worker_addr, trabajo=end - start + 1,
+                                                             plazo=plazo)
+                if response is None:
+                    log_peticiones.warning("❌ Sin respuesta de worker %s, probando otro", worker_addr)
+                    REINTENTOS.inc(modo="secuencial")
+                    continue
+                if not response.ok:
+                    # Si el worker respondió con error (p. ej. rango inválido), registrarlo y seguir intentando
+                    log_peticiones.warning("⚠️ Worker %s devolvió error: %s", used_worker, response.error)
+                    REINTENTOS.inc(modo="secuencial")
+                    continue
+                # ok
+                valor = leer_exacto(response)
+                log_peticiones.info("✅ Worker %s devolvió %s para rango %s..%s", used_worker, valor, start, end)
+                parts_result.append(nueva_part(start, end, valor, used_worker))
+                success = True
+                break
+
+            if not success:
+                plazo.comprobar()
+                parts_result.append(self._fallback_local(request, start, end))
+
+        return parts_result
+
+    def _reduccion_concurrente(self, request, rangos, preferidos=None, plazo=None):
+        """Envía todos los subrangos de la reducción a la vez (scatter-gather). Retorna la lista de Part."""
+        subreqs = [subpeticion(request, start, end) for start, end in rangos]
+        etiquetas = [f"rango {start}..{end}" for start, end in rangos]
+        trabajos = [end - start + 1 for start, end in rangos]
+        enviados = self._scatter_gather(subreqs, etiquetas, trabajos=trabajos, preferidos=preferidos, plazo=plazo)
+        parts_result = []
+        for (start, end), (response, worker_addr) in zip(rangos, enviados):
+            if response is None:
+                parts_result.append(self._fallback_local(request, start, end))
+            else:
+                parts_result.append(nueva_part(start, end, leer_exacto(response), worker_addr))
+        return parts_result
+
+    def _scatter_gather(self, subreqs, etiquetas, metodo="Calcular", aceptar=lambda r: r.ok,
+                        trabajos=None, preferidos=None, plazo=None):
+        """
+        Scatter-gather: despacha todas las subpeticiones a la vez con stub.<metodo>.future
+        y recoge las respuestas a medida que terminan. Una subpetición fallida (o cuya
+        respuesta no pasa `aceptar`) se reintenta de inmediato en otro worker que aún
+        no la haya intentado.
+        `trabajos` (elementos de cada subrango, solo en reducciones) alimenta el rendimiento medido y
+        `preferidos` indica a qué worker va primero cada subpetición.
+        Las subpeticiones usan el timeout que deja `plazo`; si se agota (o el cliente
+        cancela), se cancela lo que quede en vuelo y se lanza PlazoAgotado.
+        Retorna una lista alineada con subreqs de (response, worker_addr), o (None, None)
+        si ningún worker pudo resolverla.
+        """
+        plazo = plazo or Plazo()
+        terminados = queue.Queue()
+        intentados = [set() for _ in subreqs]
+        resultados = [(None, None)] * len(subreqs)
+
+        def despachar(i):
+            """Envía la subpetición i al siguiente worker no intentado. False si no quedan."""
+            if plazo.agotado:
+                return False
+            preferido = preferidos[i] if preferidos and not intentados[i] else None
+            for worker_addr in self.orden_workers(excluir=intentados[i], preferido=preferido):
+                intentados[i].add(worker_addr)
+                log_peticiones.info("Despachando %s a worker %s", etiquetas[i], worker_addr)
+                self.planificador.inicio(worker_addr)
+                metadatos, marca = self.llamadas.empezar(worker_addr)
+                t0 = time.perf_counter()
+                try:
+                    rpc = getattr(self.obtener_stub(worker_addr), metodo)
+                    future = plazo.vigilar(rpc.future(subreqs[i], timeout=plazo.timeout(), metadata=metadatos))
+                except Exception as e:
+                    self.llamadas.terminar(marca, metodo, e, time.perf_counter() - t0)
+                    log_peticiones.warning("❌ Error conectando a worker %s: %s", worker_addr, e)
+                    self.registrar_fallo(worker_addr, e)
+                    continue
+
+                def al_terminar(f, i=i, w=worker_addr, marca=marca, t0=t0):
+                    latencia = time.perf_counter() - t0
+                    self.llamadas.terminar(marca, metodo, f, latencia, getattr(subreqs[i], "op", ""))
+                    terminados.put((i, w, f, latencia))
+
+                future.add_done_callback(al_terminar)
+                return True
+            return False
+
+        pendientes = sum(1 for i in range(len(subreqs)) if despachar(i))
+
+        while pendientes:
+            i, worker_addr, future, latencia = terminados.get()
+            pendientes -= 1
+            if plazo.agotado:
+                # nadie espera ya el resultado: se cancela lo que quede y se recogen las cancelaciones
+                self.registrar_abandono(worker_addr)
+                plazo.cortar()
+                continue
+            try:
+                response = future.result()
+                self.registrar_exito(worker_addr, latencia, trabajos[i] if trabajos else None)
+            except Exception as e:
+                log_peticiones.warning("❌ Error conectando a worker %s: %s", worker_addr, e)
+                self.registrar_fallo(worker_addr, e)
+                response = None
+
+            if response is not None and aceptar(response):
+                log_peticiones.info("✅ Worker %s resolvió %s", worker_addr, etiquetas[i])
+                resultados[i] = (response, worker_addr)
+                continue
+
+            if response is None:
+                log_peticiones.warning("❌ Sin respuesta de worker %s, reintentando %s", worker_addr, etiquetas[i])
+            else:
+                log_peticiones.warning("⚠️ Worker %s devolvió error: %s", worker_addr, response.error)
+
+            if despachar(i):
+                REINTENTOS.inc(modo={"Calcular": "concurrente", "CalculoArray": "arreglo"}.get(metodo, "lote"))
+                pendientes += 1
+
+        plazo.comprobar()
+        return resultados
+
+    def _fallback_local(self, request, start, end):
+        """Si ningún worker pudo procesar el subrango, se calcula en el coordinador."""
+        log_peticiones.warning("⚠️ Ningún worker procesó rango %s..%s. Calculando localmente ese subrango.", start, end)
+        FALLBACK_LOCAL.inc(op=request.op)
+        reduccion = REDUCCIONES[request.op]
+        local_res = reduccion.mapear(start, end, reduccion.parametros(request), self.motor)
+        log_peticiones.info("✅ Resultado local para %s..%s = %s", start, end, local_res)
+        return nueva_part(start, end, local_res, "coordinator_local")
+
     def CalculoTotal(self, request, context):
-        op = request.op
-        print(f"\n[COORDINADOR] Nueva operación recibida: {op}")
-        print(f"[COORDINADOR] Datos recibidos -> a={request.a}, b={request.b}, n={request.n}")
+        nueva_peticion()
+        try:
+            return self._resolver(request, context)
+        except PlazoAgotado as e:
+            return self._abandonar(e, context)
 
-        num_workers = len(self.workers)
+    def _resolver(self, request, context, plazo=None):
+        """
+        CalculoTotal sin abortar la RPC: lanza PlazoAgotado. Un lote o un stream pasan su propio
+        `plazo` para no crear uno (y un context.add_callback) por cada petición.
+        """
+        plazo = plazo or Plazo(context)
+        if self.cache is not None:
+            return self.cache.resolver(request, lambda r: self._calculo_total(r, plazo), plazo)
+        return self._calculo_total(request, plazo)
+
+    def _abandonar(self, error, context):
+        """Termina una petición cuyo cliente ya no espera: DEADLINE_EXCEEDED o CANCELLED."""
+        PLAZOS_AGOTADOS.inc(motivo=error.motivo)
+        log_peticiones.info("🛑 %s: se abandona la petición", error)
+        if context is None:
+            raise error
+        context.abort(error.codigo, str(error))
+
+    def _calculo_total(self, request, plazo):
+        op = request.op
+        log_peticiones.info("Nueva operación recibida: %s", op, extra={"op": op})
+        log_peticiones.info("Datos recibidos -> a=%s, b=%s, n=%s", request.a, request.b, request.n)
 
         # --- operaciones básicas (add, sub, mul, div) ---
-        if op in ("add", "sub", "mul", "div"):
+        if op in OPS_BASICAS:
             # Intentar usar los workers primero
             any_worker_responded = False
             last_non_ok_response = None
 
-            for _ in range(max(1, num_workers)):
-                idx = next(self.rr_counter)
-                worker_addr = self.workers[idx]
-                print(f"[COORDINADOR] Intentando operación básica {op} en worker {worker_addr}")
-                response, used_worker = self.enviar_a_worker(request, worker_addr)
+            for worker_addr in self.orden_workers():
+                log_peticiones.info("Intentando operación básica %s en worker %s", op, worker_addr)
+                response, used_worker = self.enviar_a_worker(request, worker_addr, plazo=plazo)
                 if response is None:
-                    print(f"[COORDINADOR] ❌ Sin respuesta de worker {worker_addr}, probando siguiente")
+                    log_peticiones.warning("❌ Sin respuesta de worker %s, probando siguiente", worker_addr)
+                    REINTENTOS.inc(modo="basica")
                     continue
                 any_worker_responded = True
                 if response.ok:
-                    print(f"[COORDINADOR] ✅ Worker {used_worker} devolvió resultado: {response.result}")
+                    log_peticiones.info("✅ Worker %s devolvió resultado: %s", used_worker, response.result)
                     # Retornar la respuesta tal cual (cliente no conoce fallos)
                     return response
                 else:
                     # Worker respondió pero con error (ej: división por cero)
-                    print(f"[COORDINADOR] ⚠️ Worker {used_worker} devolvió error: {response.error}")
+                    log_peticiones.warning("⚠️ Worker %s devolvió error: %s", used_worker, response.error)
                     last_non_ok_response = response
                     # si es error por operación (ej división por cero) devolvemos ese error al cliente
                     return response
@@ -73,126 +436,424 @@ class CalculoService(calculo_pb2_grpc.CalculoServiceServicer):
             # Si llegamos aquí, ningún worker respondió con ok ni con error procesable.
             if not any_worker_responded:
                 # fallback local: el coordinador resuelve la operación por su cuenta
-                print("[COORDINADOR] ⚠️ Ningún worker disponible para operación básica. Resolviendo localmente.")
+                log_peticiones.warning("⚠️ Ningún worker disponible para operación básica. Resolviendo localmente.")
+                FALLBACK_LOCAL.inc(op=op)
                 try:
-                    a = float(request.a)
-                    b = float(request.b)
-                    if op == "add":
-                        r = a + b
-                    elif op == "sub":
-                        r = a - b
-                    elif op == "mul":
-                        r = a * b
-                    elif op == "div":
-                        if b == 0:
-                            print("[COORDINADOR] ❌ División por cero detectada localmente.")
-                            return calculo_pb2.CalculoResponse(ok=False, error="División por cero")
-                        r = a / b
-                    print(f"[COORDINADOR] ✅ Resultado local: {r}")
-                    return calculo_pb2.CalculoResponse(ok=True, result=float(r))
+                    response = calcular_basica(op, request.a, request.b)
+                    if response.ok:
+                        log_peticiones.info("✅ Resultado local: %s", response.result)
+                    else:
+                        log_peticiones.warning("❌ %s (detectado localmente).", response.error)
+                    return response
                 except Exception as e:
-                    print(f"[COORDINADOR] ❌ Error al calcular localmente: {e}")
+                    log_peticiones.warning("❌ Error al calcular localmente: %s", e)
                     return calculo_pb2.CalculoResponse(ok=False, error="error_internal")
 
             # Si algún worker respondió no-ok lo hemos devuelto arriba; si no, caemos en error genérico
             return calculo_pb2.CalculoResponse(ok=False, error="Ningún worker disponible")
 
-        # --- sumatoria de cuadrados ---
-        elif op == "sum_squares":
-            n = int(request.n)
-            # Si no hay workers configurados, fallback directo local
-            if num_workers == 0:
-                print("[COORDINADOR] ⚠️ No hay workers configurados. Calculando sum_squares localmente.")
-                total_local = sum_squares_local(1, n)
-                print(f"[COORDINADOR] ✅ Resultado local sum_squares(1..{n}) = {total_local}")
-                return calculo_pb2.CalculoResponse(ok=True, result=float(total_local),
-                                                   parts=[calculo_pb2.Part(a=1, b=n, result=int(total_local),
-                                                                          worker="coordinator_local")])
-
-            # Dividir 1..n en num_workers partes (mismo algoritmo que antes)
-            parts = num_workers
-            size = n // parts
-            extra = n % parts
-
-            total = 0
-            parts_result = []
-            start = 1
-
-            print(f"[COORDINADOR] Distribuyendo sumatoria entre {parts} workers")
-
-            for i in range(parts):
-                end = start + size - 1
-                if i < extra:
-                    end += 1
-
-                if end < start:
-                    end = start  # protección en caso n < parts
-
-                subreq = calculo_pb2.CalculoRequest(op="sum_squares", a=start, b=end)
-
-                # Intentar con todos los workers hasta que uno responda para este subrango
-                success = False
-                attempted_workers = 0
-                for _ in range(max(1, num_workers)):
-                    idx = next(self.rr_counter)
-                    worker_addr = self.workers[idx]
-                    attempted_workers += 1
-                    print(f"[COORDINADOR] Intentando rango {start}..{end} en worker {worker_addr}")
-
-                    response, used_worker = self.enviar_a_worker(subreq, worker_addr)
-                    if response is None:
-                        print(f"[COORDINADOR] ❌ Sin respuesta de worker {worker_addr}, probando otro")
-                        continue
-                    if not response.ok:
-                        # Si el worker respondió con error (p. ej. rango inválido), registrarlo y seguir intentando
-                        print(f"[COORDINADOR] ⚠️ Worker {used_worker} devolvió error: {response.error}")
-                        continue
-                    # ok
-                    print(f"[COORDINADOR] ✅ Worker {used_worker} devolvió {response.result} para rango {start}..{end}")
-                    total += int(response.result)
-                    parts_result.append(calculo_pb2.Part(a=start, b=end, result=int(response.result), worker=used_worker))
-                    success = True
-                    break
-
-                if not success:
-                    # Si ningún worker pudo procesar este subrango, hacemos fallback LOCAL para este subrango
-                    print(f"[COORDINADOR] ⚠️ Ningún worker procesó rango {start}..{end}. Calculando localmente ese subrango.")
-                    local_res = sum_squares_local(start, end)
-                    print(f"[COORDINADOR] ✅ Resultado local para {start}..{end} = {local_res}")
-                    total += int(local_res)
-                    parts_result.append(calculo_pb2.Part(a=start, b=end, result=int(local_res), worker="coordinator_local"))
-
-                start = end + 1
-
-            print(f"[COORDINADOR] ✅ Resultado final sumatoria: {total}")
-            return calculo_pb2.CalculoResponse(ok=True, result=float(total), parts=parts_result)
+        # --- reducciones sobre un rango (sum_squares, sum_powers, poly_sum, prod_mod, count_primes) ---
+        elif op in REDUCCIONES:
+            return self._reducir(request, plazo)
 
         else:
-            print(f"[COORDINADOR] ❌ Operación no soportada: {op}")
+            log_peticiones.warning("❌ Operación no soportada: %s", op)
             return calculo_pb2.CalculoResponse(ok=False, error="Operación no soportada")
 
+    def _reducir(self, request, plazo):
+        """Reparte el rango de la reducción entre los workers y combina los resultados de sus subrangos."""
+        op = request.op
+        reduccion = REDUCCIONES[op]
+        try:
+            a, b = rango(request)
+            parametros = reduccion.parametros(request)
+        except ValueError as e:
+            log_peticiones.warning("❌ Petición %s inválida: %s", op, e)
+            return calculo_pb2.CalculoResponse(ok=False, error=str(e))
+        workers = self.workers
+        num_workers = len(workers)
+
+        if b < a:
+            return fijar_exacto(calculo_pb2.CalculoResponse(ok=True), reduccion.neutro(parametros))
+
+        # Si no hay workers configurados, fallback directo local
+        if num_workers == 0:
+            log_peticiones.warning("⚠️ No hay workers configurados. Calculando %s localmente.", op)
+            FALLBACK_LOCAL.inc(op=op)
+            total_local = reduccion.mapear(a, b, parametros, self.motor)
+            log_peticiones.info("✅ Resultado local %s(%s..%s) = %s", op, a, b, total_local)
+            response = calculo_pb2.CalculoResponse(ok=True, parts=[nueva_part(a, b, total_local, "coordinator_local")])
+            return fijar_exacto(response, total_local)
+
+        if self.fanout == "trozos":
+            log_peticiones.info("Repartiendo %s %s..%s por trozos entre %s workers", op, a, b, num_workers)
+            trabajo = TrabajoPorTrozos(self, request, a, b, tam_trozo=self.tam_trozo, plazo=plazo)
+            parts_result = trabajo.ejecutar()
+            total = reduccion.total((leer_exacto(p) for p in parts_result), parametros)
+            log_peticiones.info("✅ Resultado final %s: %s (%s trozos, %s duplicados)",
+                                op, total, len(parts_result), trabajo.duplicados)
+            return fijar_exacto(calculo_pb2.CalculoResponse(ok=True, parts=parts_result), total)
+
+        # nunca más partes que elementos: sobrarían subrangos fuera de a..b
+        partes = min(num_workers, b - a + 1)
+        if self.reparto == "rendimiento":
+            # cada worker (sin breaker abierto) recibe un subrango proporcional a su rendimiento medido
+            preferidos = ([w for w in workers if not self.registro.abierto(w)] or list(workers))[:partes]
+            rangos = dividir_rango_ponderado(b - a + 1, self.planificador.pesos(preferidos), inicio=a)
+        else:
+            # Dividir a..b en num_workers partes (mismo algoritmo que antes)
+            preferidos = None
+            rangos = dividir_rango(b - a + 1, partes, inicio=a)
+
+        log_peticiones.info("Distribuyendo %s entre %s workers (modo %s)", op, len(rangos), self.fanout)
+
+        if self.fanout == "concurrente":
+            parts_result = self._reduccion_concurrente(request, rangos, preferidos, plazo)
+        else:
+            parts_result = self._reduccion_secuencial(request, rangos, preferidos, plazo)
+        total = reduccion.total((leer_exacto(p) for p in parts_result), parametros)
+
+        log_peticiones.info("✅ Resultado final %s: %s", op, total)
+        return fijar_exacto(calculo_pb2.CalculoResponse(ok=True, parts=parts_result), total)
+
+    def CalculoBatch(self, request, context):
+        """
+        Lote de operaciones: las básicas se reparten en un sub-lote por worker y se envían
+        a la vez; el resto (p. ej. sum_squares) se resuelve con CalculoTotal. Los errores
+        se devuelven por índice sin hacer fallar el lote.
+        """
+        nueva_peticion()
+        items = request.items
+        log_peticiones.info("Lote recibido: %s operaciones", len(items))
+        respuestas = [None] * len(items)
+
+        basicas = [i for i, it in enumerate(items) if it.op in OPS_BASICAS]
+        workers = self.workers
+        plazo = Plazo(context)
+        if basicas and workers:
+            trozos = [basicas[a - 1:b] for a, b in dividir_rango(len(basicas), min(len(workers), len(basicas)))]
+            subreqs = [calculo_pb2.CalculoBatchRequest(items=[items[i] for i in trozo]) for trozo in trozos]
+            etiquetas = [f"sub-lote de {len(trozo)} operaciones" for trozo in trozos]
+            try:
+                enviados = self._scatter_gather(subreqs, etiquetas, metodo="CalculoBatch", aceptar=lambda r: True,
+                                                plazo=plazo)
+            except PlazoAgotado as e:
+                return self._abandonar(e, context)
+            for trozo, (response, _) in zip(trozos, enviados):
+                if response is None:
+                    continue
+                for i, item_response in zip(trozo, response.items):
+                    respuestas[i] = item_response
+
+        pendientes = [i for i in basicas if respuestas[i] is None]
+        if pendientes:
+            log_peticiones.warning("⚠️ %s operaciones básicas sin worker. Resolviendo localmente.", len(pendientes))
+            for i in pendientes:
+                FALLBACK_LOCAL.inc(op=items[i].op)
+            for i, response in zip(pendientes, calcular_basicas_lote([items[i] for i in pendientes])):
+                respuestas[i] = response
+
+        try:
+            for i, it in enumerate(items):
+                if respuestas[i] is None:
+                    respuestas[i] = self._resolver(it, context, plazo)
+        except PlazoAgotado as e:
+            return self._abandonar(e, context)
 
-def serve(port, workers):
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    calculo_pb2_grpc.add_CalculoServiceServicer_to_server(CalculoService(workers), server)
+        return calculo_pb2.CalculoBatchResponse(items=respuestas)
+
+    def CalculoArray(self, request_iterator, context):
+        """
+        Vectores empaquetados (arreglos.py): cada trozo del cliente se corta por desplazamiento
+        en fragmentos que se envían a la vez a los workers (scatter-gather, con reintentos) y
+        el resultado vuelve en orden, un ArrayChunk por fragmento. Un fragmento que ningún
+        worker resuelve se calcula en el coordinador; un ArrayChunk con ok=False (p. ej. un
+        divisor 0) termina la respuesta.
+        """
+        nueva_peticion()
+        plazo = Plazo(context)
+        try:
+            for trozo in request_iterator:
+                for chunk in self._calcular_trozo(trozo, plazo):
+                    yield chunk
+                    if not chunk.ok:
+                        return
+        except PlazoAgotado as e:
+            self._abandonar(e, context)
+
+    def _calcular_trozo(self, trozo, plazo):
+        """ArrayChunk de cada fragmento de un trozo de vector, en orden de desplazamiento."""
+        datos_a, datos_b = trozo.a, trozo.b  # con upb cada lectura de un campo bytes lo copia
+        log_peticiones.info("Trozo de vector %s %s: %s bytes desde el byte %s",
+                            trozo.op, trozo.dtype, len(datos_a), trozo.desplazamiento, extra={"op": trozo.op})
+        try:
+            validar(trozo.op, trozo.dtype, len(datos_a), len(datos_b))
+        except ValueError as e:
+            log_peticiones.warning("❌ Vector inválido: %s", e)
+            return [calculo_pb2.ArrayChunk(ok=False, error=str(e), desplazamiento=trozo.desplazamiento, id=trozo.id)]
+        workers = self.workers
+        fragmentos = fragmentar(trozo, datos_a, datos_b, len(workers))
+        enviados = [(None, None)] * len(fragmentos)
+        if workers:
+            enviados = self._scatter_gather(
+                [subreq for _, _, subreq in fragmentos],
+                [f"bytes {trozo.desplazamiento + x}..{trozo.desplazamiento + y}" for x, y, _ in fragmentos],
+                metodo="CalculoArray", aceptar=lambda r: True, plazo=plazo)
+
+        chunks = []
+        for (x, y, _), (response, worker_addr) in zip(fragmentos, enviados):
+            if response is None:
+                log_peticiones.warning("⚠️ Ningún worker procesó los bytes %s..%s. Calculando localmente.", x, y)
+                FALLBACK_LOCAL.inc(op=etiqueta_op(trozo.op))
+                response = calcular_arreglo(trozo.op, trozo.dtype, datos_a[x:y], datos_b[x:y],
+                                            trozo.desplazamiento + x)
+                worker_addr = "coordinator_local"
+            response.worker = worker_addr
+            response.id = trozo.id
+            chunks.append(response)
+        return chunks
+
+    def CalculoStream(self, request_iterator, context):
+        """
+        Stream bidireccional: el cliente envía peticiones con id de correlación y recibe
+        las respuestas a medida que terminan (fuera de orden). Las operaciones básicas
+        viajan por el stream persistente de cada worker; si falla, se resuelven con CalculoTotal.
+        Solo este hilo termina el stream: las peticiones que fallan (p. ej. con el plazo agotado)
+        le pasan su excepción por la cola, y si la RPC acaba (deadline o cancelación) se le avisa
+        con `cortado` para que no se quede esperando respuestas que nadie leerá.
+        """
+        salida = queue.Queue()
+        fin = object()
+        cortado = object()
+        pendientes = [0]
+        lock = threading.Lock()
+        entrada_cerrada = threading.Event()
+        plazo = Plazo(context)  # uno para todo el stream
+        if not context.add_callback(lambda: salida.put(cortado)):
+            return
+
+        def terminar(request, response):
+            """Entrega la respuesta (o la excepción que termina el stream) y cuenta la petición como resuelta."""
+            if not isinstance(response, Exception):
+                response.id = request.id
+            salida.put(response)
+            with lock:
+                pendientes[0] -= 1
+                if pendientes[0] == 0 and entrada_cerrada.is_set():
+                    salida.put(fin)
+
+        def por_unario(request):
+            def resolver():
+                nueva_peticion()
+                try:
+                    response = self._resolver(request, context, plazo)
+                except Exception as e:  # PlazoAgotado incluido: context.abort solo desde el hilo del handler
+                    response = e
+                terminar(request, response)
+
+            self.ejecutor_stream.submit(resolver)
+
+        def al_terminar_worker(request, worker_addr, future, latencia):
+            try:
+                response = future.result()
+            except Exception as e:
+                log_peticiones.warning("❌ Stream con worker falló (%s); reintentando por la vía unaria", e)
+                REINTENTOS.inc(modo="stream")
+                if plazo.agotado:  # el timeout era el plazo del cliente: no es culpa del worker
+                    self.registrar_abandono(worker_addr)
+                else:
+                    self.registrar_fallo(worker_addr, e)
+                por_unario(request)
+                return
+            self.registrar_exito(worker_addr, latencia)
+            terminar(request, response)
+
+        def leer_entrada():
+            try:
+                for request in request_iterator:
+                    with lock:
+                        pendientes[0] += 1
+                    worker_addr = next(self.orden_workers(), None) if request.op in OPS_BASICAS else None
+                    stream = self.streams.get(worker_addr)
+                    if stream is not None:
+                        self.planificador.inicio(worker_addr)
+                        try:
+                            future = stream.enviar(request, timeout_respuesta=plazo.timeout())
+                        except Exception as e:
+                            log_peticiones.warning("❌ No se pudo enviar por stream a %s: %s", stream.worker_addr, e)
+                            if isinstance(e, TimeoutError):  # saturación no es un fallo del worker
+                                self.registrar_abandono(worker_addr)
+                            else:
+                                self.registrar_fallo(worker_addr, e)
+                            por_unario(request)
+                            continue
+                        future.add_done_callback(lambda f, r=request, w=worker_addr, t0=time.perf_counter():
+                                                 al_terminar_worker(r, w, f, time.perf_counter() - t0))
+                    else:
+                        por_unario(request)
+            finally:
+                with lock:
+                    entrada_cerrada.set()
+                    if pendientes[0] == 0:
+                        salida.put(fin)
+
+        threading.Thread(target=leer_entrada, daemon=True).start()
+        while True:
+            response = salida.get()
+            if response is fin or response is cortado:
+                return
+            if isinstance(response, PlazoAgotado):
+                self._abandonar(response, context)
+            if isinstance(response, Exception):
+                raise response
+            yield response
+
+    def cerrar(self):
+        """Libera streams, ejecutores y canales hacia los workers."""
+        self._fin.set()
+        self.registro.detener_sondeo()
+        for stream in self.streams.values():
+            stream.cerrar()
+        self.ejecutor_stream.shutdown(wait=False)
+        self.pool.cerrar()
+
+
+def publicar_metricas(servicio, admision=None):
+    """Indicadores del coordinador que se calculan al leer /metrics: workers, breakers, canales, caché y admisión."""
+    METRICAS.indicador_funcion("coordinador_workers", "Workers en la lista del coordinador", None,
+                               lambda: {"": len(servicio.workers)})
+    METRICAS.indicador_funcion("coordinador_breaker_abierto", "1 si el breaker del worker está abierto", "worker",
+                               lambda: {w: int(servicio.registro.abierto(w)) for w in servicio.workers})
+    pool = getattr(servicio, "pool", None)  # el coordinador aio llama a los workers con sus propios canales aio
+    if pool is not None:
+        METRICAS.indicador_funcion("coordinador_canales", "Canales a workers: creados, reutilizados, cerrados y abiertos",
+                                   "contador", pool.contadores)
+    if servicio.cache is not None:
+        METRICAS.indicador_funcion("coordinador_cache", "Contadores de la caché de resultados", "contador",
+                                   servicio.cache.contadores)
+    if admision is not None:
+        METRICAS.indicador_funcion("coordinador_admision", "Límite de admisión, coste en curso y contadores",
+                                   "contador", admision.contadores)
+
+
+def serve(port, workers, metricas_puerto=None, trazas=False, admision=None, max_rpcs=None, **opciones):
+    """
+    Levanta el coordinador; `opciones` se pasan a CalculoService (fanout, motor, planificador...).
+    Con `metricas_puerto`, los interceptores miden cada RPC y /metrics se publica en ese puerto.
+    Con `admision` (ControlAdmision), las peticiones que no caben se rechazan con RESOURCE_EXHAUSTED;
+    `max_rpcs` acota las RPC en curso o esperando hilo (maximum_concurrent_rpcs de gRPC).
+    """
+    metricas = metricas_puerto is not None
+    interceptores = [InterceptorServidor("coordinador")] if metricas else []
+    if admision is not None:
+        if admision.max_peticiones is None:
+            admision.max_peticiones = HILOS_SERVIDOR - 1  # un hilo libre para rechazar sin esperar en la cola
+        interceptores.append(InterceptorAdmision(admision))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=HILOS_SERVIDOR), interceptors=interceptores or None,
+                         maximum_concurrent_rpcs=max_rpcs)
+    servicio = CalculoService(workers, metricas=metricas, **opciones)
+    calculo_pb2_grpc.add_CalculoServiceServicer_to_server(servicio, server)
     server.add_insecure_port(f"[::]:{port}")
     server.start()
-    print(f"✅ Coordinador gRPC escuchando en puerto {port} con workers: {workers}")
+    log.info("✅ Coordinador gRPC escuchando en puerto %s con workers: %s", port, workers)
+    if metricas:
+        publicar_metricas(servicio, admision)
+        servir_metricas(metricas_puerto, trazas)
+    threading.Thread(target=servicio.consultar_workers, daemon=True).start()
+    threading.Thread(target=servicio.vigilar_latidos, daemon=True, name="latidos").start()
     try:
         while True:
             time.sleep(86400)
     except KeyboardInterrupt:
         server.stop(0)
+    finally:
+        log.info("Canales a workers: %s", servicio.pool.contadores())
+        log.info("Salud de workers: %s", servicio.registro.resumen())
+        if servicio.cache is not None:
+            log.info("Caché de resultados: %s", servicio.cache.contadores())
+        if admision is not None:
+            log.info("Control de admisión: %s", admision.contadores())
+        servicio.cerrar()
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        usage="python calc_server_grpc.py <port> [<worker1_host:port> <worker2_host:port> ...] [opciones]")
+    parser.add_argument("port", type=int)
+    parser.add_argument("workers", nargs="*",
+                        help="workers fijos; los demás se dan de alta solos con worker_grpc.py --coordinador")
+    parser.add_argument("--fanout", choices=("secuencial", "concurrente", "trozos"),
+                        help="cómo se despachan los subrangos de las reducciones (sum_squares, sum_powers...); "
+                             "por defecto secuencial (con --servidor aio siempre es concurrente)")
+    parser.add_argument("--tam-trozo", type=int,
+                        help="elementos por trozo con --fanout trozos (por defecto, adaptativo)")
+    parser.add_argument("--motor", choices=motores_disponibles(), default=MOTOR_POR_DEFECTO,
+                        help="motor de cálculo para las reducciones locales")
+    parser.add_argument("--max-en-vuelo", type=int, default=64,
+                        help="peticiones en vuelo por worker en los streams (backpressure); con --servidor aio, "
+                             "peticiones de cada CalculoStream resolviéndose a la vez")
+    parser.add_argument("--servidor", choices=("hilos", "aio"), default="hilos",
+                        help="servidor con ThreadPoolExecutor o con grpc.aio (asyncio)")
+    parser.add_argument("--sondeo", type=float, default=2.0,
+                        help="segundos entre sondeos grpc.health.v1 a los workers (0 = sin sondeo)")
+    parser.add_argument("--planificador", choices=POLITICAS, default="rr",
+                        help="política para elegir worker en cada petición")
+    parser.add_argument("--capacidades", type=float, nargs="+",
+                        help="capacidad de cada worker (mismo orden que la lista), para --planificador ponderado; "
+                             "por defecto, los procesos que anuncia cada worker")
+    parser.add_argument("--reparto", choices=("igual", "rendimiento"), default="igual",
+                        help="división del rango de las reducciones: partes iguales o proporcionales al rendimiento medido")
+    parser.add_argument("--metricas-puerto", type=int,
+                        help="puerto HTTP para /metrics (formato Prometheus; 0 = uno libre); sin él no hay interceptores")
+    parser.add_argument("--trazas", action="store_true",
+                        help="registrar spans que enlazan cada petición con sus subllamadas (en /trazas)")
+    parser.add_argument("--cache", type=int, default=0,
+                        help="entradas de la caché de resultados (LRU) en el coordinador (0 = sin caché)")
+    parser.add_argument("--cache-ttl", type=float,
+                        help="segundos que vive cada resultado en la caché (por defecto, sin caducidad)")
+    parser.add_argument("--admision-limite", type=float, default=0,
+                        help="unidades de coste en curso (un add = 1) por encima de las que se rechaza con "
+                             "RESOURCE_EXHAUSTED (0 = sin límite)")
+    parser.add_argument("--admision-adaptativa", action="store_true",
+                        help="ajustar el límite de admisión según la latencia observada, con --admision-limite "
+                             "como máximo")
+    parser.add_argument("--coste-elementos", type=int, default=COSTE_ELEMENTOS,
+                        help="elementos de una reducción (p. ej. sum_squares) que cuentan como una unidad de coste")
+    parser.add_argument("--tasa-cliente", type=float, default=0,
+                        help="unidades de coste por segundo para cada cliente (metadato x-cliente o su dirección; "
+                             "0 = sin límite)")
+    parser.add_argument("--rafaga-cliente", type=float,
+                        help="tamaño del cubo de tokens de cada cliente (por defecto, un segundo de --tasa-cliente)")
+    parser.add_argument("--max-rpcs", type=int,
+                        help="RPC en curso o esperando hilo a partir de las cuales gRPC rechaza directamente")
+    agregar_opciones(parser)
+    args = parser.parse_args()
+    configurar_desde_args(args)
+    if args.capacidades and len(args.capacidades) != len(args.workers):
+        parser.error("--capacidades debe tener un valor por worker")
+    if args.servidor == "aio" and args.fanout not in (None, "concurrente"):
+        parser.error("con --servidor aio los subrangos siempre se despachan a la vez: solo vale --fanout concurrente")
+    if args.tam_trozo is not None and args.fanout != "trozos":
+        parser.error("--tam-trozo solo vale con --fanout trozos")
+
+    admision = None
+    if args.admision_limite or args.tasa_cliente:
+        admision = ControlAdmision(args.admision_limite, args.admision_adaptativa, args.tasa_cliente,
+                                   args.rafaga_cliente, args.coste_elementos)
+    comunes = dict(motor=args.motor, sondeo=args.sondeo, planificador=args.planificador,
+                   capacidades=args.capacidades, reparto=args.reparto, cache=args.cache, cache_ttl=args.cache_ttl,
+                   metricas_puerto=args.metricas_puerto, trazas=args.trazas, admision=admision,
+                   max_rpcs=args.max_rpcs)
+    if args.servidor == "aio":
+        import asyncio
+        from calc_server_aio import serve_aio
 
-    if len(sys.argv) < 3:
-        print("Uso: python calc_server_grpc.py <port> <worker1_host:port> <worker2_host:port> ...")
-        sys.exit(1)
-
-    port = int(sys.argv[1])
-    workers = sys.argv[2:]
-
-    serve(port, workers)
+        try:
+            asyncio.run(serve_aio(args.port, args.workers, max_en_vuelo=args.max_en_vuelo, **comunes))
+        except KeyboardInterrupt:
+            pass
+    else:
+        serve(args.port, args.workers, fanout=args.fanout or "secuencial", tam_trozo=args.tam_trozo,
+              max_en_vuelo=args.max_en_vuelo, **comunes)
@@ -24,21 +24,37 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rcalculo.proto\x12\x07\x63\x61lculo\"=\n\x0e\x43\x61lculoRequest\x12\n\n\x02op\x18\x01 \x01(\t\x12\t\n\x01\x61\x18\x02 \x01(\x01\x12\t\n\x01\x62\x18\x03 \x01(\x01\x12\t\n\x01n\x18\x04 \x01(\x03\"<\n\x04Part\x12\t\n\x01\x61\x18\x01 \x01(\x03\x12\t\n\x01\x62\x18\x02 \x01(\x03\x12\x0e\n\x06result\x18\x03 \x01(\x03\x12\x0e\n\x06worker\x18\x04 \x01(\t\"\x80\x01\n\x0f\x43\x61lculoResponse\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x0e\n\x06result\x18\x02 \x01(\x01\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12\t\n\x01\x61\x18\x04 \x01(\x03\x12\t\n\x01\x62\x18\x05 \x01(\x03\x12\x0e\n\x06worker\x18\x06 \x01(\t\x12\x1c\n\x05parts\x18\x07 \x03(\x0b\x32\r.calculo.Part2Q\n\x10OperacionService\x12=\n\x08\x43\x61lcular\x12\x17.calculo.CalculoRequest\x1a\x18.calculo.CalculoResponse2S\n\x0e\x43\x61lculoService\x12\x41\n\x0c\x43\x61lculoTotal\x12\x17.calculo.CalculoRequest\x1a\x18.calculo.CalculoResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rcalculo.proto\x12\x07\x63\x61lculo\"\xb4\x01\n\x0e\x43\x61lculoRequest\x12\n\n\x02op\x18\x01 \x01(\t\x12\t\n\x01\x61\x18\x02 \x01(\x01\x12\t\n\x01\x62\x18\x03 \x01(\x01\x12\t\n\x01n\x18\x04 \x01(\x03\x12\n\n\x02id\x18\x05 \x01(\t\x12\t\n\x01k\x18\x06 \x01(\x03\x12\x14\n\x0c\x63oeficientes\x18\x07 \x03(\x03\x12\x0e\n\x06modulo\x18\x08 \x01(\x03\x12\x13\n\x06inicio\x18\t \x01(\x03H\x00\x88\x01\x01\x12\x10\n\x03\x66in\x18\n \x01(\x03H\x01\x88\x01\x01\x42\t\n\x07_inicioB\x06\n\x04_fin\"S\n\x04Part\x12\t\n\x01\x61\x18\x01 \x01(\x03\x12\t\n\x01\x62\x18\x02 \x01(\x03\x12\x0e\n\x06result\x18\x03 \x01(\x03\x12\x0e\n\x06worker\x18\x04 \x01(\t\x12\x15\n\rresult_exacto\x18\x05 \x01(\t\"\xa3\x01\n\x0f\x43\x61lculoResponse\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x0e\n\x06result\x18\x02 \x01(\x01\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12\t\n\x01\x61\x18\x04 \x01(\x03\x12\t\n\x01\x62\x18\x05 \x01(\x03\x12\x0e\n\x06worker\x18\x06 \x01(\t\x12\x1c\n\x05parts\x18\x07 \x03(\x0b\x32\r.calculo.Part\x12\x15\n\rresult_exacto\x18\x08 \x01(\t\x12\n\n\x02id\x18\t \x01(\t\"=\n\x13\x43\x61lculoBatchRequest\x12&\n\x05items\x18\x01 \x03(\x0b\x32\x17.calculo.CalculoRequest\"?\n\x14\x43\x61lculoBatchResponse\x12\'\n\x05items\x18\x01 \x03(\x0b\x32\x18.calculo.CalculoResponse\"c\n\x0c\x41rrayRequest\x12\n\n\x02op\x18\x01 \x01(\t\x12\r\n\x05\x64type\x18\x02 \x01(\t\x12\t\n\x01\x61\x18\x03 \x01(\x0c\x12\t\n\x01\x62\x18\x04 \x01(\x0c\x12\x16\n\x0e\x64\x65splazamiento\x18\x05 \x01(\x03\x12\n\n\x02id\x18\x06 \x01(\t\"y\n\nArrayChunk\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\r\n\x05\x64type\x18\x03 \x01(\t\x12\r\n\x05\x64\x61tos\x18\x04 \x01(\x0c\x12\x16\n\x0e\x64\x65splazamiento\x18\x05 \x01(\x03\x12\x0e\n\x06worker\x18\x06 \x01(\t\x12\n\n\x02id\x18\x07 \x01(\t\"\r\n\x0bInfoRequest\">\n\nInfoWorker\x12\x10\n\x08procesos\x18\x01 \x01(\x05\x12\x0f\n\x07nucleos\x18\x02 \x01(\x05\x12\r\n\x05motor\x18\x03 \x01(\t\"6\n\x0eRegistroWorker\x12\x11\n\tdireccion\x18\x01 \x01(\t\x12\x11\n\tcapacidad\x18\x02 \x01(\x05\"H\n\x11RespuestaRegistro\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x18\n\x10intervalo_latido\x18\x02 \x01(\x01\x12\r\n\x05\x65rror\x18\x03 \x01(\t2\xd5\x02\n\x10OperacionService\x12=\n\x08\x43\x61lcular\x12\x17.calculo.CalculoRequest\x1a\x18.calculo.CalculoResponse\x12K\n\x0c\x43\x61lculoBatch\x12\x1c.calculo.CalculoBatchRequest\x1a\x1d.calculo.CalculoBatchResponse\x12\x46\n\rCalculoStream\x12\x17.calculo.CalculoRequest\x1a\x18.calculo.CalculoResponse(\x01\x30\x01\x12:\n\x0c\x43\x61lculoArray\x12\x15.calculo.ArrayRequest\x1a\x13.calculo.ArrayChunk\x12\x31\n\x04Info\x12\x14.calculo.InfoRequest\x1a\x13.calculo.InfoWorker2\xe6\x03\n\x0e\x43\x61lculoService\x12\x41\n\x0c\x43\x61lculoTotal\x12\x17.calculo.CalculoRequest\x1a\x18.calculo.CalculoResponse\x12K\n\x0c\x43\x61lculoBatch\x12\x1c.calculo.CalculoBatchRequest\x1a\x1d.calculo.CalculoBatchResponse\x12\x46\n\rCalculoStream\x12\x17.calculo.CalculoRequest\x1a\x18.calculo.CalculoResponse(\x01\x30\x01\x12>\n\x0c\x43\x61lculoArray\x12\x15.calculo.ArrayRequest\x1a\x13.calculo.ArrayChunk(\x01\x30\x01\x12@\n\tRegistrar\x12\x17.calculo.RegistroWorker\x1a\x1a.calculo.RespuestaRegistro\x12=\n\x06Latido\x12\x17.calculo.RegistroWorker\x1a\x1a.calculo.RespuestaRegistro\x12;\n\x04\x42\x61ja\x12\x17.calculo.RegistroWorker\x1a\x1a.calculo.RespuestaRegistrob\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'calculo_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_CALCULOREQUEST']._serialized_start=26
-  _globals['_CALCULOREQUEST']._serialized_end=87
-  _globals['_PART']._serialized_start=89
-  _globals['_PART']._serialized_end=149
-  _globals['_CALCULORESPONSE']._serialized_start=152
-  _globals['_CALCULORESPONSE']._serialized_end=280
-  _globals['_OPERACIONSERVICE']._serialized_start=282
-  _globals['_OPERACIONSERVICE']._serialized_end=363
-  _globals['_CALCULOSERVICE']._serialized_start=365
-  _globals['_CALCULOSERVICE']._serialized_end=448
+  _globals['_CALCULOREQUEST']._serialized_start=27
+  _globals['_CALCULOREQUEST']._serialized_end=207
+  _globals['_PART']._serialized_start=209
+  _globals['_PART']._serialized_end=292
+  _globals['_CALCULORESPONSE']._serialized_start=295
+  _globals['_CALCULORESPONSE']._serialized_end=458
+  _globals['_CALCULOBATCHREQUEST']._serialized_start=460
+  _globals['_CALCULOBATCHREQUEST']._serialized_end=521
+  _globals['_CALCULOBATCHRESPONSE']._serialized_start=523
+  _globals['_CALCULOBATCHRESPONSE']._serialized_end=586
+  _globals['_ARRAYREQUEST']._serialized_start=588
+  _globals['_ARRAYREQUEST']._serialized_end=687
+  _globals['_ARRAYCHUNK']._serialized_start=689
+  _globals['_ARRAYCHUNK']._serialized_end=810
+  _globals['_INFOREQUEST']._serialized_start=812
+  _globals['_INFOREQUEST']._serialized_end=825
+  _globals['_INFOWORKER']._serialized_start=827
+  _globals['_INFOWORKER']._serialized_end=889
+  _globals['_REGISTROWORKER']._serialized_start=891
+  _globals['_REGISTROWORKER']._serialized_end=945
+  _globals['_RESPUESTAREGISTRO']._serialized_start=947
+  _globals['_RESPUESTAREGISTRO']._serialized_end=1019
+  _globals['_OPERACIONSERVICE']._serialized_start=1022
+  _globals['_OPERACIONSERVICE']._serialized_end=1363
+  _globals['_CALCULOSERVICE']._serialized_start=1366
+  _globals['_CALCULOSERVICE']._serialized_end=1852
 # @@protoc_insertion_point(module_scope)
@@ -40,6 +40,26 @@ class OperacionServiceStub(object):
                 request_serializer=calculo__pb2.CalculoRequest.SerializeToString,
                 response_deserializer=calculo__pb2.CalculoResponse.FromString,
                 _registered_method=True)
+        self.CalculoBatch = channel.unary_unary(
+                '/calculo.OperacionService/CalculoBatch',
+                request_serializer=calculo__pb2.CalculoBatchRequest.SerializeToString,
+                response_deserializer=calculo__pb2.CalculoBatchResponse.FromString,
+                _registered_method=True)
+        self.CalculoStream = channel.stream_stream(
+                '/calculo.OperacionService/CalculoStream',
+                request_serializer=calculo__pb2.CalculoRequest.SerializeToString,
+                response_deserializer=calculo__pb2.CalculoResponse.FromString,
+                _registered_method=True)
+        self.CalculoArray = channel.unary_unary(
+                '/calculo.OperacionService/CalculoArray',
+                request_serializer=calculo__pb2.ArrayRequest.SerializeToString,
+                response_deserializer=calculo__pb2.ArrayChunk.FromString,
+                _registered_method=True)
+        self.Info = channel.unary_unary(
+                '/calculo.OperacionService/Info',
+                request_serializer=calculo__pb2.InfoRequest.SerializeToString,
+                response_deserializer=calculo__pb2.InfoWorker.FromString,
+                _registered_method=True)
 
 
 class OperacionServiceServicer(object):
@@ -52,6 +72,31 @@ class OperacionServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def CalculoBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CalculoStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CalculoArray(self, request, context):
+        """Un fragmento de vector que ya cabe en un mensaje: el coordinador reparte los trozos grandes
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Info(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_OperacionServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -60,6 +105,26 @@ def add_OperacionServiceServicer_to_server(servicer, server):
                     request_deserializer=calculo__pb2.CalculoRequest.FromString,
                     response_serializer=calculo__pb2.CalculoResponse.SerializeToString,
             ),
+            'CalculoBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.CalculoBatch,
+                    request_deserializer=calculo__pb2.CalculoBatchRequest.FromString,
+                    response_serializer=calculo__pb2.CalculoBatchResponse.SerializeToString,
+            ),
+            'CalculoStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.CalculoStream,
+                    request_deserializer=calculo__pb2.CalculoRequest.FromString,
+                    response_serializer=calculo__pb2.CalculoResponse.SerializeToString,
+            ),
+            'CalculoArray': grpc.unary_unary_rpc_method_handler(
+                    servicer.CalculoArray,
+                    request_deserializer=calculo__pb2.ArrayRequest.FromString,
+                    response_serializer=calculo__pb2.ArrayChunk.SerializeToString,
+            ),
+            'Info': grpc.unary_unary_rpc_method_handler(
+                    servicer.Info,
+                    request_deserializer=calculo__pb2.InfoRequest.FromString,
+                    response_serializer=calculo__pb2.InfoWorker.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'calculo.OperacionService', rpc_method_handlers)
@@ -99,6 +164,114 @@ class OperacionService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def CalculoBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/calculo.OperacionService/CalculoBatch',
+            calculo__pb2.CalculoBatchRequest.SerializeToString,
+            calculo__pb2.CalculoBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CalculoStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/calculo.OperacionService/CalculoStream',
+            calculo__pb2.CalculoRequest.SerializeToString,
+            calculo__pb2.CalculoResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CalculoArray(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/calculo.OperacionService/CalculoArray',
+            calculo__pb2.ArrayRequest.SerializeToString,
+            calculo__pb2.ArrayChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Info(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/calculo.OperacionService/Info',
+            calculo__pb2.InfoRequest.SerializeToString,
+            calculo__pb2.InfoWorker.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
 
 class CalculoServiceStub(object):
     """Servicio que ofrece el servidor de cálculo
@@ -115,6 +288,36 @@ class CalculoServiceStub(object):
                 request_serializer=calculo__pb2.CalculoRequest.SerializeToString,
                 response_deserializer=calculo__pb2.CalculoResponse.FromString,
                 _registered_method=True)
+        self.CalculoBatch = channel.unary_unary(
+                '/calculo.CalculoService/CalculoBatch',
+                request_serializer=calculo__pb2.CalculoBatchRequest.SerializeToString,
+                response_deserializer=calculo__pb2.CalculoBatchResponse.FromString,
+                _registered_method=True)
+        self.CalculoStream = channel.stream_stream(
+                '/calculo.CalculoService/CalculoStream',
+                request_serializer=calculo__pb2.CalculoRequest.SerializeToString,
+                response_deserializer=calculo__pb2.CalculoResponse.FromString,
+                _registered_method=True)
+        self.CalculoArray = channel.stream_stream(
+                '/calculo.CalculoService/CalculoArray',
+                request_serializer=calculo__pb2.ArrayRequest.SerializeToString,
+                response_deserializer=calculo__pb2.ArrayChunk.FromString,
+                _registered_method=True)
+        self.Registrar = channel.unary_unary(
+                '/calculo.CalculoService/Registrar',
+                request_serializer=calculo__pb2.RegistroWorker.SerializeToString,
+                response_deserializer=calculo__pb2.RespuestaRegistro.FromString,
+                _registered_method=True)
+        self.Latido = channel.unary_unary(
+                '/calculo.CalculoService/Latido',
+                request_serializer=calculo__pb2.RegistroWorker.SerializeToString,
+                response_deserializer=calculo__pb2.RespuestaRegistro.FromString,
+                _registered_method=True)
+        self.Baja = channel.unary_unary(
+                '/calculo.CalculoService/Baja',
+                request_serializer=calculo__pb2.RegistroWorker.SerializeToString,
+                response_deserializer=calculo__pb2.RespuestaRegistro.FromString,
+                _registered_method=True)
 
 
 class CalculoServiceServicer(object):
@@ -127,6 +330,45 @@ class CalculoServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def CalculoBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CalculoStream(self, request_iterator, context):
+        """Stream bidireccional: las respuestas llegan en orden de finalización, con el id de su petición
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CalculoArray(self, request_iterator, context):
+        """Vectores empaquetados: el cliente envía los operandos en trozos y recibe el resultado en trozos
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Registrar(self, request, context):
+        """Membresía dinámica: los workers se dan de alta al arrancar, envían latidos y se dan de baja al parar
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Latido(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Baja(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_CalculoServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -135,6 +377,36 @@ def add_CalculoServiceServicer_to_server(servicer, server):
                     request_deserializer=calculo__pb2.CalculoRequest.FromString,
                     response_serializer=calculo__pb2.CalculoResponse.SerializeToString,
             ),
+            'CalculoBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.CalculoBatch,
+                    request_deserializer=calculo__pb2.CalculoBatchRequest.FromString,
+                    response_serializer=calculo__pb2.CalculoBatchResponse.SerializeToString,
+            ),
+            'CalculoStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.CalculoStream,
+                    request_deserializer=calculo__pb2.CalculoRequest.FromString,
+                    response_serializer=calculo__pb2.CalculoResponse.SerializeToString,
+            ),
+            'CalculoArray': grpc.stream_stream_rpc_method_handler(
+                    servicer.CalculoArray,
+                    request_deserializer=calculo__pb2.ArrayRequest.FromString,
+                    response_serializer=calculo__pb2.ArrayChunk.SerializeToString,
+            ),
+            'Registrar': grpc.unary_unary_rpc_method_handler(
+                    servicer.Registrar,
+                    request_deserializer=calculo__pb2.RegistroWorker.FromString,
+                    response_serializer=calculo__pb2.RespuestaRegistro.SerializeToString,
+            ),
+            'Latido': grpc.unary_unary_rpc_method_handler(
+                    servicer.Latido,
+                    request_deserializer=calculo__pb2.RegistroWorker.FromString,
+                    response_serializer=calculo__pb2.RespuestaRegistro.SerializeToString,
+            ),
+            'Baja': grpc.unary_unary_rpc_method_handler(
+                    servicer.Baja,
+                    request_deserializer=calculo__pb2.RegistroWorker.FromString,
+                    response_serializer=calculo__pb2.RespuestaRegistro.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'calculo.CalculoService', rpc_method_handlers)
@@ -173,3 +445,165 @@ class CalculoService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def CalculoBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/calculo.CalculoService/CalculoBatch',
+            calculo__pb2.CalculoBatchRequest.SerializeToString,
+            calculo__pb2.CalculoBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CalculoStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/calculo.CalculoService/CalculoStream',
+            calculo__pb2.CalculoRequest.SerializeToString,
+            calculo__pb2.CalculoResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CalculoArray(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/calculo.CalculoService/CalculoArray',
+            calculo__pb2.ArrayRequest.SerializeToString,
+            calculo__pb2.ArrayChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Registrar(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/calculo.CalculoService/Registrar',
+            calculo__pb2.RegistroWorker.SerializeToString,
+            calculo__pb2.RespuestaRegistro.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Latido(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/calculo.CalculoService/Latido',
+            calculo__pb2.RegistroWorker.SerializeToString,
+            calculo__pb2.RespuestaRegistro.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Baja(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/calculo.CalculoService/Baja',
+            calculo__pb2.RegistroWorker.SerializeToString,
+            calculo__pb2.RespuestaRegistro.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
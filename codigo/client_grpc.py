@@ -1,10 +1,25 @@
+import argparse
+import sys
+
 import grpc
 import calculo_pb2
 import calculo_pb2_grpc
+from operaciones import OPS_BASICAS
+from reducciones import REDUCCIONES
+
+
+def mostrar(response):
+    """Imprime la respuesta; retorna True si fue ok."""
+    if response.ok:
+        # result_exacto trae el entero sin pérdida de precisión (reducciones)
+        print(f"✅ Resultado: {response.result_exacto or response.result}")
+    else:
+        print(f"⚠️ Error: {response.error}")
+    return response.ok
 
 
-def run():
-    with grpc.insecure_channel("localhost:5000") as channel:
+def run(coordinador="localhost:5000"):
+    with grpc.insecure_channel(coordinador) as channel:
         stub = calculo_pb2_grpc.CalculoServiceStub(channel)
 
         print("=== Cliente gRPC ===")
@@ -39,14 +54,50 @@ def run():
                 continue
 
             try:
-                response = stub.CalculoTotal(request)
-                if response.ok:
-                    print(f"✅ Resultado: {response.result}")
-                else:
-                    print(f"⚠️ Error: {response.error}")
+                mostrar(stub.CalculoTotal(request))
             except Exception as e:
                 print(f"❌ Error al comunicarse con el coordinador: {e}")
 
 
+def una_operacion(coordinador, op, valores, timeout, k=0, coeficientes=(), modulo=0):
+    """Envía una sola operación y retorna el código de salida (0 si fue ok)."""
+    if op in REDUCCIONES:
+        # una reducción va sobre 1..n o sobre [a, b], este en inicio/fin: exacto y sin confundir [0, 0] con "sin rango"
+        request = calculo_pb2.CalculoRequest(op=op, k=k, coeficientes=coeficientes, modulo=modulo)
+        if len(valores) == 1:
+            request.n = int(valores[0])
+        else:
+            request.inicio, request.fin = int(valores[0]), int(valores[1])
+    else:
+        request = calculo_pb2.CalculoRequest(op=op, a=float(valores[0]), b=float(valores[1]))
+    with grpc.insecure_channel(coordinador) as channel:
+        stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+        try:
+            return 0 if mostrar(stub.CalculoTotal(request, timeout=timeout)) else 1
+        except grpc.RpcError as e:
+            print(f"❌ Error al comunicarse con el coordinador: {e.code().name} {e.details()}")
+            return 1
+
+
 if __name__ == "__main__":
-    run()
+    parser = argparse.ArgumentParser(
+        description="Cliente del coordinador: sin operación abre el menú interactivo; "
+                    "para medir carga, bench_carga.py",
+        usage="python client_grpc.py [--coordinador host:puerto] [{add,sub,mul,div} a b | reducción n | reducción a b]")
+    parser.add_argument("--coordinador", default="localhost:5000")
+    parser.add_argument("--timeout", type=float, help="deadline de la petición (s) en modo no interactivo")
+    parser.add_argument("--k", type=int, default=0, help="exponente de sum_powers")
+    parser.add_argument("--coeficientes", type=lambda texto: [int(c) for c in texto.split(",")], default=(),
+                        help="coeficientes c0,c1,c2... del polinomio de poly_sum")
+    parser.add_argument("--modulo", type=int, default=0, help="módulo de prod_mod")
+    parser.add_argument("op", nargs="?", choices=(*OPS_BASICAS, *REDUCCIONES))
+    parser.add_argument("valores", nargs="*")
+    args = parser.parse_args()
+    if args.op is None:
+        run(args.coordinador)
+    else:
+        esperados = (1, 2) if args.op in REDUCCIONES else (2,)
+        if len(args.valores) not in esperados:
+            parser.error(f"{args.op} espera {' o '.join(map(str, esperados))} valor(es)")
+        sys.exit(una_operacion(args.coordinador, args.op, args.valores, args.timeout,
+                               args.k, args.coeficientes, args.modulo))
@@ -0,0 +1,125 @@
+"""
+Streams bidireccionales de larga duración entre el coordinador y cada worker.
+
+Cada StreamWorker mantiene abierto un OperacionService.CalculoStream y multiplexa sobre
+él las peticiones de muchos clientes. Un semáforo limita las peticiones en vuelo por
+worker (backpressure): si el worker no da abasto, `enviar` se bloquea hasta que haya hueco.
+Cada petición tiene su timeout: si el worker no responde a tiempo, su future falla con
+TimeoutError y el hueco se libera, aunque el stream siga abierto.
+"""
+import heapq
+import itertools
+import queue
+import threading
+import time
+from concurrent import futures
+
+import calculo_pb2
+from plazos import TIMEOUT_WORKER
+
+_FIN = object()  # marca de cierre para la cola de envío
+REVISION_TIMEOUTS = 0.05  # s entre revisiones de las peticiones vencidas
+
+
+class StreamWorker:
+    """Stream persistente hacia un worker, con límite de peticiones en vuelo."""
+
+    def __init__(self, worker_addr, obtener_stub, max_en_vuelo=64):
+        self.worker_addr = worker_addr
+        self._obtener_stub = obtener_stub
+        self._hueco = threading.BoundedSemaphore(max_en_vuelo)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pendientes = {}  # id interno -> Future, del stream abierto
+        self._vencimientos = []  # montículo de (instante de vencimiento, id interno) del stream abierto
+        self._salida = None    # cola de peticiones del stream abierto (None = cerrado)
+
+    def _abrir(self):
+        """Abre el stream (con el lock tomado) y lanza los hilos lector de respuestas y vigilante de timeouts."""
+        salida = queue.Queue()
+        pendientes = {}
+        vencimientos = []
+
+        def peticiones():
+            while True:
+                req = salida.get()
+                if req is _FIN:
+                    return
+                yield req
+
+        respuestas = self._obtener_stub(self.worker_addr).CalculoStream(peticiones())
+        self._salida = salida
+        self._pendientes = pendientes
+        self._vencimientos = vencimientos
+        threading.Thread(target=self._leer, args=(respuestas, salida, pendientes), daemon=True,
+                         name=f"stream-{self.worker_addr}").start()
+        threading.Thread(target=self._vigilar, args=(salida, pendientes, vencimientos), daemon=True,
+                         name=f"stream-{self.worker_addr}-timeouts").start()
+
+    def _vigilar(self, salida, pendientes, vencimientos):
+        """Mientras el stream siga abierto, hace fallar las peticiones que pasaron de su timeout."""
+        while self._salida is salida:
+            time.sleep(REVISION_TIMEOUTS)
+            ahora = time.monotonic()
+            vencidos = []
+            with self._lock:
+                while vencimientos and vencimientos[0][0] <= ahora:
+                    future = pendientes.pop(heapq.heappop(vencimientos)[1], None)
+                    if future is not None:  # si no, ya respondió
+                        vencidos.append(future)
+            for future in vencidos:
+                self._hueco.release()
+                future.set_exception(TimeoutError(f"worker {self.worker_addr} no respondió a tiempo"))
+
+    def _leer(self, respuestas, salida, pendientes):
+        """Resuelve los futures pendientes según llegan las respuestas del worker."""
+        error = None
+        try:
+            for response in respuestas:
+                with self._lock:
+                    future = pendientes.pop(response.id, None)
+                if future is not None:
+                    self._hueco.release()
+                    future.set_result(response)
+        except Exception as e:
+            error = e
+        # el stream terminó: las peticiones que quedaban en vuelo fallan y se reabrirá en el próximo envío
+        with self._lock:
+            if self._salida is salida:
+                self._salida = None
+            fallidos = list(pendientes.values())
+            pendientes.clear()
+        for future in fallidos:
+            self._hueco.release()
+            future.set_exception(error or ConnectionError(f"stream con {self.worker_addr} cerrado"))
+
+    def enviar(self, request, timeout=5, timeout_respuesta=TIMEOUT_WORKER):
+        """
+        Envía request por el stream y devuelve un Future con la respuesta.
+        Se bloquea hasta `timeout` segundos si ya hay max_en_vuelo peticiones pendientes;
+        si la respuesta no llega en `timeout_respuesta` segundos, el Future falla con TimeoutError.
+        """
+        if not self._hueco.acquire(timeout=timeout):
+            raise TimeoutError(f"worker {self.worker_addr} saturado")
+        future = futures.Future()
+        interno = calculo_pb2.CalculoRequest()
+        interno.CopyFrom(request)
+        interno.id = str(next(self._ids))
+        try:
+            with self._lock:
+                if self._salida is None:
+                    self._abrir()
+                self._pendientes[interno.id] = future
+                heapq.heappush(self._vencimientos, (time.monotonic() + timeout_respuesta, interno.id))
+                self._salida.put(interno)
+        except Exception:
+            self._hueco.release()
+            raise
+        return future
+
+    def cerrar(self):
+        """Cierra el stream; el worker termina su lado al ver el fin de las peticiones."""
+        with self._lock:
+            if self._salida is not None:
+                self._salida.put(_FIN)
+                self._salida = None
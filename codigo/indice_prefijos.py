@@ -0,0 +1,166 @@
+"""
+Índice de sumas prefijas por puntos de control para sum_squares en los workers.
+
+Guarda P(j·paso) = sum(i**k for i in 1..j·paso) para j = 1, 2, ... y responde
+[a, b] como P(b) - P(a-1): cada P(x) sale del punto de control anterior más el
+trozo de menos de `paso` elementos que falta, calculado con el motor del worker.
+El índice crece bajo demanda (la primera consulta que llega más lejos calcula los
+puntos que faltan) y está limitado en memoria; lo que queda fuera se calcula
+directamente. Con `activo` (p. ej. context.is_active del worker) una extensión se
+interrumpe entre puntos de control, conservando los ya calculados, y una consulta
+que espera a otra que extiende deja de esperar si su llamada se cancela.
+
+Los totales se guardan como enteros de 128 bits (dos uint64) en un array de numpy
+que puede ser un fichero mapeado en memoria, así el índice sobrevive a un reinicio
+del worker. Al reutilizar el fichero se ajusta a `max_mb`: si el límite bajó se trunca
+(y se pierden los puntos que ya no caben), si subió crece. Requiere numpy.
+"""
+import os
+import threading
+
+from motor_sumas import CalculoCancelado, suma_potencias, MOTOR_POR_DEFECTO
+from bitacora import obtener
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él no hay índice de prefijos
+    np = None
+
+log = obtener("worker")
+
+MAGIA = 0x50524546494A4F53  # "PREFIJOS"
+CABECERA = 4                # uint64: magia, paso, k, puntos de control cubiertos
+MAX_128 = 2 ** 128
+PASO_POR_DEFECTO = 10_000
+ESPERA_ACTIVO = 0.05        # s entre comprobaciones de `activo` mientras otra consulta extiende el índice
+
+
+class IndicePrefijos:
+    def __init__(self, paso=PASO_POR_DEFECTO, max_mb=16, k=2, motor=MOTOR_POR_DEFECTO, archivo=None, sumar=None):
+        if np is None:
+            raise RuntimeError("el índice de prefijos requiere numpy instalado")
+        self.paso = paso
+        self.k = k
+        self.motor = motor
+        self.archivo = archivo
+        # sumar(a, b, activo=...) calcula los trozos entre puntos de control (p. ej. PoolProcesos.suma);
+        # por defecto, el motor
+        self._sumar = sumar or (lambda a, b, activo=None: suma_potencias(a, b, k, motor, activo))
+        self._lock = threading.Lock()
+        capacidad = max(1, int(max_mb * 2 ** 20) // 16)  # 16 bytes por punto de control
+        self._datos = self._abrir(capacidad)
+        self.capacidad = (len(self._datos) - CABECERA) // 2
+        self._puntos = self._datos[CABECERA:].reshape(-1, 2)  # (bits bajos, bits altos) de P(j·paso)
+        self.consultas = 0     # sumas resueltas con el índice
+        self.extensiones = 0   # veces que hubo que calcular puntos de control nuevos
+
+    def _abrir(self, capacidad):
+        """
+        Array de cabecera + puntos: en memoria, o mapeado sobre `archivo` (reutilizándolo si es compatible,
+        con su tamaño ajustado a `capacidad`).
+        """
+        tam = CABECERA + 2 * capacidad
+        if self.archivo is None:
+            datos = np.zeros(tam, dtype=np.uint64)
+        else:
+            if os.path.exists(self.archivo):
+                datos = np.memmap(self.archivo, dtype=np.uint64, mode="r+")
+                compatible = len(datos) > CABECERA and list(datos[:3]) == [MAGIA, self.paso, self.k]
+                cubiertos = int(datos[3]) if compatible else 0
+                del datos
+                if compatible:
+                    if os.path.getsize(self.archivo) > tam * 8:
+                        os.truncate(self.archivo, tam * 8)
+                    datos = np.memmap(self.archivo, dtype=np.uint64, mode="r+", shape=(tam,))  # r+ lo alarga si falta
+                    datos[3] = min(cubiertos, capacidad)
+                    log.info("📂 Índice de prefijos cargado de %s: %s puntos de control", self.archivo, int(datos[3]))
+                    return datos
+            datos = np.memmap(self.archivo, dtype=np.uint64, mode="w+", shape=(tam,))
+        datos[:CABECERA] = [MAGIA, self.paso, self.k, 0]
+        return datos
+
+    @property
+    def cubiertos(self):
+        """Número de puntos de control calculados: P(j·paso) para j = 1..cubiertos."""
+        return int(self._datos[3])
+
+    def _punto(self, j):
+        """P(j·paso) para un j ya cubierto (P(0) = 0)."""
+        if j == 0:
+            return 0
+        bajo, alto = self._puntos[j - 1]
+        return int(alto) << 64 | int(bajo)
+
+    def _adquirir(self, activo):
+        """Toma el lock; si otra consulta está extendiendo, deja de esperar cuando `activo()` pasa a False."""
+        if activo is None:
+            self._lock.acquire()
+            return
+        while not self._lock.acquire(timeout=ESPERA_ACTIVO):
+            if not activo():
+                raise CalculoCancelado("consulta al índice de prefijos interrumpida")
+
+    def _extender(self, j, activo=None):
+        """Calcula los puntos de control hasta j (o hasta la capacidad). Devuelve el último cubierto."""
+        self._adquirir(activo)
+        try:
+            cubiertos = self.cubiertos
+            if cubiertos >= j:
+                return cubiertos
+            self.extensiones += 1
+            total = self._punto(cubiertos)
+            while cubiertos < min(j, self.capacidad):
+                if activo is not None and not activo():
+                    raise CalculoCancelado(f"extensión del índice interrumpida en {cubiertos} puntos de control")
+                inicio = cubiertos * self.paso + 1
+                total += self._sumar(inicio, inicio + self.paso - 1, activo=activo)
+                if not 0 <= total < MAX_128:
+                    self.capacidad = cubiertos  # los siguientes ya no caben en 128 bits
+                    break
+                self._puntos[cubiertos] = (total & (2 ** 64 - 1), total >> 64)
+                cubiertos += 1
+                self._datos[3] = cubiertos  # después del punto: un lector nunca ve uno a medias
+            return cubiertos
+        finally:
+            self._lock.release()
+
+    def prefijo(self, x, activo=None):
+        """P(x) = sum(i**k for i in 1..x), o None si x queda fuera de lo que cabe en el índice."""
+        if x <= 0:
+            return 0
+        j = x // self.paso
+        if j > self.cubiertos and self._extender(j, activo) < j:
+            return None
+        resto = x - j * self.paso
+        return self._punto(j) + (self._sumar(x - resto + 1, x, activo=activo) if resto else 0)
+
+    def suma(self, a, b, activo=None):
+        """
+        sum(i**k for i in a..b) usando el índice; fuera de su alcance se calcula directamente.
+        Si `activo()` pasa a False lanza CalculoCancelado.
+        """
+        if b < a:
+            return 0
+        if a < 1 or b // self.paso > self.capacidad:
+            return self._sumar(a, b, activo=activo)
+        pb = self.prefijo(b, activo)
+        pa = self.prefijo(a - 1, activo) if pb is not None else None
+        if pa is None:
+            return self._sumar(a, b, activo=activo)
+        self.consultas += 1
+        return pb - pa
+
+    def contadores(self):
+        return {
+            "paso": self.paso,
+            "puntos": self.cubiertos,
+            "capacidad": self.capacidad,
+            "alcance": self.cubiertos * self.paso,
+            "consultas": self.consultas,
+            "extensiones": self.extensiones,
+        }
+
+    def cerrar(self):
+        """Vuelca el fichero mapeado a disco (si lo hay)."""
+        if isinstance(self._datos, np.memmap):
+            self._datos.flush()
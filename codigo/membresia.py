@@ -0,0 +1,101 @@
+"""
+Membresía dinámica de workers.
+
+- Coordinador (Membresia): lleva el último latido de cada worker dado de alta por RPC
+  y dice cuáles llevan demasiado tiempo callados. Los workers de la línea de comandos
+  son fijos y nunca caducan.
+- Worker (AnuncioWorker): hilo que se da de alta en el coordinador al arrancar, envía
+  latidos periódicos (volviendo a darse de alta si el coordinador se reinició) y se
+  da de baja al parar.
+
+El coordinador publica la lista de workers como una tupla inmutable que reemplaza
+entera en cada cambio, así el camino de cada petición la lee sin tomar ningún lock.
+"""
+import threading
+import time
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bitacora import obtener
+
+log = obtener("worker")
+
+INTERVALO_LATIDO = 2.0  # s entre latidos que pide el coordinador
+LATIDOS_PERDIDOS = 3    # latidos sin recibir antes de dar de baja a un worker
+
+
+class Membresia:
+    def __init__(self, intervalo_latido=INTERVALO_LATIDO, latidos_perdidos=LATIDOS_PERDIDOS):
+        self.intervalo_latido = intervalo_latido
+        self.latidos_perdidos = latidos_perdidos
+        self._lock = threading.Lock()
+        self._latidos = {}  # worker_addr -> instante (monotonic) del último alta o latido
+
+    def anotar(self, worker_addr):
+        """Registra un alta o un latido de worker_addr."""
+        with self._lock:
+            self._latidos[worker_addr] = time.monotonic()
+
+    def olvidar(self, worker_addr):
+        with self._lock:
+            self._latidos.pop(worker_addr, None)
+
+    def vencidos(self):
+        """Workers dinámicos sin latidos en `latidos_perdidos` intervalos; se dejan de seguir."""
+        limite = time.monotonic() - self.intervalo_latido * self.latidos_perdidos
+        with self._lock:
+            vencidos = [w for w, t in self._latidos.items() if t < limite]
+            for w in vencidos:
+                del self._latidos[w]
+        return vencidos
+
+    def respuesta(self, ok=True, error=""):
+        return calculo_pb2.RespuestaRegistro(ok=ok, intervalo_latido=self.intervalo_latido, error=error)
+
+
+class AnuncioWorker:
+    """Alta, latidos y baja de un worker en el coordinador `coordinador` (host:puerto)."""
+
+    def __init__(self, coordinador, direccion, capacidad=1):
+        self.coordinador = coordinador
+        self.peticion = calculo_pb2.RegistroWorker(direccion=direccion, capacidad=capacidad)
+        self._channel = grpc.insecure_channel(coordinador)
+        self._stub = calculo_pb2_grpc.CalculoServiceStub(self._channel)
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._anunciar, daemon=True, name="anuncio-worker")
+        self._hilo.start()
+
+    def _anunciar(self):
+        registrado = False
+        intervalo = INTERVALO_LATIDO
+        while not self._detener.is_set():
+            try:
+                if registrado:
+                    response = self._stub.Latido(self.peticion, timeout=intervalo)
+                else:
+                    response = self._stub.Registrar(self.peticion, timeout=intervalo)
+                    log.info("📣 Registrado en el coordinador %s como %s", self.coordinador, self.peticion.direccion)
+                registrado = response.ok
+                intervalo = response.intervalo_latido or intervalo
+                if not response.ok:
+                    log.warning("⚠️ El coordinador rechazó el latido: %s", response.error)
+            except grpc.RpcError as e:
+                if registrado:
+                    log.warning("❌ Coordinador %s no responde: %s", self.coordinador, e.code())
+                registrado = False
+            self._detener.wait(intervalo)
+
+    def detener(self):
+        """Para los latidos y se da de baja en el coordinador."""
+        self._detener.set()
+        try:
+            self._stub.Baja(self.peticion, timeout=1)
+            log.info("👋 Baja en el coordinador %s", self.coordinador)
+        except grpc.RpcError as e:
+            log.warning("⚠️ No se pudo dar de baja en el coordinador: %s", e.code())
+        self._channel.close()
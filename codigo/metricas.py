@@ -0,0 +1,552 @@
+"""
+Métricas y trazas del coordinador y de los workers.
+
+- Contadores, indicadores (gauges) e histogramas con etiquetas, expuestos en formato
+  de texto de Prometheus en http://<host>:<puerto>/metrics (`--metricas-puerto`).
+- Interceptores gRPC de servidor (síncrono y aio) que miden la latencia por
+  método/operación, los errores y las llamadas en curso.
+- LlamadasWorkers: la latencia por worker de las llamadas del coordinador, apuntada por
+  el propio coordinador al enviar y al recoger cada respuesta (sin interceptor de cliente,
+  que con grpc.intercept_channel encarecía cada llamada).
+- Trazas opcionales (`--trazas`): cada petición de un cliente abre un span y las
+  subllamadas a los workers se enlazan con él propagando `x-traza-id` y `x-span-padre`
+  en los metadatos. Los últimos spans se consultan en /trazas (JSON).
+
+No depende de prometheus_client: el formato de texto es sencillo y así no hay
+dependencias nuevas.
+"""
+import asyncio
+import bisect
+import collections
+import contextvars
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+
+from bitacora import obtener
+from operaciones import OPS_BASICAS
+from reducciones import REDUCCIONES
+
+LIMITES_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OPS_CONOCIDAS = frozenset((*OPS_BASICAS, *REDUCCIONES, ""))  # "" = RPC sin op (lotes, arreglos)
+OP_OTRA = "otra"  # etiqueta de cualquier otra op: la elige el cliente y no puede crear series sin límite
+
+
+def _escapar(valor):
+    """Valor de etiqueta en el formato de texto de Prometheus: escapa \\, " y el salto de línea."""
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def etiqueta_op(op):
+    """Valor de la etiqueta `op` para una op que manda el cliente: las desconocidas van todas a OP_OTRA."""
+    return op if op in OPS_CONOCIDAS else OP_OTRA
+
+
+def _etiquetas_texto(nombres, valores, extra=""):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+        self._valores = {}  # tupla de valores de etiquetas -> valor
+
+    def _clave(self, etiquetas):
+        # está en el camino de cada RPC: los valores se pasan a texto al exponer, no aquí
+        return tuple(map(etiquetas.get, self.etiquetas))
+
+    def serie(self, **etiquetas):
+        """La serie de estos valores de etiquetas, para apuntar en ella sin resolverlos en cada llamada."""
+        return _Serie(self, self._clave(etiquetas))
+
+    def _inc(self, clave, cantidad):
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        with self._lock:
+            valores = list(self._valores.items())
+        texto = {}
+        for clave, valor in valores:
+            clave = tuple("" if v is None else str(v) for v in clave)
+            # claves que solo se diferencian en el tipo (p. ej. 1 y "1") son la misma serie
+            texto[clave] = self._sumar(texto[clave], valor) if clave in texto else valor
+        for clave, valor in sorted(texto.items()):
+            lineas.extend(self._lineas(clave, valor))
+        return lineas
+
+    def _lineas(self, clave, valor):
+        return [f"{self.nombre}{_etiquetas_texto(self.etiquetas, clave)} {valor:g}"]
+
+    @staticmethod
+    def _sumar(a, b):
+        return a + b
+
+
+class _Serie:
+    """Una serie de una métrica con los valores de sus etiquetas ya resueltos (ver _Metrica.serie)."""
+
+    __slots__ = ("_metrica", "_clave")
+
+    def __init__(self, metrica, clave):
+        self._metrica = metrica
+        self._clave = clave
+
+    def inc(self, cantidad=1):
+        self._metrica._inc(self._clave, cantidad)
+
+    def dec(self, cantidad=1):
+        self._metrica._inc(self._clave, -cantidad)
+
+    def observar(self, valor):
+        self._metrica._observar(self._clave, valor)
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, cantidad=1, **etiquetas):
+        self._inc(self._clave(etiquetas), cantidad)
+
+
+class Indicador(_Metrica):
+    tipo = "gauge"
+
+    def inc(self, cantidad=1, **etiquetas):
+        self._inc(self._clave(etiquetas), cantidad)
+
+    def dec(self, cantidad=1, **etiquetas):
+        self._inc(self._clave(etiquetas), -cantidad)
+
+    def fijar(self, valor, **etiquetas):
+        with self._lock:
+            self._valores[self._clave(etiquetas)] = valor
+
+
+class IndicadorFuncion(_Metrica):
+    """Indicador cuyo valor se calcula al exponerlo: fn() -> {valor de la etiqueta: número}."""
+
+    tipo = "gauge"
+
+    def __init__(self, nombre, ayuda, etiqueta, fn):
+        super().__init__(nombre, ayuda, (etiqueta,) if etiqueta else ())
+        self.fn = fn
+
+    def exponer(self):
+        try:
+            valores = {(str(k),) if self.etiquetas else (): v for k, v in self.fn().items()}
+        except Exception:  # el origen de datos puede haberse cerrado
+            valores = {}
+        with self._lock:
+            self._valores = valores
+        return super().exponer()
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_LATENCIA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.limites = tuple(limites)
+
+    def observar(self, valor, **etiquetas):
+        self._observar(self._clave(etiquetas), valor)
+
+    def _observar(self, clave, valor):
+        i = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            cubos = self._valores.get(clave)
+            if cubos is None:
+                # un cubo por límite + el de +Inf, y después suma y número de observaciones
+                cubos = self._valores[clave] = [0] * (len(self.limites) + 3)
+            cubos[i] += 1
+            cubos[-2] += valor
+            cubos[-1] += 1
+
+    @staticmethod
+    def _sumar(a, b):
+        return [x + y for x, y in zip(a, b)]
+
+    def _lineas(self, clave, cubos):
+        lineas = []
+        acumulado = 0
+        for limite, cuenta in zip(self.limites + (float("inf"),), cubos):
+            acumulado += cuenta
+            le = "+Inf" if limite == float("inf") else f"{limite:g}"
+            etiquetas = _etiquetas_texto(self.etiquetas, clave, f'le="{le}"')
+            lineas.append(f"{self.nombre}_bucket{etiquetas} {acumulado}")
+        lineas.append(f"{self.nombre}_sum{_etiquetas_texto(self.etiquetas, clave)} {cubos[-2]:g}")
+        lineas.append(f"{self.nombre}_count{_etiquetas_texto(self.etiquetas, clave)} {cubos[-1]}")
+        return lineas
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metricas = {}  # nombre -> métrica
+
+    def _obtener(self, clase, nombre, *args, **kwargs):
+        with self._lock:
+            metrica = self._metricas.get(nombre)
+            if metrica is None:
+                metrica = self._metricas[nombre] = clase(nombre, *args, **kwargs)
+            return metrica
+
+    def contador(self, nombre, ayuda, etiquetas=()):
+        return self._obtener(Contador, nombre, ayuda, etiquetas)
+
+    def indicador(self, nombre, ayuda, etiquetas=()):
+        return self._obtener(Indicador, nombre, ayuda, etiquetas)
+
+    def histograma(self, nombre, ayuda, etiquetas=(), limites=LIMITES_LATENCIA):
+        return self._obtener(Histograma, nombre, ayuda, etiquetas, limites)
+
+    def indicador_funcion(self, nombre, ayuda, etiqueta, fn):
+        """Registra (o reemplaza) un indicador calculado con fn al exponer."""
+        with self._lock:
+            self._metricas[nombre] = IndicadorFuncion(nombre, ayuda, etiqueta, fn)
+
+    def exponer(self):
+        """Todas las métricas en formato de texto de Prometheus (0.0.4)."""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        lineas = []
+        for metrica in metricas:
+            lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+
+class Trazas:
+    """Últimos spans registrados (si están activadas) y el span en curso de cada petición."""
+
+    def __init__(self, maximo=2000):
+        self.activas = False
+        self._spans = collections.deque(maxlen=maximo)
+        self.actual = contextvars.ContextVar("span_actual", default=None)  # (traza_id, span_id)
+
+    @staticmethod
+    def nuevo_id():
+        return f"{random.getrandbits(64):016x}"  # bastante más barato que uuid4 y sin colisiones prácticas
+
+    def registrar(self, traza, span, padre, nombre, inicio, duracion, **atributos):
+        # se guarda la tupla tal cual; el diccionario se arma solo al consultar /trazas
+        self._spans.append((traza, span, padre, nombre, inicio, duracion, atributos))
+
+    def spans(self):
+        return [{"traza": traza, "span": span, "padre": padre, "nombre": nombre,
+                 "inicio": inicio, "duracion_ms": round(duracion * 1000, 3), **atributos}
+                for traza, span, padre, nombre, inicio, duracion, atributos in list(self._spans)]
+
+
+# registro y trazas del proceso (uno por coordinador o worker)
+METRICAS = RegistroMetricas()
+TRAZAS = Trazas()
+
+SERVIDOR_LATENCIA = METRICAS.histograma(
+    "grpc_servidor_latencia_segundos", "Latencia de las RPC unarias atendidas", ("metodo", "op"))
+SERVIDOR_ERRORES = METRICAS.contador(
+    "grpc_servidor_errores_total", "RPC atendidas que terminaron en excepción o con ok=false", ("metodo", "op"))
+SERVIDOR_EN_CURSO = METRICAS.indicador(
+    "grpc_servidor_en_curso", "RPC (o streams) en curso en este servidor", ("metodo",))
+CLIENTE_LATENCIA = METRICAS.histograma(
+    "grpc_cliente_latencia_segundos", "Latencia de las llamadas a cada worker por código de estado",
+    ("worker", "metodo", "codigo"))
+CLIENTE_EN_CURSO = METRICAS.indicador(
+    "grpc_cliente_en_curso", "Llamadas en curso hacia cada worker", ("worker",))
+REINTENTOS = METRICAS.contador(
+    "coordinador_reintentos_total", "Intentos fallidos con un worker que se repitieron en otro", ("modo",))
+FALLBACK_LOCAL = METRICAS.contador(
+    "coordinador_fallback_local_total", "Operaciones o subrangos resueltos en el coordinador (coordinator_local)",
+    ("op",))
+PLAZOS_AGOTADOS = METRICAS.contador(
+    "coordinador_plazo_agotado_total", "Peticiones abandonadas porque el cliente canceló o agotó su plazo",
+    ("motivo",))
+ADMISION_RECHAZADAS = METRICAS.contador(
+    "coordinador_rechazadas_total", "Peticiones rechazadas con RESOURCE_EXHAUSTED por el control de admisión",
+    ("motivo",))
+CALCULOS_ABANDONADOS = METRICAS.contador(
+    "worker_calculos_abandonados_total",
+    "Cálculos de rango que el worker dejó a medias porque la llamada ya no estaba activa", ("op",))
+
+
+def _metodo(ruta):
+    if isinstance(ruta, bytes):  # los ClientCallDetails de grpc.aio traen la ruta en bytes
+        ruta = ruta.decode()
+    return ruta.rsplit("/", 1)[-1]
+
+
+def _metadatos_traza(metadatos):
+    valores = {}
+    for clave, valor in metadatos or ():
+        if clave in ("x-traza-id", "x-span-padre"):
+            valores[clave] = valor
+    return valores.get("x-traza-id"), valores.get("x-span-padre", "")
+
+
+def _abrir_span(metadatos):
+    """Span de servidor para una petición entrante: continúa la traza del llamador o empieza una."""
+    traza, padre = _metadatos_traza(metadatos)
+    return traza or Trazas.nuevo_id(), Trazas.nuevo_id(), padre
+
+
+def _resultado_erroneo(response):
+    return getattr(response, "ok", True) is False
+
+
+class _SeriesServidor:
+    """Series de un método atendido: en curso, y latencia y errores de cada op (resueltas la primera vez)."""
+
+    def __init__(self, metodo):
+        self.metodo = metodo
+        self.en_curso = SERVIDOR_EN_CURSO.serie(metodo=metodo)
+        self._por_op = {}  # op -> (serie de latencia, serie de errores)
+
+    def de(self, op):
+        op = etiqueta_op(op)
+        series = self._por_op.get(op)
+        if series is None:
+            series = self._por_op.setdefault(op, (SERVIDOR_LATENCIA.serie(metodo=self.metodo, op=op),
+                                                  SERVIDOR_ERRORES.serie(metodo=self.metodo, op=op)))
+        return series
+
+
+class InterceptorServidor(grpc.ServerInterceptor):
+    """Latencia, errores y llamadas en curso de cada RPC atendida; abre el span de servidor."""
+
+    def __init__(self, proceso):
+        self.proceso = proceso
+        # el handler envuelto se construye una vez por método, no en cada RPC
+        self._handlers = {}
+
+    def intercept_service(self, continuation, handler_call_details):
+        envuelto = self._handlers.get(handler_call_details.method)
+        if envuelto is None:
+            handler = continuation(handler_call_details)
+            if handler is None:
+                return None
+            envuelto = self._handlers[handler_call_details.method] = self._envolver(
+                handler, _metodo(handler_call_details.method))
+        return envuelto
+
+    def _envolver(self, handler, metodo):
+        series = _SeriesServidor(metodo)
+        if handler.unary_unary:
+            comportamiento = handler.unary_unary
+
+            def unario(request, context):
+                op = getattr(request, "op", "")
+                token = None
+                if TRAZAS.activas:
+                    traza, span, padre = _abrir_span(context.invocation_metadata())
+                    token = TRAZAS.actual.set((traza, span))
+                series.en_curso.inc()
+                inicio = time.time()
+                t0 = time.perf_counter()
+                error = True
+                try:
+                    response = comportamiento(request, context)
+                    error = _resultado_erroneo(response)
+                    return response
+                finally:
+                    duracion = time.perf_counter() - t0
+                    series.en_curso.dec()
+                    latencia, errores = series.de(op)
+                    latencia.observar(duracion)
+                    if error:
+                        errores.inc()
+                    if token is not None:
+                        TRAZAS.actual.reset(token)
+                        TRAZAS.registrar(traza, span, padre, metodo, inicio, duracion, proceso=self.proceso, op=op)
+
+            return grpc.unary_unary_rpc_method_handler(unario, request_deserializer=handler.request_deserializer,
+                                                       response_serializer=handler.response_serializer)
+
+        if handler.stream_stream:
+            comportamiento = handler.stream_stream
+
+            def flujo(request_iterator, context):
+                series.en_curso.inc()
+                try:
+                    yield from comportamiento(request_iterator, context)
+                finally:
+                    series.en_curso.dec()
+
+            return grpc.stream_stream_rpc_method_handler(flujo, request_deserializer=handler.request_deserializer,
+                                                         response_serializer=handler.response_serializer)
+        return handler
+
+
+class InterceptorServidorAio(grpc.aio.ServerInterceptor):
+    """Versión aio de InterceptorServidor."""
+
+    def __init__(self, proceso):
+        self.proceso = proceso
+        self._handlers = {}
+
+    async def intercept_service(self, continuation, handler_call_details):
+        envuelto = self._handlers.get(handler_call_details.method)
+        if envuelto is None:
+            handler = await continuation(handler_call_details)
+            if handler is None:
+                return None
+            envuelto = self._handlers[handler_call_details.method] = self._envolver(
+                handler, _metodo(handler_call_details.method))
+        return envuelto
+
+    def _envolver(self, handler, metodo):
+        series = _SeriesServidor(metodo)
+        if handler.unary_unary:
+            comportamiento = handler.unary_unary
+
+            async def unario(request, context):
+                op = getattr(request, "op", "")
+                token = None
+                if TRAZAS.activas:
+                    traza, span, padre = _abrir_span(context.invocation_metadata())
+                    token = TRAZAS.actual.set((traza, span))
+                series.en_curso.inc()
+                inicio = time.time()
+                t0 = time.perf_counter()
+                error = True
+                try:
+                    response = await comportamiento(request, context)
+                    error = _resultado_erroneo(response)
+                    return response
+                finally:
+                    duracion = time.perf_counter() - t0
+                    series.en_curso.dec()
+                    latencia, errores = series.de(op)
+                    latencia.observar(duracion)
+                    if error:
+                        errores.inc()
+                    if token is not None:
+                        TRAZAS.actual.reset(token)
+                        TRAZAS.registrar(traza, span, padre, metodo, inicio, duracion, proceso=self.proceso, op=op)
+
+            return grpc.unary_unary_rpc_method_handler(unario, request_deserializer=handler.request_deserializer,
+                                                       response_serializer=handler.response_serializer)
+
+        if handler.stream_stream:
+            comportamiento = handler.stream_stream
+
+            async def flujo(request_iterator, context):
+                series.en_curso.inc()
+                try:
+                    async for response in comportamiento(request_iterator, context):
+                        yield response
+                finally:
+                    series.en_curso.dec()
+
+            return grpc.stream_stream_rpc_method_handler(flujo, request_deserializer=handler.request_deserializer,
+                                                         response_serializer=handler.response_serializer)
+        return handler
+
+
+def codigo_llamada(resultado):
+    """
+    Código de estado de una llamada a un worker ya terminada, a partir de su future síncrono,
+    de la excepción con la que falló o de None si fue bien.
+    """
+    if resultado is None:
+        return "OK"
+    if isinstance(resultado, grpc.Future) and resultado.cancelled():
+        return "CANCELLED"
+    if isinstance(resultado, (grpc.Future, grpc.RpcError)) and callable(getattr(resultado, "code", None)):
+        codigo = resultado.code()
+        return codigo.name if codigo is not None else "CANCELLED"
+    if isinstance(resultado, (grpc.FutureCancelledError, asyncio.CancelledError)):
+        return "CANCELLED"
+    return "UNKNOWN"
+
+
+class LlamadasWorkers:
+    """
+    Latencia por worker, método y código de estado de las llamadas del coordinador a los
+    workers, llamadas en curso y (con trazas) el span hijo de cada una.
+
+    No hay interceptor de cliente: quien llama pide a empezar() los metadatos de la traza y una
+    marca, y al recoger la respuesta (en el done-callback o al leer el future) pasa a terminar()
+    la latencia que ya mide para el planificador. Las series de cada worker se resuelven la
+    primera vez y se reutilizan. Sin métricas (activas=False) las dos llamadas no hacen nada.
+    """
+
+    def __init__(self, activas=True):
+        self.activas = activas
+        self._series = {}  # worker_addr -> (serie en curso, {(metodo, codigo): serie de latencia})
+
+    def empezar(self, worker_addr):
+        """Retorna (metadatos para la llamada o None, marca para terminar() o None)."""
+        if not self.activas:
+            return None, None
+        series = self._series.get(worker_addr)
+        if series is None:
+            series = self._series.setdefault(worker_addr, (CLIENTE_EN_CURSO.serie(worker=worker_addr), {}))
+        series[0].inc()
+        actual = TRAZAS.actual.get() if TRAZAS.activas else None
+        if actual is None:
+            return None, (worker_addr, series, None)
+        traza, padre = actual
+        span = Trazas.nuevo_id()
+        return (("x-traza-id", traza), ("x-span-padre", span)), (worker_addr, series, (traza, span, padre, time.time()))
+
+    def terminar(self, marca, metodo, resultado, duracion, op=""):
+        """Cierra la llamada de `marca`; `resultado` como en codigo_llamada, `duracion` en s."""
+        if marca is None:
+            return
+        worker_addr, (en_curso, latencias), traza = marca
+        codigo = codigo_llamada(resultado)
+        en_curso.dec()
+        serie = latencias.get((metodo, codigo))
+        if serie is None:
+            serie = latencias.setdefault((metodo, codigo),
+                                         CLIENTE_LATENCIA.serie(worker=worker_addr, metodo=metodo, codigo=codigo))
+        serie.observar(duracion)
+        if traza is not None:
+            traza, span, padre, inicio = traza
+            TRAZAS.registrar(traza, span, padre, f"{metodo} → {worker_addr}", inicio, duracion,
+                             proceso="coordinador", codigo=codigo, op=op)
+
+
+def servir_metricas(puerto, trazas=False, proceso="coordinador"):
+    """Publica /metrics (y /trazas si se activan) en un hilo HTTP en segundo plano."""
+    TRAZAS.activas = trazas
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics"):
+                cuerpo = METRICAS.exponer().encode()
+                tipo = "text/plain; version=0.0.4; charset=utf-8"
+            elif self.path.startswith("/trazas"):
+                cuerpo = json.dumps(TRAZAS.spans(), ensure_ascii=False).encode()
+                tipo = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("", puerto), Manejador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True, name="metricas").start()
+    puerto = servidor.server_address[1]  # con puerto 0 el sistema elige uno libre
+    obtener(proceso).info("📈 Métricas en http://localhost:%s/metrics%s", puerto, " (trazas en /trazas)" if trazas else "")
+    return servidor
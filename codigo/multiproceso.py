@@ -0,0 +1,92 @@
+"""
+Reducciones (sum_squares, sum_powers...) repartidas entre varios procesos dentro de un mismo worker.
+
+Con un solo proceso el GIL serializa los cálculos de los hilos del servidor gRPC.
+PoolProcesos corta cada rango grande en un subrango por proceso, los calcula en un
+ProcessPoolExecutor y combina los resultados como el coordinador, así un worker
+detrás de un único puerto usa todos sus núcleos.
+
+Cada reparto lleva un Event de un Manager: si la llamada deja de estar activa se
+marca, y los subrangos que ya corren en otros procesos lo ven entre bloques y paran.
+"""
+import multiprocessing
+import os
+from concurrent import futures
+
+from motor_sumas import CalculoCancelado, suma_potencias, MOTOR_POR_DEFECTO
+from reducciones import REDUCCIONES, mapear
+
+MINIMO_POR_PROCESO = 50_000  # por debajo no compensa enviar el trozo a otro proceso
+ESPERA_ACTIVO = 0.05         # s entre comprobaciones de `activo` mientras se espera a los procesos
+
+
+def nucleos_disponibles():
+    """Núcleos que puede usar este proceso (respeta la afinidad de CPU si el sistema la expone)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _mapear_cancelable(op, a, b, parametros, motor, cancelado):
+    """mapear() en un proceso del pool, interrumpible desde el padre marcando `cancelado` (si lo hay)."""
+    return mapear(op, a, b, parametros, motor, None if cancelado is None else lambda: not cancelado.is_set())
+
+
+def partir_rango(a, b, partes):
+    """Divide a..b en `partes` subrangos contiguos de tamaño casi igual."""
+    total = b - a + 1
+    rangos = []
+    inicio = a
+    for i in range(partes):
+        fin = inicio + total // partes - 1 + (1 if i < total % partes else 0)
+        rangos.append((inicio, fin))
+        inicio = fin + 1
+    return rangos
+
+
+class PoolProcesos:
+    def __init__(self, procesos=None, motor=MOTOR_POR_DEFECTO):
+        self.procesos = procesos or nucleos_disponibles()
+        self.motor = motor
+        self._pool = None
+        self._manager = None
+        if self.procesos > 1:
+            # "spawn": hacer fork de un proceso con los hilos de gRPC ya en marcha no es seguro
+            contexto = multiprocessing.get_context("spawn")
+            self._pool = futures.ProcessPoolExecutor(self.procesos, mp_context=contexto)
+            self._manager = contexto.Manager()  # sus Event se pueden enviar a los procesos del pool
+            # arrancar los procesos ya, para que la primera petición no pague su creación
+            futures.wait([self._pool.submit(suma_potencias, 1, 1, 2, motor) for _ in range(self.procesos)])
+
+    def suma(self, a, b, k=2, activo=None):
+        """sum(i**k for i in a..b), repartida entre los procesos si el rango es grande."""
+        return self.reducir("sum_powers", a, b, {"k": k}, activo)
+
+    def reducir(self, op, a, b, parametros, activo=None):
+        """
+        La reducción `op` sobre a..b, repartida entre los procesos si el rango es grande.
+        Si `activo()` pasa a False se deja de esperar, se cancelan los subrangos que aún
+        no empezaron y se avisa a los que ya corren en otro proceso para que paren.
+        """
+        reduccion = REDUCCIONES[op]
+        partes = min(self.procesos, (b - a + 1) // MINIMO_POR_PROCESO)
+        # la fórmula cerrada es O(1): mandarla a otros procesos solo añadiría latencia
+        if self._pool is None or (self.motor == "cerrada" and reduccion.cerrada) or partes < 2:
+            return reduccion.mapear(a, b, parametros, self.motor, activo)
+        cancelado = self._manager.Event() if activo is not None else None
+        pendientes = [self._pool.submit(_mapear_cancelable, op, x, y, parametros, self.motor, cancelado)
+                      for x, y in partir_rango(a, b, partes)]
+        if activo is not None:
+            while futures.wait(pendientes, timeout=ESPERA_ACTIVO).not_done:
+                if not activo():
+                    cancelado.set()
+                    for f in pendientes:
+                        f.cancel()
+                    raise CalculoCancelado(f"cálculo de {a}..{b} interrumpido")
+        return reduccion.total((f.result() for f in pendientes), parametros)
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._manager.shutdown()
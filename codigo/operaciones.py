@@ -0,0 +1,61 @@
+"""Operaciones básicas (add, sub, mul, div), en versión escalar y vectorizada por lotes."""
+import calculo_pb2
+
+try:
+    import numpy as np
+except ImportError:  # sin numpy los lotes se evalúan elemento a elemento
+    np = None
+
+OPS_BASICAS = ("add", "sub", "mul", "div")
+
+
+def calcular_basica(op, a, b):
+    """Evalúa una operación básica y devuelve un CalculoResponse (ok=False si b == 0 en div)."""
+    a = float(a)
+    b = float(b)
+    if op == "add":
+        r = a + b
+    elif op == "sub":
+        r = a - b
+    elif op == "mul":
+        r = a * b
+    elif op == "div":
+        if b == 0:
+            return calculo_pb2.CalculoResponse(ok=False, error="División por cero")
+        r = a / b
+    else:
+        return calculo_pb2.CalculoResponse(ok=False, error=f"Operación no soportada: {op}")
+    return calculo_pb2.CalculoResponse(ok=True, result=float(r))
+
+
+def calcular_basicas_lote(items):
+    """
+    Evalúa una lista de CalculoRequest básicos con arrays de numpy.
+    Devuelve una lista de CalculoResponse alineada con items; los errores
+    (división por cero, operación no soportada) se informan por posición.
+    """
+    if np is None or not items:
+        return [calcular_basica(it.op, it.a, it.b) for it in items]
+
+    ops = np.array([it.op for it in items])
+    a = np.fromiter((it.a for it in items), dtype=np.float64, count=len(items))
+    b = np.fromiter((it.b for it in items), dtype=np.float64, count=len(items))
+
+    resultado = np.full(len(items), np.nan)
+    es_div = ops == "div"
+    div_cero = es_div & (b == 0)
+    for op, ufunc in (("add", np.add), ("sub", np.subtract), ("mul", np.multiply)):
+        mascara = ops == op
+        ufunc(a, b, out=resultado, where=mascara)
+    np.divide(a, b, out=resultado, where=es_div & ~div_cero)
+    soportada = np.isin(ops, OPS_BASICAS)
+
+    respuestas = []
+    for i, valor in enumerate(resultado.tolist()):
+        if div_cero[i]:
+            respuestas.append(calculo_pb2.CalculoResponse(ok=False, error="División por cero"))
+        elif not soportada[i]:
+            respuestas.append(calculo_pb2.CalculoResponse(ok=False, error=f"Operación no soportada: {ops[i]}"))
+        else:
+            respuestas.append(calculo_pb2.CalculoResponse(ok=True, result=valor))
+    return respuestas
@@ -0,0 +1,167 @@
+"""
+Planificadores: deciden en qué orden se prueban los workers para cada petición.
+
+Todos comparten la misma interfaz:
+- orden(workers): lista de workers en orden de preferencia para una petición.
+- inicio(worker): se envió una petición a worker.
+- fin(worker, latencia=None, trabajo=None): terminó (latencia en s si fue bien; trabajo = elementos del
+  subrango si era una reducción).
+- pesos(workers): rendimiento medido de cada worker (elementos/s), para repartir rangos.
+
+El rendimiento solo se mide con subrangos de reducciones: una operación básica, un lote o un
+arreglo tarda lo mismo que un rango de millones con la fórmula cerrada, y mezclarlos hundiría
+la medida del worker que los atienda.
+
+Políticas: "rr" (round robin), "ponderado" (round robin ponderado por capacidad),
+"menos-pendientes" (menos peticiones en curso) y "p2c" (power of two choices por latencia).
+"""
+import itertools
+import random
+import threading
+
+
+def dividir_rango_ponderado(n: int, pesos, inicio: int = 1):
+    """
+    Divide inicio..inicio+n-1 (1..n por defecto) en subrangos contiguos proporcionales a cada peso,
+    en el orden de `pesos`. Cada parte recibe al menos un elemento mientras queden; si n < len(pesos),
+    las últimas partes no existen (se devuelven menos subrangos). Los subrangos cubren el rango exacto.
+    """
+    total = sum(pesos)
+    if total <= 0:
+        pesos, total = [1] * len(pesos), len(pesos)
+    final = inicio + n - 1
+    rangos = []
+    start = inicio
+    acumulado = 0
+    for i, peso in enumerate(pesos):
+        if start > final:
+            break
+        acumulado += peso
+        end = inicio - 1 + (n if i == len(pesos) - 1 else round(n * acumulado / total))
+        # al menos un elemento, y sin quitárselo a las partes que siguen ni pasar de final
+        end = min(max(end, start), max(start, final - (len(pesos) - 1 - i)))
+        rangos.append((start, end))
+        start = end + 1
+    assert start == max(inicio, final + 1), f"los subrangos {rangos} no cubren {inicio}..{final}"
+    return rangos
+
+
+class Planificador:
+    """Round robin simple; además mide peticiones en curso, latencia y rendimiento por worker."""
+
+    nombre = "rr"
+
+    def __init__(self, alfa=0.2):
+        self.alfa = alfa
+        self._lock = threading.Lock()
+        self._rr = itertools.count()
+        self.pendientes = {}     # worker -> peticiones en curso
+        self.latencia = {}       # worker -> EWMA de latencia (s)
+        self.rendimiento = {}    # worker -> EWMA de elementos/s, solo de subrangos de reducciones
+
+    def orden(self, workers):
+        if not workers:
+            return []
+        idx0 = next(self._rr) % len(workers)
+        return workers[idx0:] + workers[:idx0]
+
+    def inicio(self, worker):
+        with self._lock:
+            self.pendientes[worker] = self.pendientes.get(worker, 0) + 1
+
+    def fin(self, worker, latencia=None, trabajo=None):
+        with self._lock:
+            self.pendientes[worker] = max(0, self.pendientes.get(worker, 0) - 1)
+            if latencia is None:
+                return
+            self.latencia[worker] = self._ewma(self.latencia.get(worker), latencia)
+            if trabajo is not None and latencia > 0:
+                self.rendimiento[worker] = self._ewma(self.rendimiento.get(worker), trabajo / latencia)
+
+    def _ewma(self, anterior, valor):
+        return valor if anterior is None else self.alfa * valor + (1 - self.alfa) * anterior
+
+    def pesos(self, workers):
+        """Rendimiento medido por worker; los que aún no tienen medida reciben la media de los demás."""
+        medidos = [self.rendimiento[w] for w in workers if w in self.rendimiento]
+        por_defecto = sum(medidos) / len(medidos) if medidos else 1.0
+        return [self.rendimiento.get(w, por_defecto) for w in workers]
+
+
+class PlanificadorPonderado(Planificador):
+    """Round robin ponderado suave (como nginx): cada worker recibe tráfico según su capacidad."""
+
+    nombre = "ponderado"
+
+    def __init__(self, capacidades, alfa=0.2):
+        super().__init__(alfa)
+        self.capacidades = dict(capacidades)
+        self._actual = {w: 0 for w in self.capacidades}
+
+    def orden(self, workers):
+        if not workers:
+            return []
+        with self._lock:
+            total = 0
+            for w in workers:
+                peso = self.capacidades.get(w, 1)
+                self._actual[w] = self._actual.get(w, 0) + peso
+                total += peso
+            elegido = max(workers, key=lambda w: self._actual[w])
+            self._actual[elegido] -= total
+        # los demás quedan como alternativas por orden de capacidad
+        return [elegido] + sorted((w for w in workers if w != elegido),
+                                  key=lambda w: -self.capacidades.get(w, 1))
+
+    def pesos(self, workers):
+        """Sin medidas de rendimiento se usan las capacidades configuradas."""
+        if all(w in self.rendimiento for w in workers):
+            return super().pesos(workers)
+        return [self.capacidades.get(w, 1) for w in workers]
+
+
+class PlanificadorMenosPendientes(Planificador):
+    """Elige el worker con menos peticiones en curso (empates por round robin)."""
+
+    nombre = "menos-pendientes"
+
+    def orden(self, workers):
+        rotados = super().orden(workers)
+        return sorted(rotados, key=lambda w: self.pendientes.get(w, 0))
+
+
+class PlanificadorP2C(Planificador):
+    """Power of two choices: sortea dos workers y elige el de menor latencia esperada."""
+
+    nombre = "p2c"
+
+    def __init__(self, alfa=0.2, semilla=None):
+        super().__init__(alfa)
+        self._random = random.Random(semilla)
+
+    def _coste(self, worker):
+        # latencia media por (peticiones en curso + 1); sin medida aún, se prueba primero
+        return self.latencia.get(worker, 0.0) * (self.pendientes.get(worker, 0) + 1)
+
+    def orden(self, workers):
+        if len(workers) < 2:
+            return list(workers)
+        a, b = self._random.sample(workers, 2)
+        elegido = a if self._coste(a) <= self._coste(b) else b
+        return [elegido] + sorted((w for w in workers if w != elegido), key=self._coste)
+
+
+POLITICAS = ("rr", "ponderado", "menos-pendientes", "p2c")
+
+
+def crear_planificador(politica, workers, capacidades=None):
+    """Construye el planificador de la política indicada. `capacidades` se alinea con `workers`."""
+    if politica == "rr":
+        return Planificador()
+    if politica == "ponderado":
+        return PlanificadorPonderado(zip(workers, capacidades or [1] * len(workers)))
+    if politica == "menos-pendientes":
+        return PlanificadorMenosPendientes()
+    if politica == "p2c":
+        return PlanificadorP2C()
+    raise ValueError(f"Política de planificación no soportada: {politica}")
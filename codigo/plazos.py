@@ -0,0 +1,105 @@
+"""
+Plazo de una petición del cliente, propagado a las llamadas que el coordinador hace a los workers.
+
+- Cada llamada a un worker usa como timeout lo que le queda al cliente de su deadline
+  (`context.time_remaining()`), sin recortarlo; TIMEOUT_WORKER solo se usa si el cliente
+  no puso deadline.
+- Las llamadas en vuelo se registran con `vigilar`; si el cliente cancela o se
+  desconecta (o la RPC ya terminó), `context.add_callback` las cancela todas.
+- Agotado el plazo no se reintenta en otro worker ni se calcula en local: la petición
+  termina con DEADLINE_EXCEEDED o CANCELLED, y el fallo no cuenta contra el worker.
+
+En el coordinador aio las llamadas en vuelo ya se cancelan solas con la tarea de la
+petición; allí el plazo solo acota los timeouts.
+"""
+import threading
+import time
+
+import grpc
+
+TIMEOUT_WORKER = 5.0  # s; el timeout de siempre, ahora solo para peticiones sin deadline
+SIN_DEADLINE = 1e9    # s; el servidor síncrono da ~9e18 s restantes cuando no hay deadline
+MARGEN = 0.005        # s; un timeout que vence a menos de esto del plazo se achaca al plazo
+
+
+class PlazoAgotado(Exception):
+    """La petición ya no tiene a nadie esperando: el cliente canceló o se acabó su deadline."""
+
+    def __init__(self, cancelado):
+        self.cancelado = cancelado
+        super().__init__("Petición cancelada por el cliente" if cancelado else "Plazo del cliente agotado")
+
+    @property
+    def codigo(self):
+        return grpc.StatusCode.CANCELLED if self.cancelado else grpc.StatusCode.DEADLINE_EXCEEDED
+
+    @property
+    def motivo(self):
+        return "cancelada" if self.cancelado else "plazo"
+
+
+class Plazo:
+    def __init__(self, context=None, por_defecto=TIMEOUT_WORKER):
+        self.por_defecto = por_defecto
+        restante = context.time_remaining() if context is not None else None
+        # sin deadline, grpc.aio devuelve None y el servidor síncrono un número enorme
+        self.limite = None if restante is None or restante > SIN_DEADLINE else time.monotonic() + restante
+        self.cancelado = False
+        self._lock = threading.Lock()
+        self._llamadas = set()
+        # add_callback solo existe en el servidor síncrono; da False si la RPC ya terminó
+        if context is not None and hasattr(context, "add_callback") and not context.add_callback(self.cancelar):
+            self.cancelado = True
+
+    def restante(self):
+        """Segundos hasta el deadline del cliente, o None si no puso ninguno."""
+        return None if self.limite is None else self.limite - time.monotonic()
+
+    @property
+    def agotado(self):
+        restante = self.restante()
+        return self.cancelado or (restante is not None and restante <= MARGEN)
+
+    def timeout(self):
+        """Timeout para la próxima llamada a un worker: lo que queda del plazo, o `por_defecto` si no hay."""
+        restante = self.restante()
+        if restante is None:
+            return self.por_defecto
+        return max(MARGEN, restante)
+
+    def error(self):
+        return PlazoAgotado(self.cancelado)
+
+    def comprobar(self):
+        """Lanza PlazoAgotado si ya no merece la pena seguir trabajando en la petición."""
+        if self.agotado:
+            raise self.error()
+
+    def vigilar(self, future):
+        """Registra una llamada en vuelo (future de gRPC) para cancelarla si el cliente se va."""
+        with self._lock:
+            cancelar = self.cancelado
+            if not cancelar:
+                self._llamadas.add(future)
+        if cancelar:
+            future.cancel()
+        else:
+            future.add_done_callback(self._olvidar)
+        return future
+
+    def _olvidar(self, future):
+        with self._lock:
+            self._llamadas.discard(future)
+
+    def cancelar(self):
+        """El cliente se fue (o su RPC terminó, por lo que sea): no se esperará nada más."""
+        with self._lock:
+            self.cancelado = True
+        self.cortar()
+
+    def cortar(self):
+        """Cancela las llamadas en vuelo."""
+        with self._lock:
+            llamadas, self._llamadas = self._llamadas, set()
+        for future in llamadas:
+            future.cancel()
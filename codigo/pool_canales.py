@@ -0,0 +1,86 @@
+import threading
+
+import grpc
+
+import calculo_pb2_grpc
+
+
+# keepalive para detectar conexiones muertas sin esperar al timeout de cada llamada
+OPCIONES_KEEPALIVE = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+# lado servidor (workers): aceptar esos pings; si no, el worker responde GOAWAY "too_many_pings"
+OPCIONES_SERVIDOR_KEEPALIVE = [
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.min_ping_interval_without_data_ms", 10000),
+]
+
+
+class PoolCanales:
+    """
+    Pool de canales y stubs de larga duración, uno por worker.
+    Los canales se crean la primera vez que se piden y se reutilizan en las siguientes llamadas.
+    """
+
+    def __init__(self, opciones=None):
+        self.opciones = OPCIONES_KEEPALIVE if opciones is None else opciones
+        self._lock = threading.Lock()
+        self._canales = {}  # worker_addr -> (channel, stub)
+        self.creados = 0
+        self.reutilizados = 0
+        self.cerrados = 0
+
+    def obtener_stub(self, worker_addr):
+        """Devuelve el stub de OperacionService para worker_addr, creando el canal si hace falta."""
+        return self._entrada(worker_addr)[1]
+
+    def obtener_canal(self, worker_addr):
+        """Devuelve el canal de worker_addr (p. ej. para stubs de otros servicios como health)."""
+        return self._entrada(worker_addr)[0]
+
+    def _entrada(self, worker_addr):
+        # todo bajo el lock: los contadores se comparten entre los hilos del coordinador
+        with self._lock:
+            entrada = self._canales.get(worker_addr)
+            if entrada is None:
+                channel = grpc.insecure_channel(worker_addr, options=self.opciones)
+                entrada = (channel, calculo_pb2_grpc.OperacionServiceStub(channel))
+                self._canales[worker_addr] = entrada
+                self.creados += 1
+            else:
+                self.reutilizados += 1
+        return entrada
+
+    def invalidar(self, worker_addr):
+        """
+        Cierra el canal de worker_addr (tras su baja); si se vuelve a pedir, se crea otro.
+        Corta las llamadas en curso por ese canal: no usarlo ante un simple UNAVAILABLE.
+        """
+        with self._lock:
+            entrada = self._canales.pop(worker_addr, None)
+            if entrada is not None:
+                self.cerrados += 1
+        if entrada is not None:
+            entrada[0].close()
+
+    def contadores(self):
+        """Contadores de reutilización para verificar el pool en producción."""
+        with self._lock:
+            return {
+                "creados": self.creados,
+                "reutilizados": self.reutilizados,
+                "cerrados": self.cerrados,
+                "abiertos": len(self._canales),
+            }
+
+    def cerrar(self):
+        """Cierra todos los canales abiertos."""
+        with self._lock:
+            entradas = list(self._canales.values())
+            self._canales.clear()
+        for channel, _ in entradas:
+            channel.close()
@@ -0,0 +1,273 @@
+"""
+Reducciones distribuidas sobre un rango de enteros [a, b]: el registro de operaciones.
+
+Cada reducción define:
+- `parametros(request)`: los campos de CalculoRequest que usa además del rango, ya
+  validados (ValueError si no valen);
+- `mapear(a, b, parametros, motor, activo)`: el núcleo que calcula un subrango en el
+  worker, vectorizado con numpy salvo con el motor "bucle";
+- `combinar(x, y, parametros)` y `neutro(parametros)`: cómo junta el coordinador los
+  resultados de los subrangos (asociativa, en cualquier agrupación);
+- `trabajo(a, b, parametros)`: elementos equivalentes, para el coste de admisión.
+El coordinador reparte, despacha y reintenta los subrangos igual para todas
+(calc_server_grpc.py, calc_server_aio.py y trozos.py); el worker solo busca la
+operación en REDUCCIONES. Una nueva reducción es una clase más y una línea en `registrar`.
+
+El rango de una petición es [inicio, fin] si vienen esos campos (int64 exactos), si no
+1..n si `n` no es 0 y [a, b] si lo es (doubles: solo enteros hasta 2^53). Las
+subpeticiones a los workers siempre llevan [inicio, fin]. Un rango vacío (b < a) da el neutro.
+"""
+import functools
+import math
+
+from motor_sumas import BLOQUE_CANCELABLE, MOTOR_POR_DEFECTO, CalculoCancelado, np, suma_potencias
+
+import calculo_pb2
+
+MAX_EXPONENTE = 64
+MAX_COEFICIENTES = 32
+MODULO_MAX_NUMPY = math.isqrt(2 ** 63 - 1)  # (m-1)² debe caber en int64 para multiplicar módulo m con numpy
+MAX_ENTERO_DOUBLE = 2 ** 53  # por encima, un double ya no representa todos los enteros
+MAX_PRIMOS = 10 ** 12  # count_primes: fin máximo; los primos base (hasta 10^6) caben en unos pocos MB
+
+
+def rango(request):
+    """(a, b) inclusivo de una petición: [inicio, fin], o 1..n, o [a, b] si n es 0."""
+    if request.HasField("inicio") or request.HasField("fin"):
+        if not (request.HasField("inicio") and request.HasField("fin")):
+            raise ValueError("El rango necesita inicio y fin")
+        return request.inicio, request.fin
+    if request.n or not (request.a or request.b):
+        return 1, int(request.n)
+    if not (float(request.a).is_integer() and float(request.b).is_integer()):
+        raise ValueError("El rango [a, b] debe ser de enteros")
+    if max(abs(request.a), abs(request.b)) > MAX_ENTERO_DOUBLE:
+        raise ValueError("Los extremos de [a, b] pasan de 2^53 y no son exactos: usa inicio y fin")
+    return int(request.a), int(request.b)
+
+
+def por_bloques(a, b, fn, combinar, neutro, activo=None, bloque=BLOQUE_CANCELABLE):
+    """Aplica fn(x, y) a bloques de a..b y los combina; entre bloques comprueba `activo()`."""
+    total = neutro
+    for inicio in range(a, b + 1, bloque):
+        if activo is not None and not activo():
+            raise CalculoCancelado(f"cálculo de {a}..{b} interrumpido en {inicio}")
+        total = combinar(total, fn(inicio, min(b, inicio + bloque - 1)))
+    return total
+
+
+class Reduccion:
+    """Suma sobre el rango; las subclases definen el núcleo y, si no es una suma, cómo se combinan."""
+
+    nombre = None
+    cerrada = False  # con el motor "cerrada" el núcleo es O(1): no compensa repartirlo entre procesos
+
+    def parametros(self, request):
+        return {}
+
+    def mapear(self, a, b, parametros, motor=MOTOR_POR_DEFECTO, activo=None):
+        raise NotImplementedError
+
+    def neutro(self, parametros):
+        return 0
+
+    def combinar(self, x, y, parametros):
+        return x + y
+
+    def trabajo(self, a, b, parametros):
+        return max(0, b - a + 1)
+
+    def total(self, valores, parametros):
+        return functools.reduce(lambda x, y: self.combinar(x, y, parametros), valores, self.neutro(parametros))
+
+
+class SumaPotencias(Reduccion):
+    """sum(i**k) con los motores de motor_sumas.py; sum_squares es el caso k = 2."""
+
+    nombre = "sum_powers"
+    cerrada = True
+
+    def __init__(self, k=None):
+        self.k = k  # None = el exponente viene en la petición
+        if k is not None:
+            self.nombre = "sum_squares"
+
+    def parametros(self, request):
+        k = self.k if self.k is not None else request.k
+        if not 0 <= k <= MAX_EXPONENTE:
+            raise ValueError(f"El exponente k debe estar entre 0 y {MAX_EXPONENTE}")
+        return {"k": k}
+
+    def mapear(self, a, b, parametros, motor=MOTOR_POR_DEFECTO, activo=None):
+        return suma_potencias(a, b, parametros["k"], motor, activo)
+
+
+class SumaPolinomio(Reduccion):
+    """sum(P(i)) con P(i) = c0 + c1·i + c2·i² + ...: una suma de potencias por coeficiente."""
+
+    nombre = "poly_sum"
+    cerrada = True
+
+    def parametros(self, request):
+        coeficientes = tuple(request.coeficientes)
+        if not 0 < len(coeficientes) <= MAX_COEFICIENTES:
+            raise ValueError(f"El polinomio necesita entre 1 y {MAX_COEFICIENTES} coeficientes")
+        return {"coeficientes": coeficientes}
+
+    def mapear(self, a, b, parametros, motor=MOTOR_POR_DEFECTO, activo=None):
+        return sum(c * suma_potencias(a, b, j, motor, activo)
+                   for j, c in enumerate(parametros["coeficientes"]) if c)
+
+    def trabajo(self, a, b, parametros):
+        return super().trabajo(a, b, parametros) * len(parametros["coeficientes"])
+
+
+def _producto_bucle(a, b, m):
+    total = 1 % m
+    for i in range(a, b + 1):
+        total = total * i % m
+    return total
+
+
+def _producto_numpy(a, b, m):
+    """Producto módulo m en árbol: cada pasada multiplica los pares vecinos y reduce módulo m."""
+    valores = np.arange(a, b + 1, dtype=np.int64) % m
+    while len(valores) > 1:
+        if len(valores) % 2:
+            valores = np.append(valores, 1)
+        valores = valores[0::2] * valores[1::2] % m
+    return int(valores[0]) % m
+
+
+class ProductoModular(Reduccion):
+    """prod(i) módulo m. Si el rango contiene un múltiplo de m, el resultado es 0 sin recorrerlo."""
+
+    nombre = "prod_mod"
+
+    def parametros(self, request):
+        if request.modulo < 1:
+            raise ValueError("prod_mod necesita un módulo positivo")
+        return {"modulo": request.modulo}
+
+    def neutro(self, parametros):
+        return 1 % parametros["modulo"]
+
+    def combinar(self, x, y, parametros):
+        return x * y % parametros["modulo"]
+
+    def mapear(self, a, b, parametros, motor=MOTOR_POR_DEFECTO, activo=None):
+        m = parametros["modulo"]
+        if b < a:
+            return self.neutro(parametros)
+        if a + (-a) % m <= b:  # primer múltiplo de m a partir de a
+            return 0
+        vectorizar = np is not None and motor != "bucle" and m <= MODULO_MAX_NUMPY and max(abs(a), abs(b)) < 2 ** 63
+        producto = _producto_numpy if vectorizar else _producto_bucle
+        return por_bloques(a, b, lambda x, y: producto(x, y, m),
+                           lambda x, y: self.combinar(x, y, parametros), self.neutro(parametros), activo)
+
+
+def _cota_primos_base(b):
+    """
+    Cota de los primos base para cribar hasta b: isqrt(b) redondeada a la potencia de 2 siguiente
+    (al menos 1024), para que los subrangos de un mismo rango compartan la entrada de la caché.
+    """
+    return max(1024, 1 << (math.isqrt(b) - 1).bit_length())
+
+
+@functools.lru_cache(maxsize=8)
+def _primos_hasta(n):
+    """Primos <= n (criba de Eratóstenes), para cribar los segmentos."""
+    criba = bytearray([1]) * (n + 1)
+    criba[:2] = b"\x00\x00"[:n + 1]
+    for p in range(2, math.isqrt(n) + 1):
+        if criba[p]:
+            criba[p * p::p] = bytes(len(range(p * p, n + 1, p)))
+    return tuple(i for i, es_primo in enumerate(criba) if es_primo)
+
+
+def _criba_segmento(a, b, primos):
+    """Primos en [a, b] (a >= 2) tachando los múltiplos de los primos base en un bytearray."""
+    criba = bytearray([1]) * (b - a + 1)
+    for p in primos:
+        if p * p > b:
+            break
+        inicio = max(p * p, -(-a // p) * p) - a
+        criba[inicio::p] = bytes(len(range(inicio, len(criba), p)))
+    return sum(criba)
+
+
+def _criba_segmento_numpy(a, b, primos):
+    criba = np.ones(b - a + 1, dtype=bool)
+    for p in primos:
+        if p * p > b:
+            break
+        criba[max(p * p, -(-a // p) * p) - a::p] = False
+    return int(np.count_nonzero(criba))
+
+
+class ContarPrimos(Reduccion):
+    """Cuántos primos hay en [a, b], con una criba segmentada por bloques."""
+
+    nombre = "count_primes"
+
+    def parametros(self, request):
+        if rango(request)[1] > MAX_PRIMOS:
+            raise ValueError(f"count_primes admite rangos hasta {MAX_PRIMOS:.0e}")
+        return {}
+
+    def trabajo(self, a, b, parametros):
+        # además del segmento, la criba de los primos base hasta sqrt(b)
+        return super().trabajo(a, b, parametros) + (_cota_primos_base(b) if b >= max(a, 2) else 0)
+
+    def mapear(self, a, b, parametros, motor=MOTOR_POR_DEFECTO, activo=None):
+        a = max(a, 2)
+        if b < a:
+            return 0
+        if b > MAX_PRIMOS:
+            raise ValueError(f"count_primes admite rangos hasta {MAX_PRIMOS:.0e}")
+        primos = _primos_hasta(_cota_primos_base(b))
+        criba = _criba_segmento_numpy if np is not None and motor != "bucle" else _criba_segmento
+        return por_bloques(a, b, lambda x, y: criba(x, y, primos), lambda x, y: x + y, 0, activo)
+
+
+REDUCCIONES = {}
+
+
+def registrar(reduccion):
+    REDUCCIONES[reduccion.nombre] = reduccion
+    return reduccion
+
+
+registrar(SumaPotencias(k=2))
+registrar(SumaPotencias())
+registrar(SumaPolinomio())
+registrar(ProductoModular())
+registrar(ContarPrimos())
+
+
+def mapear(op, a, b, parametros, motor=MOTOR_POR_DEFECTO, activo=None):
+    """Núcleo de la reducción `op` sobre a..b (función de módulo: se puede enviar a otro proceso)."""
+    return REDUCCIONES[op].mapear(a, b, parametros, motor, activo)
+
+
+def subpeticion(request, a, b):
+    """La misma reducción (con sus parámetros) restringida a [a, b], para enviarla a un worker."""
+    subreq = calculo_pb2.CalculoRequest()
+    subreq.CopyFrom(request)
+    subreq.n = 0
+    subreq.id = ""
+    subreq.ClearField("a")
+    subreq.ClearField("b")
+    subreq.inicio = a
+    subreq.fin = b
+    return subreq
+
+
+def trabajo_peticion(request):
+    """Elementos equivalentes que pide una reducción (0 si la petición no es válida)."""
+    try:
+        reduccion = REDUCCIONES[request.op]
+        return reduccion.trabajo(*rango(request), reduccion.parametros(request))
+    except (KeyError, ValueError):
+        return 0
@@ -0,0 +1,176 @@
+"""
+Registro de salud de los workers en el coordinador.
+
+Por cada worker guarda los fallos consecutivos, una media móvil exponencial (EWMA)
+de la latencia y un circuit breaker:
+
+- cerrado:    el worker recibe tráfico normalmente.
+- abierto:    tras `umbral_fallos` fallos seguidos se deja de usar hasta que pase el backoff.
+- semiabierto: pasado el backoff se deja pasar una sola petición de prueba; si sale bien
+               el breaker se cierra, si falla se vuelve a abrir con el backoff duplicado.
+               Si la prueba se abandona sin respuesta (plazo agotado, cancelación o nada
+               que enviar), el breaker vuelve a abierto con la prueba disponible enseguida.
+
+Opcionalmente sondea a los workers en segundo plano con grpc.health.v1.
+"""
+import threading
+import time
+
+from bitacora import obtener
+
+try:
+    from grpc_health.v1 import health_pb2, health_pb2_grpc
+except ImportError:  # grpcio-health-checking es opcional: sin él no hay sondeo activo
+    health_pb2 = health_pb2_grpc = None
+
+log = obtener("coordinador")
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+class EstadoWorker:
+    def __init__(self, addr, backoff):
+        self.addr = addr
+        self.estado = CERRADO
+        self.fallos_consecutivos = 0
+        self.latencia_ewma = None  # segundos
+        self.backoff = backoff
+        self.reintentar_en = 0.0   # instante (monotonic) en que un breaker abierto pasa a semiabierto
+
+    def resumen(self):
+        return {
+            "estado": self.estado,
+            "fallos_consecutivos": self.fallos_consecutivos,
+            "latencia_ewma_ms": None if self.latencia_ewma is None else round(self.latencia_ewma * 1000, 3),
+        }
+
+
+class RegistroWorkers:
+    def __init__(self, workers, umbral_fallos=3, backoff_inicial=1.0, backoff_max=30.0, alfa=0.2):
+        self.umbral_fallos = umbral_fallos
+        self.backoff_inicial = backoff_inicial
+        self.backoff_max = backoff_max
+        self.alfa = alfa
+        self._lock = threading.Lock()
+        self._estados = {w: EstadoWorker(w, backoff_inicial) for w in workers}
+        self._sondeo = None
+
+    def estado(self, addr):
+        return self._estados[addr]
+
+    def agregar(self, addr):
+        """Empieza a seguir a un worker dado de alta en caliente (con el breaker cerrado)."""
+        with self._lock:
+            if addr not in self._estados:
+                # copia y sustitución: quien esté recorriendo los estados no ve el dict cambiar
+                self._estados = {**self._estados, addr: EstadoWorker(addr, self.backoff_inicial)}
+
+    def quitar(self, addr):
+        with self._lock:
+            self._estados = {w: e for w, e in self._estados.items() if w != addr}
+
+    def abierto(self, addr):
+        """True si el breaker de addr está abierto (sin pasar a semiabierto, a diferencia de disponible)."""
+        e = self._estados.get(addr)
+        return e is not None and e.estado == ABIERTO
+
+    def disponible(self, addr):
+        """True si se puede enviar a addr ahora. Con el breaker abierto solo pasa la petición de prueba."""
+        e = self._estados.get(addr)
+        if e is None:  # dado de baja mientras se elegía worker
+            return False
+        if e.estado == CERRADO:
+            return True
+        with self._lock:
+            if e.estado == ABIERTO and time.monotonic() >= e.reintentar_en:
+                e.estado = SEMIABIERTO
+                log.info("🔁 Breaker de %s semiabierto: enviando petición de prueba", addr)
+                return True
+            return e.estado == CERRADO
+
+    def registrar_exito(self, addr, latencia=None):
+        """Respuesta correcta de addr; `latencia` (s) alimenta la EWMA (los sondeos no la pasan)."""
+        e = self._estados.get(addr)
+        if e is None:
+            return
+        with self._lock:
+            if latencia is not None:
+                e.latencia_ewma = latencia if e.latencia_ewma is None else \
+                    self.alfa * latencia + (1 - self.alfa) * e.latencia_ewma
+            e.fallos_consecutivos = 0
+            if e.estado != CERRADO:
+                log.info("✅ Breaker de %s cerrado: worker recuperado", addr)
+                e.estado = CERRADO
+                e.backoff = self.backoff_inicial
+
+    def registrar_fallo(self, addr):
+        """Fallo de conexión/RPC con addr (no cuenta un error de la operación, p. ej. división por cero)."""
+        e = self._estados.get(addr)
+        if e is None:
+            return
+        with self._lock:
+            e.fallos_consecutivos += 1
+            if e.estado == SEMIABIERTO:
+                # la prueba falló: se vuelve a abrir con más espera
+                e.backoff = min(self.backoff_max, e.backoff * 2)
+                self._abrir(e)
+            elif e.estado == CERRADO and e.fallos_consecutivos >= self.umbral_fallos:
+                self._abrir(e)
+
+    def registrar_abandono(self, addr):
+        """
+        La petición a addr se abandonó sin saber si el worker está bien. Si era la prueba de un
+        breaker semiabierto, este vuelve a abierto con la prueba disponible ya (sin más backoff);
+        si no, nadie volvería a probar el worker y quedaría fuera para siempre.
+        """
+        e = self._estados.get(addr)
+        if e is None:
+            return
+        with self._lock:
+            if e.estado == SEMIABIERTO:
+                e.estado = ABIERTO
+                e.reintentar_en = time.monotonic()
+                log.info("↩️ Prueba de %s abandonada: el breaker vuelve a abierto", addr)
+
+    def _abrir(self, e):
+        e.estado = ABIERTO
+        e.reintentar_en = time.monotonic() + e.backoff
+        log.warning("⛔ Breaker de %s abierto durante %.1fs", e.addr, e.backoff)
+
+    def resumen(self):
+        return {addr: e.resumen() for addr, e in self._estados.items()}
+
+    # --- sondeo activo con grpc.health.v1 ---
+
+    def iniciar_sondeo(self, obtener_canal, intervalo=2.0, timeout=1.0):
+        """Lanza un hilo que consulta grpc.health.v1.Health/Check en cada worker cada `intervalo` s."""
+        if health_pb2 is None or self._sondeo is not None:
+            return
+        self._sondeo = threading.Event()
+        threading.Thread(target=self._sondear, args=(obtener_canal, intervalo, timeout, self._sondeo),
+                         daemon=True, name="sondeo-workers").start()
+
+    def detener_sondeo(self):
+        if self._sondeo is not None:
+            self._sondeo.set()
+            self._sondeo = None
+
+    def _sondear(self, obtener_canal, intervalo, timeout, detener):
+        peticion = health_pb2.HealthCheckRequest(service="")
+        while not detener.wait(intervalo):
+            for addr in list(self._estados):
+                # un breaker abierto solo se sondea cuando ha pasado su backoff
+                if not self.disponible(addr):
+                    continue
+                stub = health_pb2_grpc.HealthStub(obtener_canal(addr))
+                try:
+                    response = stub.Check(peticion, timeout=timeout)
+                    sano = response.status == health_pb2.HealthCheckResponse.SERVING
+                except Exception:
+                    sano = False
+                if sano:
+                    self.registrar_exito(addr)
+                else:
+                    self.registrar_fallo(addr)
@@ -0,0 +1,33 @@
+"""
+Codificación de resultados enteros exactos en los mensajes de calculo.proto.
+
+El campo `result_exacto` lleva el entero en decimal; los campos legados `result`
+(double en CalculoResponse, int64 en Part) se siguen rellenando por compatibilidad.
+"""
+import calculo_pb2
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def fijar_exacto(msg, valor: int):
+    """Escribe `valor` en result_exacto y en el campo legado `result` de msg (CalculoResponse o Part)."""
+    valor = int(valor)
+    msg.result_exacto = str(valor)
+    if not isinstance(msg, calculo_pb2.Part):
+        msg.result = float(valor)
+    elif INT64_MIN <= valor <= INT64_MAX:
+        msg.result = valor
+    return msg
+
+
+def nueva_part(a, b, valor: int, worker):
+    """Part con el resultado exacto y el legado."""
+    return fijar_exacto(calculo_pb2.Part(a=a, b=b, worker=worker), valor)
+
+
+def leer_exacto(msg) -> int:
+    """Entero exacto de msg; si viene de un peer antiguo sin result_exacto, usa el campo legado."""
+    if msg.result_exacto:
+        return int(msg.result_exacto)
+    return int(msg.result)
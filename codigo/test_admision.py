@@ -0,0 +1,57 @@
+"""
+Pruebas del control de admisión de admision.py contra un coordinador real: los streams abiertos
+cuentan como peticiones en curso, así que no pueden ocupar todos los hilos del servidor síncrono.
+
+Uso: python -m pytest test_admision.py   (o python test_admision.py; sale con código 1 si algo falla)
+"""
+import queue
+import sys
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import coordinador_local, ejecutar_pruebas, workers_locales
+from calc_server_grpc import HILOS_SERVIDOR
+
+ESPERA = 5  # s; más sería que el coordinador se quedó sin hilos
+
+
+def abrir_stream(stub):
+    """Abre un CalculoStream, espera a la primera respuesta y lo deja abierto; devuelve (cola de entrada, llamada)."""
+    entrada = queue.Queue()
+    llamada = stub.CalculoStream(iter(entrada.get, None), timeout=30)
+    entrada.put(calculo_pb2.CalculoRequest(op="add", a=1, b=2, id="1"))
+    assert next(llamada).ok
+    return entrada, llamada
+
+
+def test_los_streams_abiertos_no_se_quedan_con_todos_los_hilos():
+    with workers_locales(1, "--log-muestreo", 0) as workers, \
+            coordinador_local(workers, "--admision-limite", 1000, "--log-muestreo", 0) as addr:
+        canal = grpc.insecure_channel(addr)
+        stub = calculo_pb2_grpc.CalculoServiceStub(canal)
+        abiertos = []
+        try:
+            for _ in range(HILOS_SERVIDOR - 1):  # el límite de peticiones en curso del coordinador con hilos
+                abiertos.append(abrir_stream(stub))
+            for rpc in (lambda: stub.CalculoTotal(calculo_pb2.CalculoRequest(op="add", a=1, b=2), timeout=ESPERA),
+                        lambda: next(stub.CalculoArray(iter(()), timeout=ESPERA), None),
+                        lambda: abrir_stream(stub)):
+                try:
+                    rpc()
+                except grpc.RpcError as e:
+                    assert e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED, e
+                else:
+                    raise AssertionError("con todos los streams abiertos se admitió otra petición")
+        finally:
+            for entrada, llamada in abiertos:
+                entrada.put(None)
+                list(llamada)
+        response = stub.CalculoTotal(calculo_pb2.CalculoRequest(op="add", a=1, b=2), timeout=ESPERA)
+        assert response.ok, "cerrados los streams, el coordinador no vuelve a admitir"
+        canal.close()
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
@@ -0,0 +1,104 @@
+"""
+Pruebas de CalculoArray (arreglos.py): los dos dtypes con y sin numpy, los desplazamientos de
+trozos y fragmentos, la división por cero y un vector repartido entre dos workers.
+
+Uso: python -m pytest test_arreglos.py   (o python test_arreglos.py; sale con código 1 si algo falla)
+"""
+import sys
+
+import grpc
+import numpy as np
+
+import calculo_pb2_grpc
+from arreglos import (TAMANO_ELEMENTO, _calcular_array, _calcular_numpy, calcular_arreglo, fragmentos,
+                      peticiones_arreglo, unir_trozos, validar)
+from bench_util import coordinador_local, ejecutar_pruebas, workers_locales
+from operaciones import OPS_BASICAS
+
+ELEMENTOS = 50_000  # con trozos de 64 KiB: varios trozos, y cada uno en fragmentos para los dos workers
+
+
+def operandos(dtype, n=ELEMENTOS, semilla=1):
+    rng = np.random.default_rng(semilla)
+    if dtype == "int64":
+        a = rng.integers(-2 ** 62, 2 ** 62, n, dtype=np.int64)
+        b = rng.integers(1, 2 ** 40, n, dtype=np.int64) * rng.choice([-1, 1], n)
+        a[:2], b[:2] = 2 ** 63 - 1, 1  # desborda en add y mul
+    else:
+        a = rng.normal(0, 1e6, n)
+        b = rng.normal(0, 1e6, n)
+        b[b == 0] = 1.0
+    return a, b
+
+
+def esperado(op, a, b):
+    with np.errstate(over="ignore"):
+        if op == "div":
+            return np.true_divide(a, b, dtype=np.float64)
+        return {"add": np.add, "sub": np.subtract, "mul": np.multiply}[op](a, b)
+
+
+def test_cada_op_y_dtype_con_y_sin_numpy():
+    for dtype in ("float64", "int64"):
+        a, b = operandos(dtype, 1000)
+        for op in OPS_BASICAS:
+            chunk = calcular_arreglo(op, dtype, a.tobytes(), b.tobytes())
+            assert chunk.ok, chunk.error
+            assert chunk.dtype == ("float64" if op == "div" else dtype)
+            obtenido = np.frombuffer(chunk.datos, dtype=chunk.dtype)
+            assert np.array_equal(obtenido, esperado(op, a, b)), f"{op} {dtype}"
+            # sin numpy (módulo array) da los mismos bytes, también al desbordar int64
+            assert _calcular_array(op, dtype, a.tobytes(), b.tobytes()) == (None, chunk.datos), f"{op} {dtype}"
+
+
+def test_operandos_invalidos():
+    for args in (("pow", "float64", 8, 8), ("add", "int32", 8, 8), ("add", "int64", 8, 16), ("add", "int64", 12, 12)):
+        try:
+            validar(*args)
+        except ValueError:
+            continue
+        raise AssertionError(f"{args} no dio ValueError")
+    chunk = calcular_arreglo("add", "int32", b"\0" * 8, b"\0" * 8, desplazamiento=64)
+    assert not chunk.ok and chunk.desplazamiento == 64
+
+
+def test_division_por_cero_da_la_posicion_en_el_vector_completo():
+    for dtype in ("float64", "int64"):
+        a, b = operandos(dtype, 100)
+        b[37] = 0
+        desplazamiento = 1000 * TAMANO_ELEMENTO
+        for calcular in (_calcular_numpy, _calcular_array):
+            assert calcular("div", dtype, a.tobytes(), b.tobytes()) == (37, None)
+        chunk = calcular_arreglo("div", dtype, a.tobytes(), b.tobytes(), desplazamiento)
+        assert not chunk.ok and chunk.desplazamiento == desplazamiento
+        assert "elemento 1037" in chunk.error, chunk.error
+
+
+def test_fragmentos_cubren_el_trozo_alineados_a_elementos():
+    for tamano, workers in ((0, 3), (8, 3), (24, 5), (1 << 20, 2), ((1 << 20) + 8 * 7, 3)):
+        cortes = fragmentos(tamano, workers, tam_fragmento=256 << 10)
+        assert cortes[0][0] == 0 and cortes[-1][1] == tamano
+        assert all(fin == siguiente for (_, fin), (siguiente, _) in zip(cortes, cortes[1:]))
+        assert all(inicio % TAMANO_ELEMENTO == 0 and fin - inicio <= 256 << 10 for inicio, fin in cortes)
+
+
+def test_vector_repartido_entre_dos_workers():
+    with workers_locales(2, "--log-muestreo", 0) as workers, \
+            coordinador_local(workers, "--log-muestreo", 0) as addr, grpc.insecure_channel(addr) as canal:
+        stub = calculo_pb2_grpc.CalculoServiceStub(canal)
+        for dtype in ("float64", "int64"):
+            a, b = operandos(dtype)
+            for op in OPS_BASICAS:
+                chunks = list(stub.CalculoArray(peticiones_arreglo(op, a, b, tam_trozo=64 << 10), timeout=30))
+                assert len(chunks) > 2 * (a.nbytes // (64 << 10)), f"{op} {dtype}: {len(chunks)} trozos"
+                assert {c.worker for c in chunks} == set(workers), f"{op} {dtype}: {[c.worker for c in chunks]}"
+                assert np.array_equal(unir_trozos(chunks, len(a)), esperado(op, a, b)), f"{op} {dtype}"
+            # un divisor 0 en un trozo posterior: la respuesta termina en él, con su posición
+            b[ELEMENTOS - 10] = 0
+            chunks = list(stub.CalculoArray(peticiones_arreglo("div", a, b, tam_trozo=64 << 10), timeout=30))
+            assert all(c.ok for c in chunks[:-1]) and not chunks[-1].ok
+            assert f"elemento {ELEMENTOS - 10}" in chunks[-1].error, chunks[-1].error
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
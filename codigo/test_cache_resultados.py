@@ -0,0 +1,115 @@
+"""
+Pruebas de cache_resultados.py: expulsión LRU, TTL, single-flight y el plazo de quien espera.
+
+Uso: python -m pytest test_cache_resultados.py   (o python test_cache_resultados.py; sale con código 1 si algo falla)
+"""
+import sys
+import threading
+import time
+
+import calculo_pb2
+from bench_util import ejecutar_pruebas
+from cache_resultados import CacheResultados
+from plazos import Plazo, PlazoAgotado
+
+ESPERA = 5.0  # s; tope para las esperas de las pruebas
+
+
+class Contexto:
+    """Lo mínimo de un ServicerContext para un Plazo: el tiempo restante y add_callback."""
+
+    def __init__(self, restante):
+        self.restante = restante
+
+    def time_remaining(self):
+        return self.restante
+
+    def add_callback(self, callback):
+        return True
+
+
+class Calculo:
+    """calcular(request) que cuenta sus llamadas y, con `bloqueado`, no termina hasta que se suelta."""
+
+    def __init__(self, bloqueado=False):
+        self.llamadas = 0
+        self.empezado = threading.Event()
+        self.suelto = threading.Event()
+        if not bloqueado:
+            self.suelto.set()
+
+    def __call__(self, request):
+        self.llamadas += 1
+        self.empezado.set()
+        assert self.suelto.wait(ESPERA)
+        return calculo_pb2.CalculoResponse(ok=True, result=request.a + request.b)
+
+
+def suma(a, b=0):
+    return calculo_pb2.CalculoRequest(op="add", a=a, b=b)
+
+
+def test_expulsion_lru():
+    cache, calcular = CacheResultados(capacidad=2), Calculo()
+    for a in (1, 2, 1, 3):  # 1 se usó después que 2: el que sale es 2
+        cache.resolver(suma(a), calcular)
+    assert calcular.llamadas == 3 and cache.expulsadas == 1
+    cache.resolver(suma(1), calcular)
+    cache.resolver(suma(3), calcular)
+    assert calcular.llamadas == 3
+    assert cache.resolver(suma(2), calcular).result == 2 and calcular.llamadas == 4
+
+
+def test_ttl_y_solo_respuestas_ok():
+    cache, calcular = CacheResultados(ttl=0.05), Calculo()
+    cache.resolver(suma(1), calcular)
+    cache.resolver(suma(1), calcular)
+    assert calcular.llamadas == 1 and cache.aciertos == 1
+    time.sleep(0.1)
+    cache.resolver(suma(1), calcular)
+    assert calcular.llamadas == 2 and cache.caducadas == 1
+    fallos = []
+    for _ in range(2):
+        cache.resolver(suma(7), lambda r: fallos.append(r) or calculo_pb2.CalculoResponse(ok=False, error="x"))
+    assert len(fallos) == 2, "una respuesta con ok=False no debe quedar en la caché"
+
+
+def test_single_flight():
+    cache, calcular = CacheResultados(), Calculo(bloqueado=True)
+    respuestas = []
+    hilos = [threading.Thread(target=lambda: respuestas.append(cache.resolver(suma(2, 3), calcular))) for _ in range(4)]
+    hilos[0].start()
+    assert calcular.empezado.wait(ESPERA)
+    for hilo in hilos[1:]:
+        hilo.start()
+    while cache.agrupadas < 3:
+        time.sleep(0.01)
+    calcular.suelto.set()
+    for hilo in hilos:
+        hilo.join(ESPERA)
+    assert calcular.llamadas == 1 and [r.result for r in respuestas] == [5] * 4
+    assert len({id(r) for r in respuestas}) == 4, "cada llamador debe recibir su propia copia"
+
+
+def test_quien_espera_un_calculo_ajeno_no_pasa_de_su_plazo():
+    cache, calcular = CacheResultados(), Calculo(bloqueado=True)
+    lider = threading.Thread(target=cache.resolver, args=(suma(4), calcular))
+    lider.start()
+    try:
+        assert calcular.empezado.wait(ESPERA)
+        t0 = time.monotonic()
+        try:
+            cache.resolver(suma(4), calcular, Plazo(Contexto(0.1)))
+        except PlazoAgotado as e:
+            assert not e.cancelado
+        else:
+            raise AssertionError("la espera al cálculo compartido no acabó con PlazoAgotado")
+        assert time.monotonic() - t0 < 1.0
+    finally:
+        calcular.suelto.set()
+        lider.join(ESPERA)
+    assert calcular.llamadas == 1 and cache.resolver(suma(4), calcular).result == 4
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
@@ -0,0 +1,69 @@
+"""
+Pruebas de la cancelación dentro de un worker: los subrangos que corren en los procesos de
+multiproceso.py y las extensiones del índice de prefijos paran cuando la llamada deja de estar activa.
+
+Uso: python -m pytest test_cancelacion.py   (o python test_cancelacion.py; sale con código 1 si algo falla)
+"""
+import sys
+import time
+
+from bench_util import ejecutar_pruebas
+from indice_prefijos import IndicePrefijos
+from motor_sumas import CalculoCancelado, suma_potencias
+from multiproceso import PoolProcesos
+
+ANTES_DE_CANCELAR = 0.2  # s
+
+
+def activo_durante(segundos):
+    fin = time.monotonic() + segundos
+    return lambda: time.monotonic() < fin
+
+
+def test_los_procesos_del_pool_paran_al_cancelar():
+    pool = PoolProcesos(2, "bucle")
+    try:
+        try:
+            pool.reducir("sum_powers", 1, 10 ** 10, {"k": 2}, activo=activo_durante(ANTES_DE_CANCELAR))
+        except CalculoCancelado:
+            pass
+        else:
+            raise AssertionError("la reducción no se interrumpió")
+        # si los procesos siguieran con sus 5·10^9 elementos, esta esperaría en la cola durante minutos
+        n = 200_000
+        t0 = time.monotonic()
+        total = pool.reducir("sum_powers", 1, n, {"k": 2}, activo=lambda: True)
+        segundos = time.monotonic() - t0
+        assert total == suma_potencias(1, n, 2, "cerrada")
+        assert segundos < 5, f"el pool tardó {segundos:.1f} s: los subrangos cancelados siguen corriendo"
+    finally:
+        pool.cerrar()
+
+
+def test_el_indice_deja_de_extender_al_cancelar_y_conserva_lo_calculado():
+    indice = IndicePrefijos(10_000, max_mb=16, motor="bucle")
+    b = indice.capacidad * indice.paso
+    try:
+        indice.suma(1, b, activo=activo_durante(ANTES_DE_CANCELAR))
+    except CalculoCancelado:
+        pass
+    else:
+        raise AssertionError("la extensión del índice no se interrumpió")
+    assert 0 < indice.cubiertos < indice.capacidad
+    x = indice.cubiertos * indice.paso + 5
+    assert indice.suma(3, x, activo=lambda: True) == suma_potencias(3, x, 2, "cerrada")
+
+
+def test_una_consulta_que_espera_al_lock_se_puede_cancelar():
+    indice = IndicePrefijos(10_000, max_mb=1, motor="bucle")
+    with indice._lock:  # otra consulta está extendiendo el índice
+        try:
+            indice.suma(1, 10 ** 6, activo=lambda: False)
+        except CalculoCancelado:
+            pass
+        else:
+            raise AssertionError("la consulta esperó al lock aunque su llamada ya no estaba activa")
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
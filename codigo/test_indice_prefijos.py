@@ -0,0 +1,57 @@
+"""
+Pruebas del índice de prefijos persistente de indice_prefijos.py: al reutilizar su fichero
+se respeta el límite de memoria con el que arranca el worker.
+
+Uso: python -m pytest test_indice_prefijos.py   (o python test_indice_prefijos.py; sale con código 1 si algo falla)
+"""
+import os
+import sys
+import tempfile
+
+from bench_util import ejecutar_pruebas
+from indice_prefijos import CABECERA, IndicePrefijos
+from motor_sumas import suma_potencias
+
+PASO = 100
+MB_PUNTOS = 16 / 2 ** 20  # max_mb de un solo punto de control
+
+
+def abrir(archivo, puntos):
+    return IndicePrefijos(PASO, max_mb=puntos * MB_PUNTOS, motor="bucle", archivo=archivo)
+
+
+def test_reabrir_con_menos_memoria_trunca_el_fichero():
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "indice.bin")
+        indice = abrir(archivo, 1000)
+        assert indice.suma(1, 1000 * PASO) == suma_potencias(1, 1000 * PASO, 2, "cerrada")
+        assert indice.cubiertos == 1000
+        indice.cerrar()
+        del indice
+
+        indice = abrir(archivo, 100)
+        assert indice.capacidad == 100 and indice.cubiertos == 100
+        assert os.path.getsize(archivo) == (CABECERA + 2 * 100) * 8
+        # los puntos que quedan siguen valiendo, y lo que ya no cabe se calcula directamente
+        for a, b in ((5, 100 * PASO - 3), (7, 500 * PASO)):
+            assert indice.suma(a, b) == suma_potencias(a, b, 2, "cerrada")
+        indice.cerrar()
+
+
+def test_reabrir_con_mas_memoria_amplia_el_fichero():
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "indice.bin")
+        indice = abrir(archivo, 10)
+        indice.suma(1, 10 * PASO)
+        indice.cerrar()
+        del indice
+
+        indice = abrir(archivo, 50)
+        assert indice.capacidad == 50 and indice.cubiertos == 10
+        assert indice.suma(1, 50 * PASO) == suma_potencias(1, 50 * PASO, 2, "cerrada")
+        assert indice.cubiertos == 50
+        indice.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
@@ -0,0 +1,66 @@
+"""
+Pruebas de CalculoBatch: cada item lleva su propio ok/error, alineado por índice, sin hacer
+fallar el lote; en el worker, en el coordinador con hilos y en el aio.
+
+Uso: python -m pytest test_lotes.py   (o python test_lotes.py; sale con código 1 si algo falla)
+"""
+import sys
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import coordinador_local, ejecutar_pruebas, workers_locales
+from operaciones import calcular_basica, calcular_basicas_lote
+from reducciones import MAX_EXPONENTE, MAX_PRIMOS
+
+# (petición, resultado esperado o None si debe fallar) — errores entre medias de los buenos
+LOTE = [
+    (calculo_pb2.CalculoRequest(op="add", a=2, b=3), 5),
+    (calculo_pb2.CalculoRequest(op="div", a=1, b=0), None),
+    (calculo_pb2.CalculoRequest(op="sum_squares", n=1000), 1000 * 1001 * 2001 // 6),
+    (calculo_pb2.CalculoRequest(op="pow", a=2, b=3), None),
+    (calculo_pb2.CalculoRequest(op="div", a=7, b=2), 3.5),
+    (calculo_pb2.CalculoRequest(op="sum_powers", k=MAX_EXPONENTE + 1, inicio=1, fin=10), None),
+    (calculo_pb2.CalculoRequest(op="mul", a=-4, b=2.5), -10),
+    (calculo_pb2.CalculoRequest(op="count_primes", inicio=1, fin=MAX_PRIMOS + 1), None),
+    (calculo_pb2.CalculoRequest(op="count_primes", inicio=1, fin=100), 25),
+    (calculo_pb2.CalculoRequest(op="sub", a=1, b=0), 1),
+]
+
+
+def resultado(response):
+    return int(response.result_exacto) if response.result_exacto else response.result
+
+
+def comprobar(respuestas, donde):
+    assert len(respuestas) == len(LOTE), f"{donde}: {len(respuestas)} respuestas para {len(LOTE)} items"
+    for i, ((request, esperado), response) in enumerate(zip(LOTE, respuestas)):
+        caso = f"{donde}, item {i} ({request.op})"
+        if esperado is None:
+            assert not response.ok and response.error, f"{caso}: debía fallar y dio {response}"
+        else:
+            assert response.ok, f"{caso}: {response.error}"
+            assert resultado(response) == esperado, f"{caso}: {resultado(response)} != {esperado}"
+
+
+def test_basicas_lote_con_numpy_igual_que_una_a_una():
+    items = [request for request, _ in LOTE if request.op in ("add", "sub", "mul", "div", "pow")]
+    for vectorizada, escalar in zip(calcular_basicas_lote(items), (calcular_basica(r.op, r.a, r.b) for r in items)):
+        assert vectorizada == escalar, f"{vectorizada} != {escalar}"
+
+
+def test_errores_por_item_en_worker_y_coordinadores():
+    lote = calculo_pb2.CalculoBatchRequest(items=[request for request, _ in LOTE])
+    with workers_locales(2, "--log-muestreo", 0) as workers:
+        with grpc.insecure_channel(workers[0]) as canal:
+            comprobar(calculo_pb2_grpc.OperacionServiceStub(canal).CalculoBatch(lote, timeout=30).items, "worker")
+        for servidor in ("hilos", "aio"):
+            with coordinador_local(workers, "--servidor", servidor, "--log-muestreo", 0) as addr, \
+                    grpc.insecure_channel(addr) as canal:
+                respuestas = calculo_pb2_grpc.CalculoServiceStub(canal).CalculoBatch(lote, timeout=30).items
+                comprobar(respuestas, f"coordinador {servidor}")
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
@@ -0,0 +1,108 @@
+"""
+Prueba de la membresía dinámica: con la carga en marcha entran workers nuevos, unos se dan
+de baja (SIGINT) y otro muere sin avisar (SIGKILL); ninguna respuesta puede fallar ni ser
+incorrecta, con el coordinador con hilos y con el aio. Los tiempos de la misma
+situación se miden aparte, en bench_membresia.py.
+
+Uso: python -m pytest test_membresia.py   (o python test_membresia.py; sale con código 1 si algo falla)
+"""
+import collections
+import signal
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import coordinador_local, ejecutar_pruebas, workers_con_procesos
+
+HILOS = 6
+FASE = 2.5      # s de carga entre cambios de membresía
+ESPERA = 15     # s como mucho para que un alta se note en las respuestas
+N = 50_000
+PETICIONES = [
+    (calculo_pb2.CalculoRequest(op="add", a=2, b=3), lambda r: r.result == 5),
+    (calculo_pb2.CalculoRequest(op="sum_squares", n=N), lambda r: int(r.result_exacto) == N * (N + 1) * (2 * N + 1) // 6),
+    (calculo_pb2.CalculoRequest(op="sum_powers", n=N, k=3), lambda r: int(r.result_exacto) == (N * (N + 1) // 2) ** 2),
+    (calculo_pb2.CalculoRequest(op="count_primes", n=100_000), lambda r: r.result_exacto == "9592"),
+]
+
+
+def workers_en_respuesta(stub):
+    response = stub.CalculoTotal(calculo_pb2.CalculoRequest(op="sum_squares", n=N), timeout=30)
+    return {p.worker for p in response.parts}
+
+
+def esperar_workers(stub, esperados):
+    """Espera a que las partes de sum_squares se repartan exactamente entre `esperados`."""
+    limite = time.monotonic() + ESPERA
+    while (vistos := workers_en_respuesta(stub)) != esperados:
+        assert time.monotonic() < limite, f"el coordinador reparte entre {sorted(vistos)}, se esperaba {sorted(esperados)}"
+        time.sleep(0.2)
+
+
+def comprobar_altas_y_bajas(servidor):
+    with coordinador_local([], "--fanout", "concurrente", "--servidor", servidor, "--log-muestreo", 0) as coordinador, \
+            grpc.insecure_channel(coordinador) as channel:
+        stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+        opciones = ("--coordinador", coordinador, "--log-muestreo", 0)
+        with workers_con_procesos(2, *opciones) as fijos:
+            # sin --anunciar el worker se anuncia como localhost:<port>
+            anunciados = {addr.replace("127.0.0.1", "localhost") for addr in fijos}
+            esperar_workers(stub, anunciados)
+
+            detener = threading.Event()
+            respuestas = collections.Counter()
+            fallos = collections.Counter()
+
+            def cliente(i):
+                request, correcto = PETICIONES[i % len(PETICIONES)]
+                while not detener.is_set():
+                    try:
+                        response = stub.CalculoTotal(request, timeout=30)
+                        fallo = None if response.ok and correcto(response) else \
+                            f"{request.op}: {response.error or 'resultado incorrecto'}"
+                    except grpc.RpcError as e:
+                        fallo = f"{request.op}: {e.code().name}"
+                    respuestas[request.op] += 1
+                    if fallo is not None:
+                        fallos[fallo] += 1
+
+            with futures.ThreadPoolExecutor(HILOS) as clientes:
+                for i in range(HILOS):
+                    clientes.submit(cliente, i)
+                try:
+                    time.sleep(FASE)
+                    with workers_con_procesos(4, *opciones) as extra:
+                        nuevos = {addr.replace("127.0.0.1", "localhost") for addr in extra}
+                        esperar_workers(stub, anunciados | nuevos)
+                        time.sleep(FASE)
+                        procesos = list(extra.values())
+                        for proc in procesos[:3]:
+                            proc.send_signal(signal.SIGINT)  # baja ordenada
+                        procesos[3].kill()  # y uno que desaparece sin avisar
+                        for proc in procesos:
+                            proc.wait()
+                        time.sleep(FASE)
+                    esperar_workers(stub, anunciados)
+                    time.sleep(FASE)
+                finally:
+                    detener.set()
+
+    assert all(respuestas[r.op] for r, _ in PETICIONES), f"alguna operación no llegó a enviarse: {dict(respuestas)}"
+    assert not fallos, f"{sum(fallos.values())} de {sum(respuestas.values())} respuestas mal: {dict(fallos)}"
+
+
+def test_altas_y_bajas_con_coordinador_hilos():
+    comprobar_altas_y_bajas("hilos")
+
+
+def test_altas_y_bajas_con_coordinador_aio():
+    comprobar_altas_y_bajas("aio")
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
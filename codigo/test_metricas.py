@@ -0,0 +1,55 @@
+"""
+Pruebas de metricas.py: el formato de texto de /metrics con valores de etiqueta que manda el cliente.
+
+Uso: python -m pytest test_metricas.py   (o python test_metricas.py; sale con código 1 si algo falla)
+"""
+import re
+import sys
+import urllib.request
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import coordinador_local, ejecutar_pruebas, puertos_libres
+from metricas import OP_OTRA, RegistroMetricas, etiqueta_op
+
+OP_MALICIOSA = 'x"} 1\nfake_metric 999\n# \\'
+# una línea de muestra: nombre, etiquetas con valores escapados y el valor
+LINEA = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_]\w*="([^"\\\n]|\\[\\"n])*",?)*\})? \S+$')
+
+
+def comprobar_formato(texto):
+    for linea in texto.splitlines():
+        assert linea.startswith("# ") or LINEA.match(linea), f"línea inválida en /metrics: {linea!r}"
+    assert not any(linea.startswith("fake_metric") for linea in texto.splitlines())
+
+
+def test_valores_de_etiqueta_escapados():
+    registro = RegistroMetricas()
+    registro.contador("prueba_total", "prueba", ("op",)).inc(op=OP_MALICIOSA)
+    texto = registro.exponer()
+    comprobar_formato(texto)
+    assert 'prueba_total{op="x\\"} 1\\nfake_metric 999\\n# \\\\"} 1' in texto, texto
+
+
+def test_ops_desconocidas_van_a_una_sola_etiqueta():
+    assert etiqueta_op("sum_squares") == "sum_squares" and etiqueta_op("add") == "add" and etiqueta_op("") == ""
+    assert etiqueta_op("no_existe") == etiqueta_op(OP_MALICIOSA) == OP_OTRA
+
+
+def test_metrics_del_coordinador_con_ops_del_cliente():
+    (puerto,) = puertos_libres(1)
+    with coordinador_local([], "--metricas-puerto", puerto, "--log-muestreo", 0) as addr, \
+            grpc.insecure_channel(addr) as channel:
+        stub = calculo_pb2_grpc.CalculoServiceStub(channel)
+        for op in (OP_MALICIOSA, *(f"op_{i}" for i in range(20))):
+            stub.CalculoTotal(calculo_pb2.CalculoRequest(op=op, a=1, b=2), timeout=10)
+        texto = urllib.request.urlopen(f"http://127.0.0.1:{puerto}/metrics", timeout=5).read().decode()
+    comprobar_formato(texto)
+    series = re.findall(r'^grpc_servidor_latencia_segundos_count\{metodo="CalculoTotal",op="([^"]*)"\}', texto, re.M)
+    assert series == [OP_OTRA], f"series por op: {series}"
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
@@ -0,0 +1,85 @@
+"""
+Pruebas de los motores de motor_sumas.py: cada motor disponible coincide con el bucle de
+referencia, también en los casos límite (rangos negativos, a > b, 0**0, valores que no
+caben en int64 y n enormes con la fórmula cerrada).
+
+Uso: python -m pytest test_motores.py   (o python test_motores.py; sale con código 1 si algo falla)
+"""
+import random
+import sys
+
+from bench_util import ejecutar_pruebas
+from motor_sumas import MOTORES, BLOQUE_CANCELABLE, CalculoCancelado, motores_disponibles, suma_bucle, suma_potencias
+
+
+def comprobar_casos(casos):
+    for nombre in motores_disponibles():
+        for a, b, k in casos:
+            esperado = suma_bucle(a, b, k)
+            obtenido = MOTORES[nombre](a, b, k)
+            assert obtenido == esperado, f"{nombre}({a}, {b}, {k}) = {obtenido}, esperado {esperado}"
+
+
+def test_rangos_aleatorios():
+    rng = random.Random(1234)
+    comprobar_casos([(a, a + rng.randint(0, 5000), k)
+                     for a, k in ((rng.randint(-10 ** 6, 10 ** 6), rng.randint(0, 7)) for _ in range(200))])
+
+
+def test_rangos_negativos():
+    comprobar_casos([(-50, 50, 3), (-7, -3, 2), (-1, -1, 5), (-10_000, -1, 4), (-3, 3, 1)])
+
+
+def test_rango_vacio_da_cero():
+    comprobar_casos([(1, 0, 2), (5, 4, 0), (10, -10, 3), (0, -1, 1)])
+    for nombre in motores_disponibles():
+        assert MOTORES[nombre](10, -10, 2) == 0
+
+
+def test_cero_y_exponente_cero():
+    # 0**0 = 1, como en Python: [0, 0] con k = 0 cuenta un elemento
+    comprobar_casos([(0, 0, 0), (0, 0, 3), (-2, 0, 0), (1, 1, 2), (5, 9, 0)])
+    for nombre in motores_disponibles():
+        assert MOTORES[nombre](-2, 0, 0) == 3
+
+
+def test_fuera_de_int64():
+    # i**k no cabe en int64: el motor numpy debe pasar a enteros de Python sin desbordar
+    comprobar_casos([(3_000_000_000, 3_000_000_100, 2), (10 ** 12, 10 ** 12 + 50, 3),
+                     (2 ** 62, 2 ** 62 + 20, 2), (-(2 ** 63) - 5, -(2 ** 63) + 5, 2), (2 ** 70, 2 ** 70 + 3, 1)])
+
+
+def test_n_enorme_con_formula_cerrada():
+    for n in (2 ** 53 + 1, 10 ** 17, 10 ** 18, 2 ** 63 - 1, 10 ** 30):
+        assert suma_potencias(1, n, 2, "cerrada") == n * (n + 1) * (2 * n + 1) // 6
+        assert suma_potencias(1, n, 1, "cerrada") == n * (n + 1) // 2
+        assert suma_potencias(-n, n, 3, "cerrada") == 0
+
+
+def test_por_bloques_cancelables():
+    # con `activo` los motores iterativos recorren bloques de BLOQUE_CANCELABLE: el total no cambia
+    a, b = -BLOQUE_CANCELABLE, 2 * BLOQUE_CANCELABLE + 17
+    esperado = suma_potencias(a, b, 2, "cerrada")
+    for nombre in motores_disponibles():
+        if nombre != "bucle":
+            assert suma_potencias(a, b, 2, nombre, activo=lambda: True) == esperado
+
+
+def test_cancelacion():
+    try:
+        suma_potencias(1, 4 * BLOQUE_CANCELABLE, 2, motores_disponibles()[-1], activo=lambda: False)
+    except CalculoCancelado:
+        return
+    raise AssertionError("un cálculo con activo() False no se interrumpió")
+
+
+def test_motor_desconocido():
+    try:
+        suma_potencias(1, 10, 2, "no-existe")
+    except ValueError:
+        return
+    raise AssertionError("un motor desconocido no dio ValueError")
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
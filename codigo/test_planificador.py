@@ -0,0 +1,63 @@
+"""
+Pruebas del reparto de rangos de planificador.py.
+
+Uso: python -m pytest test_planificador.py   (o python test_planificador.py; sale con código 1 si algo falla)
+"""
+import random
+import sys
+
+from bench_util import ejecutar_pruebas
+from planificador import Planificador, dividir_rango_ponderado
+
+
+def comprobar_reparto(n, pesos, inicio=1):
+    rangos = dividir_rango_ponderado(n, pesos, inicio=inicio)
+    assert len(rangos) == min(n, len(pesos)), f"{n}, {pesos}: {rangos}"
+    siguiente = inicio
+    for a, b in rangos:
+        assert a == siguiente and b >= a, f"{n}, {pesos}: {rangos}"
+        siguiente = b + 1
+    assert siguiente == inicio + n, f"{n}, {pesos}: {rangos} no cubre {inicio}..{inicio + n - 1}"
+    return rangos
+
+
+def test_pesos_muy_desiguales_no_se_salen_del_rango():
+    assert comprobar_reparto(10, [1000, 1, 1]) == [(1, 8), (9, 9), (10, 10)]
+    assert comprobar_reparto(3, [100, 1, 1]) == [(1, 1), (2, 2), (3, 3)]
+    assert comprobar_reparto(10, [1, 1000, 1]) == [(1, 1), (2, 9), (10, 10)]
+
+
+def test_menos_elementos_que_partes():
+    assert comprobar_reparto(2, [1, 1, 1]) == [(1, 1), (2, 2)]
+    assert comprobar_reparto(0, [1, 2]) == []
+
+
+def test_proporcional_a_los_pesos():
+    assert comprobar_reparto(100, [1, 3]) == [(1, 25), (26, 100)]
+    assert comprobar_reparto(10, [0, 0]) == [(1, 5), (6, 10)]  # sin pesos útiles, partes iguales
+
+
+def test_rangos_aleatorios_cubren_exacto():
+    rng = random.Random(7)
+    for _ in range(2000):
+        pesos = [rng.choice((0, rng.random(), rng.uniform(1, 10 ** 6))) for _ in range(rng.randint(1, 8))]
+        comprobar_reparto(rng.randint(0, 50), pesos, inicio=rng.randint(-100, 100))
+        comprobar_reparto(rng.randint(1, 10 ** 18), pesos, inicio=rng.randint(-10 ** 6, 10 ** 6))
+
+
+def test_llamadas_sin_rango_no_cuentan_para_el_rendimiento():
+    # dos workers igual de rápidos; A atiende además cinco add de 1 ms
+    plan = Planificador()
+    for w in ("A", "B"):
+        plan.inicio(w)
+        plan.fin(w, 0.01, 1_000_000)
+    for _ in range(5):
+        plan.inicio("A")
+        plan.fin("A", 0.001)
+    assert plan.pesos(["A", "B"]) == [1e8, 1e8]
+    assert plan.latencia["A"] < plan.latencia["B"]  # la latencia sí se mide
+    assert comprobar_reparto(100, plan.pesos(["A", "B"])) == [(1, 50), (51, 100)]
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
@@ -0,0 +1,41 @@
+"""
+Pruebas del timeout que plazos.py da a cada llamada del coordinador a un worker.
+
+Uso: python -m pytest test_plazos.py   (o python test_plazos.py; sale con código 1 si algo falla)
+"""
+import sys
+
+from bench_util import ejecutar_pruebas
+from plazos import MARGEN, TIMEOUT_WORKER, Plazo
+
+
+class Contexto:
+    """Lo mínimo de un ServicerContext: el tiempo restante y add_callback."""
+
+    def __init__(self, restante):
+        self.restante = restante
+
+    def time_remaining(self):
+        return self.restante
+
+    def add_callback(self, callback):
+        return True
+
+
+def test_un_deadline_largo_no_se_recorta_a_timeout_worker():
+    plazo = Plazo(Contexto(60.0))
+    assert TIMEOUT_WORKER < plazo.timeout() <= 60.0
+    assert Plazo(Contexto(0.0)).timeout() == MARGEN and Plazo(Contexto(0.0)).agotado
+
+
+def test_sin_deadline_se_usa_el_timeout_por_defecto():
+    # grpc.aio da None y el servidor síncrono unos 9e18 s
+    for restante in (None, 9.2e18):
+        plazo = Plazo(Contexto(restante))
+        assert plazo.restante() is None and not plazo.agotado
+        assert plazo.timeout() == TIMEOUT_WORKER
+    assert Plazo().timeout() == TIMEOUT_WORKER
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
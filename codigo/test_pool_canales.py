@@ -0,0 +1,53 @@
+"""
+Pruebas del pool de canales del coordinador (pool_canales.py) y de su uso en CalculoService.
+
+Uso: python -m pytest test_pool_canales.py   (o python test_pool_canales.py; sale con código 1 si algo falla)
+"""
+import sys
+
+import grpc
+
+import calculo_pb2
+from bench_util import ejecutar_pruebas, workers_locales
+from calc_server_grpc import CalculoService, publicar_metricas
+from metricas import METRICAS
+
+N = 3_000_000  # con el motor bucle, un cálculo que sigue en curso mientras otra petición falla
+
+
+class Inalcanzable(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+
+def test_unavailable_no_corta_las_llamadas_en_curso():
+    with workers_locales(1, "--motor", "bucle", "--log-muestreo", 0) as (worker,):
+        servicio = CalculoService([worker])
+        try:
+            stub = servicio.obtener_stub(worker)
+            en_curso = stub.Calcular.future(calculo_pb2.CalculoRequest(op="sum_squares", inicio=1, fin=N), timeout=30)
+            servicio.planificador.inicio(worker)
+            servicio.registrar_fallo(worker, Inalcanzable())  # otra petición al mismo worker falla
+            response = en_curso.result()
+            assert response.ok and int(response.result_exacto) == N * (N + 1) * (2 * N + 1) // 6
+            assert servicio.pool.contadores()["cerrados"] == 0
+            assert servicio.obtener_stub(worker) is stub
+        finally:
+            servicio.cerrar()
+
+
+def test_contadores_del_pool_en_metrics():
+    servicio = CalculoService([])
+    try:
+        servicio.obtener_stub("127.0.0.1:1")
+        servicio.obtener_stub("127.0.0.1:1")
+        publicar_metricas(servicio)
+        texto = METRICAS.exponer()
+        for contador, valor in (("creados", 1), ("reutilizados", 1), ("cerrados", 0), ("abiertos", 1)):
+            assert f'coordinador_canales{{contador="{contador}"}} {valor}' in texto, texto
+    finally:
+        servicio.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
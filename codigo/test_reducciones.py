@@ -0,0 +1,111 @@
+"""
+Pruebas de las reducciones distribuidas: la codificación del rango en las peticiones y los
+subrangos que el coordinador reparte entre workers reales (procesos aparte).
+
+Uso: python -m pytest test_reducciones.py   (o python test_reducciones.py; sale con código 1 si algo falla)
+"""
+import sys
+
+import grpc
+
+import calculo_pb2
+import calculo_pb2_grpc
+from bench_util import coordinador_local, ejecutar_pruebas, silencio, workers_locales
+from calc_server_grpc import CalculoService
+from reducciones import MAX_PRIMOS, REDUCCIONES, _cota_primos_base, rango, subpeticion
+
+FANOUTS = ("secuencial", "concurrente", "trozos")
+
+
+def suma_cuadrados(n):
+    return n * (n + 1) * (2 * n + 1) // 6
+
+
+def resultados_distribuidos(request, workers):
+    """{modo: CalculoResponse} de la petición con cada fanout del coordinador con hilos y con el aio."""
+    respuestas = {}
+    for fanout in FANOUTS:
+        servicio = CalculoService(list(workers), fanout=fanout)
+        try:
+            with silencio():
+                respuestas[fanout] = servicio.CalculoTotal(request, None)
+        finally:
+            servicio.cerrar()
+    with coordinador_local(workers, "--servidor", "aio", "--sondeo", 0, "--log-muestreo", 0) as addr, \
+            grpc.insecure_channel(addr) as channel:
+        respuestas["aio"] = calculo_pb2_grpc.CalculoServiceStub(channel).CalculoTotal(request, timeout=30)
+    return respuestas
+
+
+def test_subpeticion_conserva_enteros_grandes():
+    request = calculo_pb2.CalculoRequest(op="sum_squares", n=10 ** 18)
+    for a, b in ((2 ** 53 + 1, 2 ** 53 + 3), (10 ** 18 - 7, 10 ** 18), (2 ** 63 - 2, 2 ** 63 - 1), (-(2 ** 63), 0)):
+        assert rango(subpeticion(request, a, b)) == (a, b)
+
+
+def test_rango_a_b_mayor_que_2_53_se_rechaza():
+    for a, b in ((1, 2 ** 53 + 2), (-(2 ** 60), 0)):
+        try:
+            rango(calculo_pb2.CalculoRequest(op="sum_squares", a=a, b=b))
+        except ValueError:
+            continue
+        raise AssertionError(f"[{a}, {b}] en doubles no dio ValueError")
+    assert rango(calculo_pb2.CalculoRequest(op="sum_squares", a=-(2 ** 53), b=2 ** 53)) == (-(2 ** 53), 2 ** 53)
+
+
+def test_count_primes_acota_el_fin_y_cobra_la_criba_base():
+    primos = REDUCCIONES["count_primes"]
+    assert primos.parametros(calculo_pb2.CalculoRequest(op="count_primes", inicio=2, fin=MAX_PRIMOS)) == {}
+    try:
+        primos.parametros(calculo_pb2.CalculoRequest(op="count_primes", inicio=MAX_PRIMOS, fin=MAX_PRIMOS + 1))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("count_primes por encima de MAX_PRIMOS no dio ValueError")
+    # un subrango corto cerca del final cuesta sobre todo la criba de los primos base
+    assert primos.trabajo(MAX_PRIMOS - 9, MAX_PRIMOS, {}) == 10 + _cota_primos_base(MAX_PRIMOS) >= 10 ** 6
+    # los subrangos de un mismo rango comparten la cota (y la entrada de la caché de primos base)
+    assert _cota_primos_base(10 ** 9) == _cota_primos_base(10 ** 9 - 12345) == 32768
+    assert primos.mapear(1, 10 ** 5, {}) == 9592
+
+
+def test_subrangos_de_un_solo_elemento_en_el_cero():
+    request = calculo_pb2.CalculoRequest(op="prod_mod", modulo=5)
+    assert rango(subpeticion(request, 0, 0)) == (0, 0)
+    assert rango(calculo_pb2.CalculoRequest(op="prod_mod", inicio=0, fin=0)) == (0, 0)
+    assert rango(calculo_pb2.CalculoRequest(op="prod_mod", a=0, b=0)) == (1, 0)  # legado: n = 0, rango vacío
+
+
+def test_rangos_con_el_cero_entre_tres_workers():
+    # con 3 workers, [-1, 1] y [-2, 0] se reparten en subrangos de un elemento, uno de ellos [0, 0]
+    casos = [
+        (calculo_pb2.CalculoRequest(op="prod_mod", modulo=5, inicio=-1, fin=1), 0),
+        (calculo_pb2.CalculoRequest(op="prod_mod", modulo=7, inicio=-3, fin=-1), (-3 * -2 * -1) % 7),
+        (calculo_pb2.CalculoRequest(op="sum_powers", k=0, inicio=-2, fin=0), 3),
+        (calculo_pb2.CalculoRequest(op="sum_powers", k=0, inicio=0, fin=0), 1),
+        (calculo_pb2.CalculoRequest(op="sum_powers", k=3, inicio=-5, fin=4), sum(x ** 3 for x in range(-5, 5))),
+    ]
+    with workers_locales(3, "--log-muestreo", 0) as workers:
+        for request, esperado in casos:
+            inicio, fin = request.inicio, request.fin
+            for modo, response in resultados_distribuidos(request, workers).items():
+                caso = f"{modo}, {request.op} [{inicio}, {fin}]"
+                assert response.ok, f"{caso}: {response.error}"
+                assert int(response.result_exacto) == esperado, f"{caso}: {response.result_exacto} != {esperado}"
+                cubiertos = sorted(x for p in response.parts for x in range(p.a, p.b + 1))
+                assert cubiertos == list(range(inicio, fin + 1)), f"{caso}: partes {[(p.a, p.b) for p in response.parts]}"
+
+
+def test_sum_squares_n_enorme_con_tres_workers():
+    with workers_locales(3, "--log-muestreo", 0) as workers:
+        for n in (2 ** 53 + 1, 10 ** 17, 10 ** 18):
+            request = calculo_pb2.CalculoRequest(op="sum_squares", n=n)
+            for modo, response in resultados_distribuidos(request, workers).items():
+                assert response.ok, f"{modo}, n={n}: {response.error}"
+                assert int(response.result_exacto) == suma_cuadrados(n), f"{modo}, n={n}: {response.result_exacto}"
+                extremos = sorted((p.a, p.b) for p in response.parts)
+                assert extremos[0][0] == 1 and extremos[-1][1] == n, f"{modo}, n={n}: {extremos}"
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
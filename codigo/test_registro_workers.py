@@ -0,0 +1,67 @@
+"""
+Pruebas del circuit breaker de registro_workers.py y de cómo lo usa el coordinador.
+
+Uso: python -m pytest test_registro_workers.py   (o python test_registro_workers.py; sale con código 1 si algo falla)
+"""
+import sys
+
+import calculo_pb2
+from bench_util import ejecutar_pruebas
+from calc_server_grpc import CalculoService
+from plazos import Plazo, PlazoAgotado
+from registro_workers import ABIERTO, CERRADO, SEMIABIERTO, RegistroWorkers
+
+WORKER = "127.0.0.1:1"  # nadie escucha: las pruebas no llegan a enviar nada
+
+
+def abrir(registro, addr=WORKER):
+    for _ in range(registro.umbral_fallos):
+        registro.registrar_fallo(addr)
+    assert registro.estado(addr).estado == ABIERTO
+
+
+def test_prueba_abandonada_vuelve_a_abierto_y_se_puede_repetir():
+    registro = RegistroWorkers([WORKER], backoff_inicial=0)
+    abrir(registro)
+    assert registro.disponible(WORKER)
+    assert registro.estado(WORKER).estado == SEMIABIERTO
+    assert not registro.disponible(WORKER), "con la prueba en curso no pasa otra petición"
+    registro.registrar_abandono(WORKER)
+    assert registro.estado(WORKER).estado == ABIERTO
+    assert registro.disponible(WORKER), "tras abandonar la prueba el worker debe poder probarse otra vez"
+    registro.registrar_exito(WORKER)
+    assert registro.estado(WORKER).estado == CERRADO
+
+
+def test_abandono_no_toca_un_breaker_cerrado_ni_el_backoff():
+    registro = RegistroWorkers([WORKER], backoff_inicial=0)
+    registro.registrar_abandono(WORKER)
+    assert registro.estado(WORKER).estado == CERRADO
+    abrir(registro)
+    registro.disponible(WORKER)
+    registro.registrar_abandono(WORKER)
+    assert registro.estado(WORKER).backoff == 0
+
+
+def test_coordinador_devuelve_la_prueba_si_el_plazo_se_agota():
+    servicio = CalculoService([WORKER])
+    servicio.registro = RegistroWorkers([WORKER], backoff_inicial=0)
+    try:
+        abrir(servicio.registro)
+        plazo = Plazo()
+        plazo.cancelar()
+        for _ in range(3):
+            (worker,) = servicio.orden_workers()  # pasa a semiabierto: esta petición es la prueba
+            try:
+                servicio.enviar_a_worker(calculo_pb2.CalculoRequest(op="add", a=1, b=2), worker, plazo=plazo)
+            except PlazoAgotado:
+                pass
+            else:
+                raise AssertionError("con el plazo agotado no se debía enviar")
+            assert servicio.registro.estado(WORKER).estado == ABIERTO
+    finally:
+        servicio.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
@@ -0,0 +1,193 @@
+"""
+Pruebas de CalculoStream en los coordinadores con hilos y aio.
+
+Uso: python -m pytest test_stream.py   (o python test_stream.py; sale con código 1 si algo falla)
+"""
+import asyncio
+import sys
+import threading
+from concurrent import futures
+
+import grpc
+
+import calculo_pb2
+from bench_util import ejecutar_pruebas
+from calc_server_aio import CalculoServiceAio
+from calc_server_grpc import CalculoService
+from flujos import StreamWorker
+from plazos import PlazoAgotado
+
+ESPERA = 5  # s como mucho para que el stream termine; más sería quedarse colgado
+
+
+class Abortado(Exception):
+    pass
+
+
+class ContextoFalso:
+    """Lo que CalculoStream usa del contexto de gRPC: deadline, callbacks de fin y abort."""
+
+    def __init__(self):
+        self.callbacks = []
+        self.codigo = None
+        self.hilo_abort = None
+
+    def time_remaining(self):
+        return None
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+        return True
+
+    def terminar_rpc(self):
+        for callback in self.callbacks:
+            callback()
+
+    def abort(self, codigo, detalle):
+        self.codigo = codigo
+        self.hilo_abort = threading.current_thread()
+        raise Abortado(detalle)
+
+
+class ContextoFalsoAio(ContextoFalso):
+    async def abort(self, codigo, detalle):
+        ContextoFalso.abort(self, codigo, detalle)
+
+
+class StubMudo:
+    """Stub de un worker que lee las peticiones del stream y nunca responde."""
+
+    def CalculoStream(self, peticiones):
+        for _ in peticiones:
+            pass
+        return
+        yield
+
+
+def resolver_falso(request, context, plazo):
+    if request.op == "sum_squares":
+        raise PlazoAgotado(cancelado=False)
+    return calculo_pb2.CalculoResponse(ok=True, result=5)
+
+
+def test_hilos_stream_con_plazo_agotado_aborta_desde_el_handler():
+    servicio = CalculoService([])
+    servicio._resolver = resolver_falso
+    contexto = ContextoFalso()
+    peticiones = [calculo_pb2.CalculoRequest(op="add", id="1"), calculo_pb2.CalculoRequest(op="sum_squares", id="2")]
+
+    def consumir():
+        hilo = threading.current_thread()
+        try:
+            return [r.id for r in servicio.CalculoStream(iter(peticiones), contexto)], hilo
+        except Abortado:
+            return None, hilo
+
+    try:
+        with futures.ThreadPoolExecutor(1) as ex:
+            ids, hilo_handler = ex.submit(consumir).result(timeout=ESPERA)
+    finally:
+        servicio.cerrar()
+    assert ids is None, f"el stream terminó bien ({ids}) con una petición fuera de plazo"
+    assert contexto.codigo == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert contexto.hilo_abort is hilo_handler, "context.abort desde un hilo que no es el del handler"
+    assert len(contexto.callbacks) == 2, f"{len(contexto.callbacks)} callbacks: uno del plazo y otro del stream"
+
+
+def test_hilos_stream_termina_cuando_la_rpc_acaba():
+    # el cliente deja la entrada abierta; al vencer el deadline gRPC llama a los callbacks del contexto
+    servicio = CalculoService([])
+    servicio._resolver = resolver_falso
+    contexto = ContextoFalso()
+    abierta = threading.Event()
+
+    def peticiones():
+        yield calculo_pb2.CalculoRequest(op="add", id="1")
+        abierta.wait()
+
+    try:
+        respuestas = servicio.CalculoStream(peticiones(), contexto)
+        assert next(respuestas).id == "1"
+        contexto.terminar_rpc()
+        with futures.ThreadPoolExecutor(1) as ex:
+            resto = ex.submit(list, respuestas).result(timeout=ESPERA)
+        assert resto == []
+    finally:
+        abierta.set()
+        servicio.cerrar()
+
+
+def test_stream_worker_sin_respuesta_falla_por_timeout_y_libera_el_hueco():
+    stream = StreamWorker("mudo:1", lambda addr: StubMudo(), max_en_vuelo=1)
+    request = calculo_pb2.CalculoRequest(op="add", a=2, b=3)
+    try:
+        for _ in range(2):  # la segunda solo cabe si la primera soltó su hueco
+            future = stream.enviar(request, timeout=ESPERA, timeout_respuesta=0.1)
+            assert futures.wait([future], ESPERA).done, "la petición sin respuesta no venció"
+            assert isinstance(future.exception(), TimeoutError), future.exception()
+        assert not stream._pendientes and not stream._vencimientos
+    finally:
+        stream.cerrar()
+
+
+def test_aio_stream_con_plazo_agotado_aborta_desde_el_handler():
+    servicio = CalculoServiceAio([])
+
+    async def resolver(request, context, plazo):
+        await asyncio.sleep(0)
+        return resolver_falso(request, context, plazo)
+
+    async def peticiones():
+        yield calculo_pb2.CalculoRequest(op="add", id="1")
+        yield calculo_pb2.CalculoRequest(op="sum_squares", id="2")
+
+    async def probar():
+        servicio._resolver = resolver
+        contexto = ContextoFalsoAio()
+        try:
+            ids = [r.id async for r in servicio.CalculoStream(peticiones(), contexto)]
+        except Abortado:
+            ids = None
+        await servicio.cerrar()
+        return ids, contexto
+
+    ids, contexto = asyncio.run(asyncio.wait_for(probar(), ESPERA))
+    assert ids is None, f"el stream terminó bien ({ids}) con una petición fuera de plazo"
+    assert contexto.codigo == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+def test_aio_stream_limita_las_peticiones_en_vuelo():
+    # sin workers y con CalculoTotal simulado: solo se mide cuántas peticiones se resuelven a la vez
+    servicio = CalculoServiceAio([], max_en_vuelo=4)
+    en_curso = maximo = leidas = terminadas = 0
+
+    async def calculo_total(request, context, plazo):
+        nonlocal en_curso, maximo, terminadas
+        en_curso += 1
+        maximo = max(maximo, en_curso)
+        await asyncio.sleep(0.001)
+        en_curso -= 1
+        terminadas += 1
+        return calculo_pb2.CalculoResponse(ok=True, result=float(request.id))
+
+    async def peticiones():
+        nonlocal leidas
+        for i in range(500):
+            # backpressure: no se lee más allá de las 4 en curso y la que espera hueco
+            assert leidas - terminadas <= 4 + 1, f"leídas {leidas}, terminadas {terminadas}"
+            leidas += 1
+            yield calculo_pb2.CalculoRequest(op="add", id=str(i))
+
+    async def probar():
+        servicio._resolver = calculo_total
+        ids = [int(r.id) async for r in servicio.CalculoStream(peticiones(), None)]
+        await servicio.cerrar()
+        return ids
+
+    ids = asyncio.run(probar())
+    assert sorted(ids) == list(range(500))
+    assert maximo == 4, f"{maximo} peticiones a la vez con max_en_vuelo=4"
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_pruebas(globals()))
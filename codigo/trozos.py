@@ -0,0 +1,204 @@
+"""
+Modo por trozos (work stealing) para las reducciones sobre un rango (ver reducciones.py).
+
+El rango a..b se corta en muchos trozos pequeños. Cada worker tiene como mucho un
+trozo en curso y pide el siguiente en cuanto termina, así los workers rápidos
+procesan más trozos y uno lento no retrasa todo el trabajo. Cuando ya no quedan
+trozos por repartir, los trozos rezagados se duplican (hedging) en workers ociosos
+y gana la primera respuesta.
+
+El tamaño del trozo es fijo (`tam_trozo`) o adaptativo: cada worker recibe trozos
+de unos `objetivo` segundos según su rendimiento medido (elementos/s).
+
+Cada trozo usa el timeout que deja el plazo del cliente; si se agota o el cliente
+cancela, se cancelan los trozos en vuelo y no se reparte nada más.
+"""
+import collections
+import queue
+import statistics
+import time
+
+from reducciones import subpeticion
+from resultados import leer_exacto, nueva_part
+from metricas import REINTENTOS
+from bitacora import obtener
+from plazos import Plazo
+
+log_peticiones = obtener("coordinador", peticiones=True)
+
+TROZOS_POR_WORKER = 8     # trozos iniciales por worker en modo adaptativo
+TROZO_MINIMO = 1000       # elementos
+FACTOR_REZAGADO = 2.0     # un trozo es rezagado si lleva más de FACTOR × la latencia mediana
+ESPERA_REZAGADOS = 0.05   # s entre comprobaciones de rezagados mientras hay workers ociosos
+
+
+class TrabajoPorTrozos:
+    def __init__(self, servicio, request, inicio, fin, tam_trozo=None, objetivo=0.1, plazo=None):
+        self.servicio = servicio
+        self.plazo = plazo or Plazo()
+        self.request = request                    # la reducción entera; cada trozo es una subpetición suya
+        self.fin = fin
+        self.elementos = fin - inicio + 1
+        self.tam_trozo = tam_trozo
+        self.objetivo = objetivo
+        self._siguiente = inicio                  # primer elemento aún no cortado
+        self._devueltos = collections.deque()     # trozos cuyo envío falló, a repartir de nuevo
+        self._en_curso = {}                       # (a, b) -> {worker: (future, t0)}
+        self._ocupados = set()                    # workers con un trozo en curso
+        self._terminados = queue.Queue()
+        self._latencias = []
+        self._fallos = collections.Counter()      # (a, b) -> intentos fallidos
+        self.parts = {}                           # (a, b) -> Part
+        self.duplicados = 0
+
+    def _cortar(self, worker_addr):
+        """Siguiente trozo para worker_addr, o None si ya no quedan."""
+        if self._devueltos:
+            return self._devueltos.popleft()
+        if self._siguiente > self.fin:
+            return None
+        tam = self.tam_trozo
+        if tam is None:
+            rendimiento = self.servicio.planificador.rendimiento.get(worker_addr)
+            if rendimiento:
+                tam = int(rendimiento * self.objetivo)
+            else:
+                tam = self.elementos // (max(1, len(self.servicio.workers)) * TROZOS_POR_WORKER)
+            tam = max(TROZO_MINIMO, tam)
+        a = self._siguiente
+        b = min(self.fin, a + tam - 1)
+        self._siguiente = b + 1
+        return a, b
+
+    def _enviar(self, trozo, worker_addr):
+        a, b = trozo
+        subreq = subpeticion(self.request, a, b)
+        self.servicio.planificador.inicio(worker_addr)
+        llamadas = self.servicio.llamadas
+        metadatos, marca = llamadas.empezar(worker_addr)
+        t0 = time.perf_counter()
+        try:
+            future = self.servicio.obtener_stub(worker_addr).Calcular.future(subreq, timeout=self.plazo.timeout(),
+                                                                             metadata=metadatos)
+        except Exception as e:
+            llamadas.terminar(marca, "Calcular", e, time.perf_counter() - t0)
+            log_peticiones.warning("❌ Error conectando a worker %s: %s", worker_addr, e)
+            self.servicio.registrar_fallo(worker_addr, e)
+            return False
+        self.plazo.vigilar(future)
+        self._en_curso.setdefault(trozo, {})[worker_addr] = (future, t0)
+        self._ocupados.add(worker_addr)
+
+        def al_terminar(f):
+            latencia = time.perf_counter() - t0
+            llamadas.terminar(marca, "Calcular", f, latencia, subreq.op)
+            self._terminados.put((trozo, worker_addr, f, latencia))
+
+        future.add_done_callback(al_terminar)
+        return True
+
+    def _rezagado_para(self, worker_addr):
+        """Trozo en curso más antiguo que merece un duplicado en worker_addr, o None."""
+        if not self._latencias:
+            return None
+        limite = FACTOR_REZAGADO * statistics.median(self._latencias)
+        ahora = time.perf_counter()
+        candidatos = [(min(t0 for _, t0 in copias.values()), trozo)
+                      for trozo, copias in self._en_curso.items()
+                      if len(copias) == 1 and worker_addr not in copias]
+        if not candidatos:
+            return None
+        t0, trozo = min(candidatos)
+        return trozo if ahora - t0 > limite else None
+
+    def _repartir(self):
+        """Da trabajo a cada worker ocioso disponible: un trozo nuevo o un duplicado de un rezagado."""
+        for worker_addr in self.servicio.orden_workers(excluir=self._ocupados):
+            trozo = self._cortar(worker_addr)
+            if trozo is not None:
+                if not self._enviar(trozo, worker_addr):
+                    self._devueltos.appendleft(trozo)
+                continue
+            trozo = self._rezagado_para(worker_addr)
+            if trozo is None:
+                # nada que enviarle: si le tocaba la prueba de su breaker semiabierto, se devuelve
+                self.servicio.registro.registrar_abandono(worker_addr)
+                continue
+            log_peticiones.info("🐢 Rango %s..%s rezagado: duplicando en worker %s", trozo[0], trozo[1], worker_addr)
+            self.duplicados += 1
+            self._enviar(trozo, worker_addr)
+
+    def _pendiente(self):
+        return self._siguiente <= self.fin or self._devueltos or self._en_curso
+
+    def ejecutar(self):
+        """Procesa el rango entero y devuelve la lista de Part ordenada por rango."""
+        self._repartir()
+        while self._pendiente():
+            if not self._en_curso:
+                # ningún worker aceptó trabajo: lo que queda se calcula en el coordinador
+                self.plazo.comprobar()
+                self._fallback_local()
+                break
+            try:
+                trozo, worker_addr, future, latencia = self._terminados.get(timeout=ESPERA_REZAGADOS)
+            except queue.Empty:
+                self._comprobar_plazo()
+                self._repartir()
+                continue
+            self._comprobar_plazo()
+            self._ocupados.discard(worker_addr)
+            copias = self._en_curso.get(trozo, {})
+            copias.pop(worker_addr, None)
+            if not copias:
+                self._en_curso.pop(trozo, None)
+            try:
+                response = future.result()
+            except Exception as e:
+                if trozo in self.parts:  # duplicado cancelado porque ya ganó otra copia
+                    self.servicio.registrar_abandono(worker_addr)
+                    self._repartir()
+                    continue
+                log_peticiones.warning("❌ Error conectando a worker %s: %s", worker_addr, e)
+                self.servicio.registrar_fallo(worker_addr, e)
+                response = None
+            else:
+                self.servicio.registrar_exito(worker_addr, latencia, trozo[1] - trozo[0] + 1)
+
+            if response is not None and response.ok and trozo not in self.parts:
+                self._latencias.append(latencia)
+                self.parts[trozo] = nueva_part(trozo[0], trozo[1], leer_exacto(response), worker_addr)
+                for otro_future, _ in copias.values():
+                    otro_future.cancel()
+            elif response is not None and not response.ok:
+                log_peticiones.warning("⚠️ Worker %s devolvió error: %s", worker_addr, response.error)
+
+            if not copias and trozo not in self.parts:
+                self._fallos[trozo] += 1
+                if self._fallos[trozo] >= max(1, len(self.servicio.workers)):
+                    # ya falló en tantos intentos como workers hay: se resuelve en el coordinador
+                    self.parts[trozo] = self.servicio._fallback_local(self.request, *trozo)
+                else:
+                    REINTENTOS.inc(modo="trozos")
+                    self._devueltos.append(trozo)
+            self._repartir()
+
+        return [self.parts[t] for t in sorted(self.parts)]
+
+    def _comprobar_plazo(self):
+        """Si el cliente ya no espera, cancela los trozos en vuelo y lanza PlazoAgotado."""
+        if not self.plazo.agotado:
+            return
+        for copias in self._en_curso.values():
+            for worker_addr, (future, _) in copias.items():
+                future.cancel()
+                self.servicio.registrar_abandono(worker_addr)
+        self._en_curso.clear()
+        self.plazo.comprobar()
+
+    def _fallback_local(self):
+        while True:
+            trozo = self._cortar(None) if self._devueltos or self._siguiente <= self.fin else None
+            if trozo is None:
+                return
+            self.parts[trozo] = self.servicio._fallback_local(self.request, *trozo)
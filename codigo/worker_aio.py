@@ -0,0 +1,98 @@
+"""
+Worker sobre grpc.aio (asyncio). Se elige con `python worker_grpc.py <port> --servidor aio`.
+
+Reutiliza la lógica de OperacionService; las operaciones de rango (y los lotes y vectores) se
+ejecutan en el executor por defecto para no bloquear el bucle de eventos. Si la
+llamada se cancela, el cálculo que corre en el executor se entera por `activo`.
+"""
+import asyncio
+import threading
+
+import grpc
+
+import calculo_pb2_grpc
+from motor_sumas import MOTOR_POR_DEFECTO
+from operaciones import OPS_BASICAS
+from pool_canales import OPCIONES_SERVIDOR_KEEPALIVE
+from metricas import InterceptorServidorAio, servir_metricas
+from worker_grpc import OperacionService, health, health_pb2, health_pb2_grpc
+from bitacora import obtener
+
+log = obtener("worker")
+
+
+class OperacionServiceAio(calculo_pb2_grpc.OperacionServiceServicer):
+    def __init__(self, motor=MOTOR_POR_DEFECTO, retardo_ms=0, indice=None, procesos=None):
+        # la latencia artificial se espera con asyncio.sleep, no en la implementación síncrona
+        self.base = OperacionService(motor=motor, indice=indice, procesos=procesos)
+        self.retardo = retardo_ms / 1000
+
+    async def Calcular(self, request, context):
+        if self.retardo:
+            await asyncio.sleep(self.retardo)
+        if request.op in OPS_BASICAS:
+            return self.base.Calcular(request, context)
+        loop = asyncio.get_running_loop()
+        cancelada = threading.Event()
+        try:
+            return await loop.run_in_executor(None, self.base.Calcular, request, context,
+                                              lambda: not cancelada.is_set())
+        except asyncio.CancelledError:
+            # grpc.aio cancela la tarea al cancelar el cliente o vencer su timeout; el hilo sigue hasta mirar activo
+            cancelada.set()
+            raise
+
+    async def CalculoBatch(self, request, context):
+        if self.retardo:
+            await asyncio.sleep(self.retardo)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.base.CalculoBatch, request, context)
+
+    async def CalculoArray(self, request, context):
+        if self.retardo:
+            await asyncio.sleep(self.retardo)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.base.CalculoArray, request, context)
+
+    async def CalculoStream(self, request_iterator, context):
+        async for request in request_iterator:
+            response = await self.Calcular(request, context)
+            response.id = request.id
+            yield response
+
+    async def Info(self, request, context):
+        return self.base.Info(request, context)
+
+
+async def serve_aio(port, motor=MOTOR_POR_DEFECTO, retardo_ms=0, indice=None, procesos=None, anuncio=None,
+                    metricas_puerto=None, trazas=False):
+    interceptores = [InterceptorServidorAio("worker")] if metricas_puerto is not None else None
+    server = grpc.aio.server(options=OPCIONES_SERVIDOR_KEEPALIVE, interceptors=interceptores)
+    calculo_pb2_grpc.add_OperacionServiceServicer_to_server(
+        OperacionServiceAio(motor=motor, retardo_ms=retardo_ms, indice=indice, procesos=procesos), server
+    )
+    salud = None
+    if health is not None:
+        salud = health.aio.HealthServicer()
+        await salud.set("", health_pb2.HealthCheckResponse.SERVING)
+        health_pb2_grpc.add_HealthServicer_to_server(salud, server)
+    server.add_insecure_port(f"[::]:{port}")
+    await server.start()
+    log.info("✅ Worker gRPC (aio) escuchando en el puerto %s (motor %s)", port, motor)
+    if metricas_puerto is not None:
+        servir_metricas(metricas_puerto, trazas, proceso="worker")
+    if anuncio is not None:
+        anuncio.iniciar()
+    try:
+        await server.wait_for_termination()
+    finally:
+        if salud is not None:
+            await salud.enter_graceful_shutdown()
+        if anuncio is not None:
+            anuncio.detener()
+        await server.stop(1 if anuncio is not None else 0)
+        if indice is not None:
+            log.info("Índice de prefijos: %s", indice.contadores())
+            indice.cerrar()
+        if procesos is not None:
+            procesos.cerrar()
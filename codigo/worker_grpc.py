@@ -4,16 +4,50 @@ import time
 
 import calculo_pb2
 import calculo_pb2_grpc
+from motor_sumas import CalculoCancelado, motores_disponibles, MOTOR_POR_DEFECTO
+from reducciones import REDUCCIONES, rango
+from resultados import fijar_exacto
+from operaciones import OPS_BASICAS, calcular_basicas_lote
+from arreglos import calcular_arreglo
+from pool_canales import OPCIONES_SERVIDOR_KEEPALIVE
+from indice_prefijos import IndicePrefijos, PASO_POR_DEFECTO
+from multiproceso import PoolProcesos, nucleos_disponibles
+from membresia import AnuncioWorker
+from metricas import CALCULOS_ABANDONADOS, InterceptorServidor, servir_metricas
+from bitacora import agregar_opciones, configurar_desde_args, nueva_peticion, obtener
+
+try:
+    from grpc_health.v1 import health, health_pb2, health_pb2_grpc
+except ImportError:  # grpcio-health-checking es opcional: sin él no se publica grpc.health.v1
+    health = health_pb2 = health_pb2_grpc = None
+
+log = obtener("worker")
+log_peticiones = obtener("worker", peticiones=True)
 
 
 class OperacionService(calculo_pb2_grpc.OperacionServiceServicer):
-    def Calcular(self, request, context):
+    def __init__(self, motor=MOTOR_POR_DEFECTO, retardo_ms=0, indice=None, procesos=None):
+        # motor de cálculo para las reducciones (ver motor_sumas.py y reducciones.py)
+        self.motor = motor
+        # latencia artificial por petición, para simular workers lentos en benchmarks
+        self.retardo = retardo_ms / 1000
+        # índice de sumas prefijas (IndicePrefijos) para reutilizar trabajo entre rangos; None = sin índice
+        self.indice = indice
+        # PoolProcesos para repartir cada rango entre varios procesos; None = todo en este proceso
+        self.procesos = procesos
+
+    def Calcular(self, request, context, activo=None):
+        # activo() False = el coordinador canceló o venció su timeout: los rangos largos se interrumpen
+        activo = activo or getattr(context, "is_active", None)
         op = request.op
         a = request.a
         b = request.b
         n = request.n
 
-        print(f"[WORKER] Solicitud recibida: op={op}, a={a}, b={b}, n={n}")
+        nueva_peticion()
+        log_peticiones.info("Solicitud recibida: op=%s, a=%s, b=%s, n=%s", op, a, b, n, extra={"op": op})
+        if self.retardo:
+            time.sleep(self.retardo)
 
         try:
             if op == "add":
@@ -24,43 +58,181 @@ class OperacionService(calculo_pb2_grpc.OperacionServiceServicer):
                 result = a * b
             elif op == "div":
                 if b == 0:
-                    print(f"[WORKER] ❌ Error: división por cero (a={a}, b={b})")
+                    log_peticiones.warning("❌ Error: división por cero (a=%s, b=%s)", a, b)
                     return calculo_pb2.CalculoResponse(ok=False, error="División por cero")
                 result = a / b
-            elif op == "sum_squares":
-                result = sum(i * i for i in range(int(a), int(b) + 1))
+            elif op in REDUCCIONES:
+                reduccion = REDUCCIONES[op]
+                try:
+                    inicio, fin = rango(request)
+                    parametros = reduccion.parametros(request)
+                except ValueError as e:
+                    log_peticiones.warning("❌ Petición %s inválida: %s", op, e)
+                    return calculo_pb2.CalculoResponse(ok=False, error=str(e))
+                if op == "sum_squares" and self.indice is not None:
+                    result = self.indice.suma(inicio, fin, activo)
+                elif self.procesos is not None:
+                    result = self.procesos.reducir(op, inicio, fin, parametros, activo=activo)
+                else:
+                    result = reduccion.mapear(inicio, fin, parametros, self.motor, activo)
+                log_peticiones.info("✅ Resultado: %s", result)
+                response = calculo_pb2.CalculoResponse(ok=True, a=inicio, b=fin)
+                return fijar_exacto(response, result)
             else:
-                print(f"[WORKER] ❌ Operación no soportada: {op}")
+                log_peticiones.warning("❌ Operación no soportada: %s", op)
                 return calculo_pb2.CalculoResponse(ok=False, error=f"Operación no soportada: {op}")
 
-            print(f"[WORKER] ✅ Resultado: {result}")
+            log_peticiones.info("✅ Resultado: %s", result)
             return calculo_pb2.CalculoResponse(ok=True, result=result, a=int(a), b=int(b))
 
+        except CalculoCancelado as e:
+            # la respuesta ya no llegará a nadie; se devuelve solo para cerrar la llamada
+            CALCULOS_ABANDONADOS.inc(op=op)
+            log_peticiones.info("🛑 Llamada inactiva, %s", e)
+            return calculo_pb2.CalculoResponse(ok=False, error="Cálculo cancelado")
+
         except Exception as e:
-            print(f"[WORKER] ❌ Error inesperado: {e}")
+            log_peticiones.exception("❌ Error inesperado: %s", e)
             return calculo_pb2.CalculoResponse(ok=False, error=str(e))
 
+    def CalculoBatch(self, request, context):
+        nueva_peticion()
+        items = request.items
+        log_peticiones.info("Lote recibido: %s operaciones", len(items))
+        if self.retardo:
+            time.sleep(self.retardo)
+
+        respuestas = [None] * len(items)
+        # las operaciones básicas se evalúan juntas con numpy; el resto una a una
+        basicas = [i for i, it in enumerate(items) if it.op in OPS_BASICAS]
+        for i, response in zip(basicas, calcular_basicas_lote([items[i] for i in basicas])):
+            respuestas[i] = response
+        for i, it in enumerate(items):
+            if respuestas[i] is None:
+                respuestas[i] = self.Calcular(it, context)
+
+        return calculo_pb2.CalculoBatchResponse(items=respuestas)
+
+    def CalculoStream(self, request_iterator, context):
+        # stream de larga duración abierto por el coordinador: cada respuesta lleva el id de su petición
+        for request in request_iterator:
+            response = self.Calcular(request, context)
+            response.id = request.id
+            yield response
 
-def serve(port):
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    def CalculoArray(self, request, context):
+        # cada campo bytes se lee una vez: con upb cada acceso copia los datos
+        nueva_peticion()
+        datos_a, datos_b = request.a, request.b
+        log_peticiones.info("Vector recibido: %s %s, %s bytes desde el byte %s",
+                            request.op, request.dtype, len(datos_a), request.desplazamiento, extra={"op": request.op})
+        if self.retardo:
+            time.sleep(self.retardo)
+        response = calcular_arreglo(request.op, request.dtype, datos_a, datos_b, request.desplazamiento)
+        if not response.ok:
+            log_peticiones.warning("❌ %s", response.error)
+        response.id = request.id
+        return response
+
+    def Info(self, request, context):
+        # el coordinador usa los procesos como capacidad del worker
+        return calculo_pb2.InfoWorker(procesos=self.procesos.procesos if self.procesos else 1,
+                                      nucleos=nucleos_disponibles(), motor=self.motor)
+
+
+def serve(port, motor=MOTOR_POR_DEFECTO, retardo_ms=0, indice=None, procesos=None, anuncio=None,
+          metricas_puerto=None, trazas=False):
+    interceptores = [InterceptorServidor("worker")] if metricas_puerto is not None else None
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10), options=OPCIONES_SERVIDOR_KEEPALIVE,
+                         interceptors=interceptores)
     calculo_pb2_grpc.add_OperacionServiceServicer_to_server(
-        OperacionService(), server
+        OperacionService(motor=motor, retardo_ms=retardo_ms, indice=indice, procesos=procesos), server
     )
+    salud = None
+    if health is not None:
+        # el coordinador sondea este servicio para su circuit breaker
+        salud = health.HealthServicer()
+        salud.set("", health_pb2.HealthCheckResponse.SERVING)
+        health_pb2_grpc.add_HealthServicer_to_server(salud, server)
     server.add_insecure_port(f"[::]:{port}")
     server.start()
-    print(f"✅ Worker gRPC escuchando en el puerto {port}")
+    log.info("✅ Worker gRPC escuchando en el puerto %s (motor %s, %s procesos)",
+             port, motor, procesos.procesos if procesos else 1)
+    if metricas_puerto is not None:
+        servir_metricas(metricas_puerto, trazas, proceso="worker")
+    if anuncio is not None:
+        anuncio.iniciar()
     try:
         while True:
             time.sleep(86400)
     except KeyboardInterrupt:
+        if salud is not None:
+            salud.enter_graceful_shutdown()
+        if anuncio is not None:
+            # darse de baja primero y dejar terminar lo que el coordinador ya había enviado
+            anuncio.detener()
+            server.stop(1).wait()
         server.stop(0)
+    finally:
+        if indice is not None:
+            log.info("Índice de prefijos: %s", indice.contadores())
+            indice.cerrar()
+        if procesos is not None:
+            procesos.cerrar()
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
 
-    port = 6001  # Valor por defecto
-    if len(sys.argv) > 1:
-        port = int(sys.argv[1])
+    parser = argparse.ArgumentParser(usage="python worker_grpc.py [port] [opciones]")
+    parser.add_argument("port", type=int, nargs="?", default=6001)  # Valor por defecto
+    parser.add_argument("--motor", choices=motores_disponibles(), default=MOTOR_POR_DEFECTO,
+                        help="motor de cálculo para las reducciones (sum_squares, sum_powers...)")
+    parser.add_argument("--servidor", choices=("hilos", "aio"), default="hilos",
+                        help="servidor con ThreadPoolExecutor o con grpc.aio (asyncio)")
+    parser.add_argument("--retardo-ms", type=float, default=0,
+                        help="latencia artificial por petición (para simular workers lentos)")
+    parser.add_argument("--indice-paso", type=int, default=0,
+                        help=f"elementos entre puntos de control del índice de prefijos de sum_squares "
+                             f"(0 = sin índice; p. ej. {PASO_POR_DEFECTO})")
+    parser.add_argument("--indice-max-mb", type=float, default=16,
+                        help="memoria máxima del índice de prefijos (16 bytes por punto de control)")
+    parser.add_argument("--indice-archivo",
+                        help="fichero mapeado en memoria para el índice, que se conserva entre reinicios")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="procesos de cálculo para las reducciones detrás de este puerto (0 = uno por núcleo)")
+    parser.add_argument("--coordinador",
+                        help="host:puerto del coordinador en el que darse de alta (con latidos y baja al parar)")
+    parser.add_argument("--anunciar",
+                        help="host:puerto con el que el coordinador llama a este worker (por defecto localhost:<port>)")
+    parser.add_argument("--metricas-puerto", type=int,
+                        help="puerto HTTP para /metrics (formato Prometheus; 0 = uno libre); sin él no hay interceptores")
+    parser.add_argument("--trazas", action="store_true",
+                        help="guardar spans de las peticiones y publicarlos en /trazas (requiere --metricas-puerto)")
+    agregar_opciones(parser)
+    args = parser.parse_args()
+    configurar_desde_args(args)
 
-    serve(port)
+    procesos = PoolProcesos(args.procesos or None, args.motor) if args.procesos != 1 else None
+    indice = None
+    if args.indice_paso:
+        indice = IndicePrefijos(args.indice_paso, args.indice_max_mb, motor=args.motor,
+                                archivo=args.indice_archivo, sumar=procesos.suma if procesos else None)
+    anuncio = None
+    if args.coordinador:
+        anuncio = AnuncioWorker(args.coordinador, args.anunciar or f"localhost:{args.port}",
+                                capacidad=procesos.procesos if procesos else 1)
+
+    if args.servidor == "aio":
+        import asyncio
+        from worker_aio import serve_aio
+
+        try:
+            asyncio.run(serve_aio(args.port, motor=args.motor, retardo_ms=args.retardo_ms, indice=indice,
+                                  procesos=procesos, anuncio=anuncio, metricas_puerto=args.metricas_puerto,
+                                  trazas=args.trazas))
+        except KeyboardInterrupt:
+            pass
+    else:
+        serve(args.port, motor=args.motor, retardo_ms=args.retardo_ms, indice=indice, procesos=procesos,
+              anuncio=anuncio, metricas_puerto=args.metricas_puerto, trazas=args.trazas)